@@ -0,0 +1,66 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from itertools import islice
+
+# solving lots of puzzles at once with a process pool. used by the solve_many classmethod on every solver
+
+
+# puzzles are the constructor arguments of the solver: a tuple is passed as positional arguments and a dict as
+# keyword arguments, e.g. (grid, queens) for QueensSATSolver or (n, grid, equals, diffs) for TangoCPSATSolver
+def make_solver(solver_class, puzzle):
+    if isinstance(puzzle, dict):
+        return solver_class(**puzzle)
+    return solver_class(*puzzle)
+
+
+# solves one puzzle, returns None if it has no solution. the tango solvers raise instead of returning None, which
+# is told apart from a real failure by the status they record in solver.stats. any other exception is raised
+# (in the caller's process too, through the future's result)
+def solve_one(solver_class, puzzle):
+    solver = make_solver(solver_class, puzzle)
+    try:
+        return solver.solve()
+    except Exception:
+        if solver.stats.status in ('unsat', 'infeasible'):
+            return None
+        raise
+
+
+# runs once in every worker process so caches like the mini sudoku clause template are built before the first puzzle
+def warm_up(solver_class):
+    if hasattr(solver_class, 'warm_up'):
+        solver_class.warm_up()
+
+
+def solve_chunk(solver_class, chunk):
+    return [(index, solve_one(solver_class, puzzle)) for index, puzzle in chunk]
+
+
+# yields (index, solution) pairs in completion order, where index is the position of the puzzle in puzzles.
+# puzzles can be any iterable and is read lazily, with at most a few chunks per worker in flight at a time.
+# workers defaults to the number of cores, workers=1 solves everything in this process
+def solve_many(solver_class, puzzles, workers=None, chunk_size=64):
+    if workers is None:
+        workers = os.cpu_count() or 1
+    indexed = enumerate(puzzles)
+
+    if workers <= 1:
+        warm_up(solver_class)
+        for index, puzzle in indexed:
+            yield index, solve_one(solver_class, puzzle)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=warm_up, initargs=(solver_class,)) as pool:
+        pending = set()
+        while True:
+            # keep every worker busy without reading the whole input up front
+            while len(pending) < 2 * workers:
+                chunk = list(islice(indexed, chunk_size))
+                if not chunk:
+                    break
+                pending.add(pool.submit(solve_chunk, solver_class, chunk))
+            if not pending:
+                return
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield from future.result()
@@ -1,63 +1,114 @@
+import argparse
 import random 
+import sys
+from itertools import islice
 import numpy as np
-import time
-import matplotlib.pyplot as plt
+import tracemalloc
 from tqdm import tqdm
 
 from queens import QueensSATSolver
+import queens_generator
 from mini_sudoku import MiniSudokuSATSolver
+import sudoku_generator
 from tango import TangoCPSATSolver
+import tango_generator
 from zip_integer import ZipCPSATSolver
-# class to make sample puzzles for each of the 4 puzzles and benchmark their solvers
+import zip_circuit
+import zip_boolean
+from zip_search import ZipSearchSolver
+from zip_board import ZipBoard
+from solve_profile import PROFILES
+import benchmark_runner
+import corpus
+# class to make sample puzzles for each of the 4 puzzles and benchmark their solvers.
+# every solve is timed through benchmark_runner, so all benchmark_* methods report medians, keep their samples
+# and solve stats in self.run and can be written out with run.write_json / run.write_csv. matplotlib is only
+# imported by the plot_* methods, which save to path if one is given and show the figure otherwise
 
 class Benchmark:
-    MINI_SUDOKU_PIECES = range(36, 6, -1)
+    # greedy removal ends at 9-12 givens, so fewer pieces are never generated
+    MINI_SUDOKU_PIECES = range(36, 8, -1)
     QUEEN_SIZES = range(5, 25)
     TANGO_SIZES = range(6, 25, 2)
     ZIP_SIZES = range(5, 11)
+    ZIP_CIRCUIT_SIZES = range(5, 17)
     TRIALS_PER_SIZE = 50
 
+    # corpus_path is a file written by build_corpus, the benchmarks then stream their puzzles from it instead of
+    # generating new ones. sizes that aren't in the corpus are still generated.
+    # warmup and repeat are passed to the benchmark_runner.BenchmarkRun that collects the measurements
+    def __init__(self, corpus_path=None, warmup=3, repeat=1):
+        self.corpus = corpus.Corpus(corpus_path) if corpus_path is not None else None
+        self.run = benchmark_runner.BenchmarkRun(warmup, repeat,
+                                                 meta={'corpus': corpus_path, 'trials': self.TRIALS_PER_SIZE})
+
+    # TRIALS_PER_SIZE puzzles of game and size, from the corpus if it has them, otherwise from generate(),
+    # which returns an iterable of puzzles
+    def puzzles(self, game, size, generate):
+        if self.corpus is not None and (game, size) in self.corpus:
+            if self.corpus.count(game, size) < self.TRIALS_PER_SIZE:
+                raise ValueError(f"Corpus has {self.corpus.count(game, size)} {game} puzzles of size {size}, "
+                                 f"need {self.TRIALS_PER_SIZE}")
+            return islice(self.corpus.stream(game, size), self.TRIALS_PER_SIZE)
+        return islice(generate(), self.TRIALS_PER_SIZE)
+
+    # queens puzzles with the first q queens of the solution given
+    def queens_puzzles(self, n, q):
+        generate = lambda: (queens_generator.generate_queens(n) for _ in range(self.TRIALS_PER_SIZE))
+        for grid, solution in self.puzzles('queens', n, generate):
+            yield grid, solution[:q]
+
+    # writes TRIALS_PER_SIZE puzzles for every size of every game to path (see corpus.py). each section gets its
+    # own seed drawn from seed, so the same seed gives the same file. workers is passed to the mini sudoku and
+    # tango generators, which give the same puzzles for any number of workers
+    def build_corpus(self, path, seed=0, workers=None):
+        rng = random.Random(seed)
+        trials = self.TRIALS_PER_SIZE
+        sections = []
+
+        # trials puzzles from generate(*args), with the arguments bound now and not when the file is written
+        def repeat(generate, *args):
+            return (generate(*args) for _ in range(trials))
+
+        for p in self.MINI_SUDOKU_PIECES:
+            sections.append(('mini_sudoku', p, trials,
+                             sudoku_generator.iter_puzzles(p, trials, workers, seed=rng.getrandbits(64))))
+        for n in self.QUEEN_SIZES:
+            queens_rng = random.Random(rng.getrandbits(64))
+            sections.append(('queens', n, trials, repeat(queens_generator.generate_queens, n, queens_rng)))
+        for n in self.TANGO_SIZES:
+            sections.append(('tango', n, trials,
+                             tango_generator.iter_puzzles(n, trials, workers, seed=rng.getrandbits(64))))
+        for n in sorted(set(self.ZIP_SIZES) | set(self.ZIP_CIRCUIT_SIZES)):
+            zip_rng = random.Random(rng.getrandbits(64))
+            sections.append(('zip', n, trials, repeat(self.generate_zip, n, zip_rng)))
+        corpus.write(path, sections, meta={'seed': seed, 'trials': trials})
     # generate a mini sudoku puzzle with p pieces and exactly 1 solution
     def generate_mini_sudoku(self, p):
         solver = MiniSudokuSATSolver([[0]*6 for _ in range(6)])
-        return solver.generate_mini_sudoku(p)
+        return solver.generate_mini_sudoku(p, incremental=True)
     
     # generate a queen puzzle of size n with q queens already given
+    # the board comes from queens_generator, so it has contiguous regions and exactly one solution
     def generate_queens(self, n, q):
-        queen_positions = []
-        fails = 0
-        while len(queen_positions) < n:
-            remaining_valid = []
-            for r in range(n):
-                for c in range(n):
-                    # any() and all() is my favorite function i learned from this class
-                    if all(r != qr and c != qc and abs(r - qr) != abs(c - qc) for (qr, qc) in queen_positions):
-                        remaining_valid.append((r, c))
-            if not remaining_valid:
-                queen_positions = []
-                continue
-            queen_positions.append(random.choice(remaining_valid))
-        board = [[random.choice(range(1, n + 1)) for _ in range(n)] for _ in range(n)]
-        for i, (r, c) in enumerate(queen_positions):
-            board[r][c] = i + 1
-        return board, queen_positions[:q]
+        grid, queen_positions = queens_generator.generate_queens(n)
+        return grid, queen_positions[:q]
     
-    def benchmark_mini_sudoku(self):
+    # workers is passed to sudoku_generator, which builds the puzzles for each piece count in parallel.
+    # the puzzles of a piece count are all built before its first timed solve, so the generator's workers don't
+    # compete with the solves
+    def benchmark_mini_sudoku(self, workers=None):
         pieces = self.MINI_SUDOKU_PIECES
-        results = np.zeros((len(pieces), self.TRIALS_PER_SIZE))
+        results = np.zeros(len(pieces))
         for i, p in tqdm(enumerate(pieces), total=len(pieces), desc='Benchmarking Mini Sudoku'):
-            for t in range(self.TRIALS_PER_SIZE):
-                solver = MiniSudokuSATSolver([[0]*6 for _ in range(6)])
-                puzzle = solver.generate_mini_sudoku(p)
-                solver = MiniSudokuSATSolver(puzzle)
-                start = time.time()
-                solver.solve()
-                elapsed = time.time() - start
-                results[i, t] = elapsed
-        results = np.median(results, axis=1)
+            puzzles = self.puzzles('mini_sudoku', p,
+                                   lambda: sudoku_generator.iter_puzzles(p, self.TRIALS_PER_SIZE, workers))
+            measurement = self.run.measure('mini_sudoku', {'pieces': p}, puzzles, MiniSudokuSATSolver)
+            results[i] = measurement.summary()['p50']
         return pieces, results
 
-    def plot_mini_sudoku(self):
+    def plot_mini_sudoku(self, path=None):
+        import matplotlib.pyplot as plt
         pieces, times = self.benchmark_mini_sudoku()
         plt.plot(pieces, times, label='Mini Sudoku')
         plt.xlabel('Number of Given Pieces')
@@ -65,70 +116,71 @@ class Benchmark:
         plt.title('Puzzle Solver Benchmark')
         plt.legend()
         plt.grid(True)
-        plt.show()
+        finish_plot(plt, path)
 
-    def benchmark_queens(self):
+    def benchmark_queens(self, amo_encoding='pairwise', vectorized=False):
         sizes = self.QUEEN_SIZES
         q = 1
         results = np.zeros(len(sizes))
         for i, n in tqdm(enumerate(sizes), total=len(sizes), desc='Benchmarking Queens'):
-            for _ in range(self.TRIALS_PER_SIZE):
-                grid, queens = self.generate_queens(n, q)
-                solver = QueensSATSolver(grid, queens)
-                start = time.time()
-                solver.solve()
-                elapsed = time.time() - start
-                results[i] += elapsed
-            results[i] /= self.TRIALS_PER_SIZE
+            measurement = self.run.measure('queens', {'size': n, 'encoding': amo_encoding, 'vectorized': vectorized},
+                                           self.queens_puzzles(n, q),
+                                           lambda p: QueensSATSolver(*p, amo_encoding, vectorized))
+            results[i] = measurement.summary()['p50']
         return sizes, results
     
+    # compares the at-most-one encodings of the queens solver on the same boards
+    # returns median solve time and average clause count per size for each encoding
+    def benchmark_queens_encodings(self):
+        sizes = self.QUEEN_SIZES
+        encodings = QueensSATSolver.AMO_ENCODINGS
+        q = 1
+        times = {e: np.zeros(len(sizes)) for e in encodings}
+        clauses = {e: np.zeros(len(sizes)) for e in encodings}
+        for i, n in tqdm(enumerate(sizes), total=len(sizes), desc='Benchmarking Queens encodings'):
+            puzzles = list(self.queens_puzzles(n, q))
+            for e in encodings:
+                measurement = self.run.measure('queens', {'size': n, 'encoding': e, 'vectorized': False},
+                                               puzzles, lambda p: QueensSATSolver(*p, e))
+                times[e][i] = measurement.summary()['p50']
+                clauses[e][i] = measurement.mean_stat('constraints')
+        return sizes, times, clauses
+
+    def plot_queens_encodings(self, path=None):
+        import matplotlib.pyplot as plt
+        sizes, times, clauses = self.benchmark_queens_encodings()
+        fig, (ax_time, ax_clauses) = plt.subplots(1, 2, figsize=(12, 5))
+        for e in times:
+            ax_time.plot(sizes, times[e], label=e)
+            ax_clauses.plot(sizes, clauses[e], label=e)
+        ax_time.set_xlabel('Puzzle Size')
+        ax_time.set_ylabel('Median Solve Time (s)')
+        ax_clauses.set_xlabel('Puzzle Size')
+        ax_clauses.set_ylabel('Average Clause Count')
+        for ax in (ax_time, ax_clauses):
+            ax.set_title('Queens At-Most-One Encodings')
+            ax.legend()
+            ax.grid(True)
+        finish_plot(plt, path)
+
+    # generate a tango puzzle of size n with exactly 1 solution and markers only between neighbouring cells
     def generate_tango(self, n):
-        grid = [[-1] * n for _ in range(n)]
-        equals = []
-        diffs = []
-        
-        solver = TangoCPSATSolver(n, grid, equals, diffs)
-        solution = solver.solve()
-        
-        # create a puzzle by removing some cells
-        puzzle = [[-1] * n for _ in range(n)]
-        num_givens = max(2, n * n // 5)
-        given_positions = random.sample([(r, c) for r in range(n) for c in range(n)], num_givens)
-        
-        for r, c in given_positions:
-            puzzle[r][c] = solution[r][c]
-        
-        # add some equals and diffs constraints
-        num_constraints = max(1, n // 2)
-        all_positions = [(r, c) for r in range(n) for c in range(n)]
-        
-        for _ in range(num_constraints):
-            pos1, pos2 = random.sample(all_positions, 2)
-            r1, c1 = pos1
-            r2, c2 = pos2
-            
-            if solution[r1][c1] == solution[r2][c2]:
-                equals.append((pos1, pos2))
-            else:
-                diffs.append((pos1, pos2))
-        
-        return puzzle, equals, diffs
+        return tango_generator.generate_tango(n)
     
-    def benchmark_tango(self):
+    # workers is passed to tango_generator, which builds the puzzles for each size in parallel.
+    # like the mini sudoku puzzles they are all built before the first timed solve
+    def benchmark_tango(self, profile=None, workers=None):
         sizes = self.TANGO_SIZES
         results = np.zeros(len(sizes))
         for i, n in tqdm(enumerate(sizes), total=len(sizes), desc='Benchmarking Tango'):
-            for _ in range(self.TRIALS_PER_SIZE):
-                grid, equals, diffs = self.generate_tango(n)
-                solver = TangoCPSATSolver(n, grid, equals, diffs)
-                start = time.time()
-                solver.solve()
-                elapsed = time.time() - start
-                results[i] += elapsed
-            results[i] /= self.TRIALS_PER_SIZE  
+            puzzles = self.puzzles('tango', n, lambda: tango_generator.iter_puzzles(n, self.TRIALS_PER_SIZE, workers))
+            measurement = self.run.measure('tango', {'size': n, 'profile': profile.name if profile else None},
+                                           puzzles, lambda p: TangoCPSATSolver(n, *p, profile=profile))
+            results[i] = measurement.summary()['p50']
         return sizes, results
     
-    def generate_zip(self, size):
+    # rng is a random.Random, the module's global generator if not given
+    def generate_zip(self, size, rng=random):
         rows = cols = size
         grid = [[0] * cols for _ in range(rows)]
         
@@ -143,52 +195,124 @@ class Benchmark:
                     path.append((r, c))
         
         # place random number of numbered cells along the path
-        k = random.randint(4, max(5, size // 2))
+        k = rng.randint(4, max(5, size // 2))
         k = min(k, len(path))
         step_interval = len(path) // k
-        numbered_positions = [path[i * step_interval] for i in range(k)]
+        # the last number has to sit on the end of the path, otherwise the puzzle usually has no solution
+        numbered_positions = [path[i * step_interval] for i in range(k - 1)] + [path[-1]]
         
         for num, (r, c) in enumerate(numbered_positions, 1):
             grid[r][c] = num
         
         # add walls that don't break the Hamiltonian path
         walls = set()
+        board = ZipBoard(grid)
         path_edges = set()
         for i in range(len(path) - 1):
-            edge = (min(path[i], path[i+1]), max(path[i], path[i+1]))
-            path_edges.add(edge)
-        
-        all_edges = []
-        for r in range(rows):
-            for c in range(cols):
-                if c < cols - 1:
-                    all_edges.append((min((r, c), (r, c+1)), max((r, c), (r, c+1))))
-                if r < rows - 1:
-                    all_edges.append((min((r, c), (r+1, c)), max((r, c), (r+1, c))))
+            a, b = board.cell(*path[i]), board.cell(*path[i+1])
+            path_edges.add((min(a, b), max(a, b)))
         
-        available_edges = [e for e in all_edges if e not in path_edges]
+        available_edges = [e for e in board.edges() if e not in path_edges]
         if available_edges:
             num_walls = min(len(available_edges) // 5, len(available_edges))
             if num_walls > 0:
-                walls = set(random.sample(available_edges, num_walls))
+                walls = set((board.position(a), board.position(b))
+                            for a, b in rng.sample(available_edges, num_walls))
         
         return grid, walls
     
-    def benchmark_zip(self):
-        sizes = self.ZIP_SIZES
+    # engine=zip_circuit.ZipCPSATSolver benchmarks the circuit model, which goes up to ZIP_CIRCUIT_SIZES,
+    # engine=ZipSearchSolver the dfs engine (profile and warm_start only apply to the cp-sat engines)
+    # with warm_start it also prints the share of boards the greedy heuristic solved on its own
+    def benchmark_zip(self, profile=None, engine=ZipCPSATSolver, warm_start=False):
+        sizes = self.ZIP_CIRCUIT_SIZES if engine is zip_circuit.ZipCPSATSolver else self.ZIP_SIZES
         results = np.zeros(len(sizes))
+        heuristic_solved = np.zeros(len(sizes))
+        options = {}
+        if profile is not None:
+            options['profile'] = profile
+        if warm_start:
+            options['warm_start'] = True
+        params = {'engine': engine.__module__, 'profile': profile.name if profile else None, 'warm_start': warm_start}
         for i, n in tqdm(enumerate(sizes), total=len(sizes), desc='Benchmarking Zip'):
-            for _ in range(self.TRIALS_PER_SIZE):
-                grid, walls = self.generate_zip(n)
-                solver = ZipCPSATSolver(grid, walls)
-                start = time.time()
-                solver.solve()
-                elapsed = time.time() - start
-                results[i] += elapsed
-            results[i] /= self.TRIALS_PER_SIZE
+            puzzles = self.puzzles('zip', n, lambda: (self.generate_zip(n) for _ in range(self.TRIALS_PER_SIZE)))
+            measurement = self.run.measure('zip', {'size': n, **params}, puzzles, lambda p: engine(*p, **options))
+            results[i] = measurement.summary()['p50']
+            # a board the heuristic solves never reaches the cp-sat search
+            heuristic_solved[i] = np.mean([stats['search_time'] is None for stats in measurement.stats])
+        if warm_start:
+            for n, share in zip(sizes, heuristic_solved):
+                print(f'{n}x{n}: heuristic solved {share:.0%} of boards')
         return sizes, results
-    
-    def plot_queens_zip_tango(self):
+
+    # builds the zip_boolean model with and without reachability pruning on the same boards
+    # returns average build time, variable count and peak python memory (bytes) per size for each
+    def benchmark_zip_pruning(self):
+        sizes = self.ZIP_SIZES
+        stats = {prune: {'build_time': np.zeros(len(sizes)), 'variables': np.zeros(len(sizes)),
+                         'memory': np.zeros(len(sizes))} for prune in (True, False)}
+        for i, n in tqdm(enumerate(sizes), total=len(sizes), desc='Benchmarking Zip pruning'):
+            for grid, walls in self.puzzles('zip', n, lambda: (self.generate_zip(n) for _ in range(self.TRIALS_PER_SIZE))):
+                for prune in (True, False):
+                    solver = zip_boolean.ZipCPSATSolver(grid, walls, prune=prune)
+                    tracemalloc.start()
+                    solver.build_model()
+                    _, peak = tracemalloc.get_traced_memory()
+                    tracemalloc.stop()
+                    stats[prune]['build_time'][i] += solver.build_stats['build_time']
+                    stats[prune]['variables'][i] += solver.build_stats['variables']
+                    stats[prune]['memory'][i] += peak
+            for prune in (True, False):
+                for key in stats[prune]:
+                    stats[prune][key][i] /= self.TRIALS_PER_SIZE
+        for i, n in enumerate(sizes):
+            saved_time = stats[False]['build_time'][i] - stats[True]['build_time'][i]
+            saved_memory = stats[False]['memory'][i] - stats[True]['memory'][i]
+            print(f'{n}x{n}: pruning saves {saved_time:.3f}s build time and {saved_memory / 2**20:.1f} MiB, '
+                  f'{stats[True]["variables"][i]:.0f} of {n ** 4} variables left')
+        return sizes, stats
+
+    # runs the tango and zip solvers under every solve profile on the same boards
+    # returns, per game, the sizes, median solve time per profile and the fastest profile name per size
+    def benchmark_profiles(self, profiles=PROFILES):
+        games = {
+            'Tango': (self.TANGO_SIZES, 'tango', self.generate_tango, lambda n, p: (n, *p), TangoCPSATSolver, {}),
+            'Zip': (self.ZIP_SIZES, 'zip', self.generate_zip, lambda n, p: p, ZipCPSATSolver,
+                    {'engine': ZipCPSATSolver.__module__, 'warm_start': False}),
+        }
+        results = {}
+        for game, (sizes, key, generate, arguments, solver_class, params) in games.items():
+            times = {p.name: np.zeros(len(sizes)) for p in profiles}
+            for i, n in tqdm(enumerate(sizes), total=len(sizes), desc=f'Benchmarking {game} profiles'):
+                generate_all = lambda: (generate(n) for _ in range(self.TRIALS_PER_SIZE))
+                puzzles = list(self.puzzles(key, n, generate_all))
+                for p in profiles:
+                    measurement = self.run.measure(key, {'size': n, 'profile': p.name, **params}, puzzles,
+                                                   lambda puzzle: solver_class(*arguments(n, puzzle), profile=p))
+                    times[p.name][i] = measurement.summary()['p50']
+            best = [min(times, key=lambda name: times[name][i]) for i in range(len(sizes))]
+            results[game] = (sizes, times, best)
+        return results
+
+    def plot_profiles(self, path=None):
+        import matplotlib.pyplot as plt
+        results = self.benchmark_profiles()
+        fig, axes = plt.subplots(1, len(results), figsize=(12, 5))
+        for ax, (game, (sizes, times, best)) in zip(axes, results.items()):
+            for name in times:
+                ax.plot(sizes, times[name], label=name)
+            print(f'{game} fastest profile per size:')
+            for n, name in zip(sizes, best):
+                print(f'  {n}: {name}')
+            ax.set_xlabel('Puzzle Size')
+            ax.set_ylabel('Median Solve Time (s)')
+            ax.set_title(f'{game} Solve Profiles')
+            ax.legend()
+            ax.grid(True)
+        finish_plot(plt, path)
+
+    def plot_queens_zip_tango(self, path=None):
+        import matplotlib.pyplot as plt
         #queen_sizes, queen_times = self.benchmark_queens()
         #tango_sizes, tango_times = self.benchmark_tango()
         zip_sizes, zip_times = self.benchmark_zip()
@@ -198,13 +322,91 @@ class Benchmark:
         plt.plot(zip_sizes, zip_times, label='Zip')
         
         plt.xlabel('Puzzle Size')
-        plt.ylabel('Average Solve Time (s)')
+        plt.ylabel('Median Solve Time (s)')
         plt.title('Puzzle Solver Benchmark')
         plt.legend()
         plt.grid(True)
+        finish_plot(plt, path)
+
+
+# saves the current figure to path (the format follows the extension), or shows it if path is None
+def finish_plot(plt, path=None):
+    if path is None:
         plt.show()
+    else:
+        plt.savefig(path, bbox_inches='tight')
+        plt.close()
+
+
+# benchmark_* method per game for the run command
+GAMES = {
+    'mini_sudoku': Benchmark.benchmark_mini_sudoku,
+    'queens': Benchmark.benchmark_queens,
+    'tango': Benchmark.benchmark_tango,
+    'zip': Benchmark.benchmark_zip,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the puzzle solvers')
+    commands = parser.add_subparsers(dest='command', required=True)
+    run = commands.add_parser('run', help='time the solvers and write the measurements')
+    run.add_argument('games', nargs='*', help=f"games to run, from {', '.join(sorted(GAMES))} (default: all)")
+    run.add_argument('--corpus', help='corpus file to read the puzzles from (see the corpus command)')
+    run.add_argument('--trials', type=int, default=Benchmark.TRIALS_PER_SIZE, help='puzzles per size')
+    run.add_argument('--warmup', type=int, default=3, help='untimed solves before every measurement')
+    run.add_argument('--repeat', type=int, default=1, help='timed solves of every puzzle')
+    run.add_argument('--json', help='write the run (samples and solve stats included) to this file')
+    run.add_argument('--csv', help='write one summary row per measurement to this file')
+    compare = commands.add_parser('compare', help='diff two runs written with --json, exit 1 on a regression or '
+                                                  'a measurement missing from the candidate')
+    compare.add_argument('baseline')
+    compare.add_argument('candidate')
+    compare.add_argument('--threshold', type=float, default=0.05,
+                         help='slowdown of the median (as a fraction) that counts as a regression')
+    build = commands.add_parser('corpus', help='generate the puzzles of every size into a file for run --corpus')
+    build.add_argument('path')
+    build.add_argument('--seed', type=int, default=0, help='the same seed gives the same file')
+    build.add_argument('--trials', type=int, default=Benchmark.TRIALS_PER_SIZE, help='puzzles per size')
+    build.add_argument('--workers', type=int, help='generator processes (default: one per core)')
+    plot = commands.add_parser('plot', help='plot the queens / zip / tango solve times')
+    plot.add_argument('--out', help='save the figure to this file instead of showing it')
+    args = parser.parse_args(argv)
+
+    if args.command == 'compare':
+        rows = benchmark_runner.compare(benchmark_runner.BenchmarkRun.load(args.baseline),
+                                        benchmark_runner.BenchmarkRun.load(args.candidate), args.threshold)
+        benchmark_runner.print_comparison(rows)
+        return 1 if any(row['verdict'] in ('regression', 'missing') for row in rows) else 0
+
+    if args.command == 'corpus':
+        Benchmark.TRIALS_PER_SIZE = args.trials
+        Benchmark().build_corpus(args.path, args.seed, args.workers)
+        return 0
+
+    if args.command == 'plot':
+        Benchmark().plot_queens_zip_tango(args.out)
+        return 0
+
+    unknown = set(args.games) - set(GAMES)
+    if unknown:
+        parser.error(f"unknown games: {', '.join(sorted(unknown))}")
+    Benchmark.TRIALS_PER_SIZE = args.trials
+    benchmark = Benchmark(args.corpus, args.warmup, args.repeat)
+    for game in args.games or sorted(GAMES):
+        GAMES[game](benchmark)
+    for m in benchmark.run.measurements:
+        summary = m.summary()
+        params = ' '.join(f'{k}={v}' for k, v in m.params.items())
+        print(f"{m.name:<12} {params:<48} p50 {summary['p50'] * 1000:9.3f} ms  "
+              f"p95 {summary['p95'] * 1000:9.3f} ms  p99 {summary['p99'] * 1000:9.3f} ms  "
+              f"ci [{summary['ci_low'] * 1000:.3f}, {summary['ci_high'] * 1000:.3f}]")
+    if args.json:
+        benchmark.run.write_json(args.json)
+    if args.csv:
+        benchmark.run.write_csv(args.csv)
+    return 0
 
 
 if __name__ == "__main__":
-    benchmark = Benchmark()
-    benchmark.plot_queens_zip_tango()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,230 @@
+import csv
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+# measurement side of benchmark.py. a measurement is one engine on one set of puzzles (usually one game, size and
+# engine option): a few untimed warmup solves first, so per-process caches, cp-sat's startup and lazy imports
+# aren't billed to the first puzzle, then every puzzle is built and solved repeat times under perf_counter_ns.
+# the time covers the solver's constructor and solve(), the end to end latency a caller sees.
+# besides the raw samples a measurement keeps the solver.stats (solve_stats) of every solve, which gives the
+# per phase breakdown (model building steps vs search) and the model size / search counters.
+# summaries report percentiles and a bootstrap confidence interval of the median, which is what compare() uses
+# to decide whether two runs differ: solve times are heavy tailed, so means and normal intervals mislead
+
+# bootstrap resamples for the confidence interval of the median, and the interval's coverage
+BOOTSTRAP = 2000
+CONFIDENCE = 0.95
+
+
+class Measurement:
+
+    # name is the benchmark (e.g. 'queens'), params what tells measurements of one benchmark apart
+    # (e.g. {'size': 8, 'encoding': 'sequential'}), both have to match for compare() to pair two measurements
+    def __init__(self, name, params, samples_ns=None, stats=None):
+        self.name = name
+        self.params = params
+        self.samples_ns = samples_ns if samples_ns is not None else []
+        # solver.stats.to_dict() of every timed solve, in the order of samples_ns
+        self.stats = stats if stats is not None else []
+
+    def __repr__(self):
+        return f"Measurement({self.name!r}, {self.params!r}, {len(self.samples_ns)} samples)"
+
+    def key(self):
+        return self.name, json.dumps(self.params, sort_keys=True)
+
+    # count, mean, min, max, p50 / p95 / p99 and the confidence interval of the median (ci_low, ci_high),
+    # times in seconds
+    def summary(self):
+        samples = np.asarray(self.samples_ns, dtype=np.float64) / 1e9
+        if len(samples) == 0:
+            return {'count': 0}
+        p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+        ci_low, ci_high = median_interval(samples)
+        return {
+            'count': len(samples),
+            'mean': float(samples.mean()),
+            'min': float(samples.min()),
+            'max': float(samples.max()),
+            'p50': float(p50),
+            'p95': float(p95),
+            'p99': float(p99),
+            'ci_low': ci_low,
+            'ci_high': ci_high,
+        }
+
+    # mean seconds per phase (the model building steps, plus 'search'), over the solves that went through it
+    def phases(self):
+        totals = {}
+        for stats in self.stats:
+            for name, seconds in stats['phases'].items():
+                totals.setdefault(name, []).append(seconds)
+            if stats['search_time'] is not None:
+                totals.setdefault('search', []).append(stats['search_time'])
+        return {name: float(np.mean(values)) for name, values in totals.items()}
+
+    # mean of a solve_stats counter ('variables', 'constraints', 'conflicts', 'branches', 'peak_memory'),
+    # None if the solver doesn't report it
+    def mean_stat(self, field):
+        values = [stats[field] for stats in self.stats if stats[field] is not None]
+        return float(np.mean(values)) if values else None
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'params': self.params,
+            'summary': self.summary(),
+            'phases': self.phases(),
+            'samples_ns': list(self.samples_ns),
+            'stats': self.stats,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['name'], data['params'], data['samples_ns'], data['stats'])
+
+
+# bootstrap percentile interval of the median of samples, as (low, high). the resampling rng is seeded so a run
+# always reports the same interval for the same samples
+def median_interval(samples, confidence=CONFIDENCE, resamples=BOOTSTRAP):
+    samples = np.asarray(samples, dtype=np.float64)
+    if len(samples) < 2:
+        return float(samples[0]), float(samples[0])
+    rng = np.random.default_rng(0)
+    medians = np.median(rng.choice(samples, size=(resamples, len(samples))), axis=1)
+    tail = (1 - confidence) / 2 * 100
+    low, high = np.percentile(medians, [tail, 100 - tail])
+    return float(low), float(high)
+
+
+# python, platform and cpu details stored with every run, so runs from different machines can be told apart
+def machine_info():
+    return {
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+class BenchmarkRun:
+
+    # warmup untimed solves before every measurement, repeat timed solves of every puzzle
+    def __init__(self, warmup=3, repeat=1, meta=None):
+        self.warmup = warmup
+        self.repeat = repeat
+        self.meta = {'started': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+                     'warmup': warmup, 'repeat': repeat, 'machine': machine_info()}
+        self.meta.update(meta or {})
+        self.measurements = []
+
+    # times make_solver(puzzle).solve() for every puzzle and adds the Measurement to the run.
+    # make_solver builds a fresh solver for a puzzle, puzzles is read once (a list is made of it for the warmup)
+    def measure(self, name, params, puzzles, make_solver):
+        puzzles = list(puzzles)
+        for puzzle in puzzles[:self.warmup]:
+            solve(make_solver, puzzle)
+        measurement = Measurement(name, params)
+        for puzzle in puzzles:
+            for _ in range(self.repeat):
+                elapsed, solver = solve(make_solver, puzzle)
+                measurement.samples_ns.append(elapsed)
+                measurement.stats.append(solver.stats.to_dict())
+        self.measurements.append(measurement)
+        return measurement
+
+    def to_dict(self):
+        return {'meta': self.meta, 'measurements': [m.to_dict() for m in self.measurements]}
+
+    def write_json(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f)
+
+    # one row per measurement: the summary in milliseconds, the mean model size and encode / search split
+    def write_csv(self, path):
+        fields = ['name', 'params', 'count', 'mean_ms', 'p50_ms', 'p95_ms', 'p99_ms', 'ci_low_ms', 'ci_high_ms',
+                  'encode_ms', 'search_ms', 'variables', 'constraints', 'conflicts', 'branches']
+        with open(path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fields)
+            writer.writeheader()
+            for m in self.measurements:
+                summary = m.summary()
+                phases = m.phases()
+                row = {'name': m.name, 'params': json.dumps(m.params, sort_keys=True), 'count': summary['count']}
+                for field in ('mean', 'p50', 'p95', 'p99', 'ci_low', 'ci_high'):
+                    row[f'{field}_ms'] = summary.get(field, 0.0) * 1000
+                row['encode_ms'] = sum(s for name, s in phases.items() if name != 'search') * 1000
+                row['search_ms'] = phases.get('search', 0.0) * 1000
+                for field in ('variables', 'constraints', 'conflicts', 'branches'):
+                    row[field] = m.mean_stat(field)
+                writer.writerow(row)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            data = json.load(f)
+        run = cls(data['meta']['warmup'], data['meta']['repeat'])
+        run.meta = data['meta']
+        run.measurements = [Measurement.from_dict(m) for m in data['measurements']]
+        return run
+
+
+# builds and solves one puzzle, returns (nanoseconds, solver)
+def solve(make_solver, puzzle):
+    start = time.perf_counter_ns()
+    solver = make_solver(puzzle)
+    solver.solve()
+    return time.perf_counter_ns() - start, solver
+
+
+# pairs the measurements of two runs and compares their medians. a pair is a 'regression' when the candidate's
+# median is more than threshold (a fraction) slower and the two confidence intervals don't overlap, an
+# 'improvement' the other way round, and 'same' otherwise. a measurement only in the baseline is 'missing' (the
+# candidate lost it, which a regression gate has to catch), one only in the candidate is 'new'.
+# returns one dict per measurement with the name, params, both medians (None for the run without it), the ratio
+# (None unless both have it) and the verdict
+def compare(baseline, candidate, threshold=0.05):
+    before = {m.key(): m for m in baseline.measurements}
+    after = {m.key(): m for m in candidate.measurements}
+    rows = []
+    for m in candidate.measurements:
+        new = m.summary()
+        if m.key() not in before:
+            rows.append({'name': m.name, 'params': m.params, 'baseline_p50': None, 'candidate_p50': new['p50'],
+                         'ratio': None, 'verdict': 'new'})
+            continue
+        old = before[m.key()].summary()
+        ratio = new['p50'] / old['p50'] if old['p50'] > 0 else float('inf')
+        if ratio > 1 + threshold and new['ci_low'] > old['ci_high']:
+            verdict = 'regression'
+        elif ratio < 1 - threshold and new['ci_high'] < old['ci_low']:
+            verdict = 'improvement'
+        else:
+            verdict = 'same'
+        rows.append({'name': m.name, 'params': m.params, 'baseline_p50': old['p50'], 'candidate_p50': new['p50'],
+                     'ratio': ratio, 'verdict': verdict})
+    for m in baseline.measurements:
+        if m.key() not in after:
+            rows.append({'name': m.name, 'params': m.params, 'baseline_p50': m.summary()['p50'],
+                         'candidate_p50': None, 'ratio': None, 'verdict': 'missing'})
+    return rows
+
+
+# prints compare() rows as a table, regressions and missing measurements first
+def print_comparison(rows):
+    order = {'regression': 0, 'missing': 1, 'improvement': 2, 'new': 3, 'same': 4}
+
+    def ms(seconds):
+        return f"{'-':>13}" if seconds is None else f"{seconds * 1000:10.3f} ms"
+
+    for row in sorted(rows, key=lambda row: order[row['verdict']]):
+        params = ' '.join(f'{k}={v}' for k, v in row['params'].items())
+        ratio = '' if row['ratio'] is None else f"x{row['ratio']:.3f}"
+        print(f"{row['verdict']:<12} {row['name']:<16} {params:<32} "
+              f"{ms(row['baseline_p50'])} -> {ms(row['candidate_p50'])}  {ratio}".rstrip())
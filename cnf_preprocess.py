@@ -0,0 +1,124 @@
+import pycosat
+import time
+from collections import defaultdict
+
+# cnf simplification shared by the sat based solvers (queens and mini sudoku), run right before pycosat.
+# removes duplicate and tautological clauses, propagates unit clauses (the givens) and drops subsumed clauses
+
+
+# normalises clauses to sorted tuples without repeated literals, dropping duplicates and tautologies
+def remove_duplicates(clauses, stats):
+    seen = set()
+    result = []
+    for clause in clauses:
+        lits = tuple(sorted(set(clause)))
+        if any(-lit in lits for lit in lits if lit > 0):
+            stats['tautologies'] += 1
+            continue
+        if lits in seen:
+            stats['duplicates'] += 1
+            continue
+        seen.add(lits)
+        result.append(lits)
+    return result
+
+
+# unit propagation. returns (remaining clauses, set of literals forced true), or (None, forced) on a conflict
+def propagate_units(clauses, stats):
+    occurrences = defaultdict(list)
+    for i, clause in enumerate(clauses):
+        for lit in clause:
+            occurrences[lit].append(i)
+
+    forced = set()
+    satisfied = [False] * len(clauses)
+    open_count = [len(clause) for clause in clauses]
+    queue = [clause[0] for clause in clauses if len(clause) == 1]
+    while queue:
+        lit = queue.pop()
+        if lit in forced:
+            continue
+        if -lit in forced:
+            return None, forced
+        forced.add(lit)
+        for i in occurrences[lit]:
+            satisfied[i] = True
+        for i in occurrences[-lit]:
+            if satisfied[i]:
+                continue
+            open_count[i] -= 1
+            if open_count[i] == 0:
+                return None, forced
+            if open_count[i] == 1:
+                # the one literal left that is not false has to be true
+                for other in clauses[i]:
+                    if -other not in forced:
+                        queue.append(other)
+                        break
+
+    result = []
+    for i, clause in enumerate(clauses):
+        if satisfied[i]:
+            stats['satisfied'] += 1
+            continue
+        reduced = tuple(lit for lit in clause if -lit not in forced)
+        if len(reduced) < len(clause):
+            stats['strengthened'] += 1
+        result.append(reduced)
+    return result, forced
+
+
+# drops every clause that is a superset of another clause (the smaller one already implies it), and all but one
+# copy of the clauses that propagate_units shortened into the same clause
+def remove_subsumed(clauses, stats):
+    occurrences = defaultdict(list)
+    for i, clause in enumerate(clauses):
+        for lit in clause:
+            occurrences[lit].append(i)
+
+    removed = [False] * len(clauses)
+    sets = [frozenset(clause) for clause in clauses]
+    for i in sorted(range(len(clauses)), key=lambda i: len(clauses[i])):
+        if removed[i]:
+            continue
+        # any clause containing clauses[i] also contains its rarest literal
+        rarest = min(clauses[i], key=lambda lit: len(occurrences[lit]))
+        for j in occurrences[rarest]:
+            if j != i and not removed[j] and len(clauses[j]) >= len(clauses[i]) and sets[i] <= sets[j]:
+                removed[j] = True
+                stats['subsumed'] += 1
+    return [clause for i, clause in enumerate(clauses) if not removed[i]]
+
+
+# runs all passes. returns (clauses, forced literals, stats), clauses is None if the formula is unsatisfiable
+def simplify(clauses):
+    stats = defaultdict(int)
+    clauses = list(clauses)
+    stats['input_clauses'] = len(clauses)
+    clauses = remove_duplicates(clauses, stats)
+    clauses, forced = propagate_units(clauses, stats)
+    if clauses is None:
+        stats['unsat'] = True
+        stats['output_clauses'] = 0
+        return None, forced, dict(stats)
+    clauses = remove_subsumed(clauses, stats)
+    stats['forced_literals'] = len(forced)
+    stats['output_clauses'] = len(clauses)
+    stats['removed_clauses'] = stats['input_clauses'] - len(clauses)
+    return clauses, forced, dict(stats)
+
+
+# drop-in replacement for pycosat.solve that simplifies first and puts the forced literals back into the model.
+# returns (solution or 'UNSAT', stats), stats['simplify_time'] being the seconds spent in simplify
+def solve(clauses, num_vars):
+    start = time.perf_counter()
+    simplified, forced, stats = simplify(clauses)
+    stats['simplify_time'] = time.perf_counter() - start
+    if simplified is None:
+        return 'UNSAT', stats
+    solution = pycosat.solve(simplified, vars=num_vars)
+    if solution == 'UNSAT':
+        return solution, stats
+    for lit in forced:
+        solution[abs(lit) - 1] = lit
+    return solution, stats
@@ -0,0 +1,217 @@
+import json
+import struct
+
+import numpy as np
+
+# benchmark corpus: fixed sets of puzzles for every game and size in one binary file, so engines are compared on
+# the same inputs and no time goes to generating them. every puzzle is one fixed-length uint8 record, so a section
+# (one game and size) is a (count, record size) array that Corpus memory-maps and decodes one record at a time.
+#
+# file layout: MAGIC, the json header length as a little-endian uint64, the json header, then the sections, each
+# starting at a multiple of ALIGN. the header maps "game/size" to the section's offset, count and record size
+#
+# records, n being the size:
+#   mini_sudoku  the 36 cells as 4-bit values (0 empty), size is the number of givens
+#   queens       the n * n region numbers as bytes, then the column of the queen in each row of the solution
+#   tango        2-bit codes for the n * n cells (0 empty, 1 moon, 2 sun), then for each neighbouring pair,
+#                first (r, c)-(r, c + 1) then (r, c)-(r + 1, c), row by row (0 none, 1 equals, 2 diffs)
+#   zip          the n * n numbers as bytes, then one bit per neighbouring pair in the same order, set for a wall
+
+MAGIC = b'PUZZLECORPUS1\n'
+ALIGN = 64
+
+
+# packs values of bits bits each (1, 2 or 4) into bytes, lowest bits first
+def pack(values, bits):
+    per = 8 // bits
+    values = np.asarray(values, dtype=np.uint16).ravel()
+    values = np.concatenate([values, np.zeros(-len(values) % per, dtype=np.uint16)])
+    shifts = np.arange(per, dtype=np.uint16) * bits
+    return (values.reshape(-1, per) << shifts).sum(axis=1).astype(np.uint8)
+
+
+# the first length values of bits bits each from packed bytes
+def unpack(data, bits, length):
+    per = 8 // bits
+    shifts = np.arange(per, dtype=np.uint8) * bits
+    values = (np.asarray(data, dtype=np.uint8)[:, None] >> shifts) & ((1 << bits) - 1)
+    return values.ravel()[:length]
+
+
+def packed_length(length, bits):
+    return -(-length * bits // 8)
+
+
+# number of neighbouring pairs on an n x n board
+def pair_count(n):
+    return 2 * n * (n - 1)
+
+
+def encode_mini_sudoku(grid):
+    return pack(grid, 4)
+
+
+def decode_mini_sudoku(record, size):
+    return unpack(record, 4, 36).reshape(6, 6).tolist()
+
+
+# a queens puzzle is (grid, solution), the solution being the queen positions in row order
+def encode_queens(puzzle):
+    grid, solution = puzzle
+    columns = [c for _, c in sorted(solution)]
+    return np.concatenate([np.asarray(grid, dtype=np.uint8).ravel(), np.asarray(columns, dtype=np.uint8)])
+
+
+def decode_queens(record, n):
+    grid = record[:n * n].reshape(n, n).tolist()
+    return grid, [(r, int(c)) for r, c in enumerate(record[n * n:n * n + n])]
+
+
+# markers as two arrays of codes, one for the pairs to the right of each cell and one for the pairs below
+def tango_marker_codes(n, equals, diffs):
+    right = np.zeros((n, n - 1), dtype=np.uint8)
+    down = np.zeros((n - 1, n), dtype=np.uint8)
+    for code, pairs in ((1, equals), (2, diffs)):
+        for a, b in pairs:
+            (r1, c1), (r2, c2) = min(a, b), max(a, b)
+            if r1 == r2:
+                right[r1, c1] = code
+            else:
+                down[r1, c1] = code
+    return right, down
+
+
+# a tango puzzle is (grid, equals, diffs), markers have to be between neighbouring cells
+def encode_tango(puzzle):
+    grid, equals, diffs = puzzle
+    n = len(grid)
+    right, down = tango_marker_codes(n, equals, diffs)
+    cells = np.asarray(grid, dtype=np.int8).ravel() + 1
+    return np.concatenate([pack(cells, 2), pack(np.concatenate([right.ravel(), down.ravel()]), 2)])
+
+
+def decode_tango(record, n):
+    cells_length = packed_length(n * n, 2)
+    grid = (unpack(record[:cells_length], 2, n * n).astype(np.int8) - 1).reshape(n, n).tolist()
+    codes = unpack(record[cells_length:], 2, pair_count(n))
+    right = codes[:n * (n - 1)].reshape(n, n - 1)
+    down = codes[n * (n - 1):].reshape(n - 1, n)
+    markers = {1: [], 2: []}
+    for r, c in zip(*np.nonzero(right)):
+        markers[right[r, c]].append(((int(r), int(c)), (int(r), int(c) + 1)))
+    for r, c in zip(*np.nonzero(down)):
+        markers[down[r, c]].append(((int(r), int(c)), (int(r) + 1, int(c))))
+    return grid, markers[1], markers[2]
+
+
+# a zip puzzle is (grid, walls)
+def encode_zip(puzzle):
+    grid, walls = puzzle
+    n = len(grid)
+    right = np.zeros((n, n - 1), dtype=np.uint8)
+    down = np.zeros((n - 1, n), dtype=np.uint8)
+    for a, b in walls:
+        (r1, c1), (r2, c2) = min(a, b), max(a, b)
+        if r1 == r2 and c2 == c1 + 1:
+            right[r1, c1] = 1
+        elif c1 == c2 and r2 == r1 + 1:
+            down[r1, c1] = 1
+    walls = pack(np.concatenate([right.ravel(), down.ravel()]), 1)
+    return np.concatenate([np.asarray(grid, dtype=np.uint8).ravel(), walls])
+
+
+def decode_zip(record, n):
+    grid = record[:n * n].reshape(n, n).tolist()
+    bits = unpack(record[n * n:], 1, pair_count(n))
+    right = bits[:n * (n - 1)].reshape(n, n - 1)
+    down = bits[n * (n - 1):].reshape(n - 1, n)
+    walls = {((int(r), int(c)), (int(r), int(c) + 1)) for r, c in zip(*np.nonzero(right))}
+    walls |= {((int(r), int(c)), (int(r) + 1, int(c))) for r, c in zip(*np.nonzero(down))}
+    return grid, walls
+
+
+# game -> (encode, decode, record size for a size)
+GAMES = {
+    'mini_sudoku': (encode_mini_sudoku, decode_mini_sudoku, lambda p: packed_length(36, 4)),
+    'queens': (encode_queens, decode_queens, lambda n: n * n + n),
+    'tango': (encode_tango, decode_tango, lambda n: packed_length(n * n, 2) + packed_length(pair_count(n), 2)),
+    'zip': (encode_zip, decode_zip, lambda n: n * n + packed_length(pair_count(n), 1)),
+}
+
+
+def section_key(game, size):
+    return f'{game}/{size}'
+
+
+# writes a corpus to path. sections is a list of (game, size, count, puzzles), puzzles being an iterable of count
+# puzzles in the form the game's encoder takes. record sizes are fixed, so the header is written first and the
+# puzzles are streamed into the file as they are generated. meta (e.g. the seed) is stored in the header
+def write(path, sections, meta=None):
+    header = {'meta': meta or {}, 'sections': {}}
+    offset = 0
+    for game, size, count, _ in sections:
+        record = GAMES[game][2](size)
+        header['sections'][section_key(game, size)] = {'offset': offset, 'count': count, 'record': record}
+        offset += -(-count * record // ALIGN) * ALIGN
+    header_bytes = json.dumps(header).encode()
+    start = -(-(len(MAGIC) + 8 + len(header_bytes)) // ALIGN) * ALIGN
+
+    with open(path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<Q', len(header_bytes)))
+        f.write(header_bytes)
+        for game, size, count, puzzles in sections:
+            info = header['sections'][section_key(game, size)]
+            f.seek(start + info['offset'])
+            written = 0
+            for puzzle in puzzles:
+                if written == count:
+                    break
+                record = GAMES[game][0](puzzle)
+                if len(record) != info['record']:
+                    raise ValueError(f"{section_key(game, size)}: record of {len(record)} bytes, "
+                                     f"expected {info['record']}")
+                f.write(record.tobytes())
+                written += 1
+            if written != count:
+                raise ValueError(f"{section_key(game, size)}: got {written} puzzles, expected {count}")
+        # pads the last section to its full length
+        f.truncate(start + offset)
+
+
+# read side of a corpus file. sections are memory-mapped when first asked for, and puzzles are decoded one record
+# at a time, so only the puzzles being used are in memory
+class Corpus:
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a puzzle corpus")
+            (length,) = struct.unpack('<Q', f.read(8))
+            header = json.loads(f.read(length))
+        self.meta = header['meta']
+        self.sections = header['sections']
+        self.start = -(-(len(MAGIC) + 8 + length) // ALIGN) * ALIGN
+        self._arrays = {}
+
+    def __contains__(self, key):
+        return section_key(*key) in self.sections
+
+    # (count, record size) uint8 memmap of one section
+    def records(self, game, size):
+        key = section_key(game, size)
+        if key not in self._arrays:
+            info = self.sections[key]
+            self._arrays[key] = np.memmap(self.path, dtype=np.uint8, mode='r', offset=self.start + info['offset'],
+                                          shape=(info['count'], info['record']))
+        return self._arrays[key]
+
+    def count(self, game, size):
+        return self.sections[section_key(game, size)]['count']
+
+    # yields the puzzles of one section in file order, decoded like the game's generator returns them
+    def stream(self, game, size):
+        decode = GAMES[game][1]
+        for record in self.records(game, size):
+            yield decode(np.asarray(record), size)
@@ -1,11 +1,25 @@
 import pycosat
 import random
 
+import batch
+import cnf_preprocess
+import solution_stream
+import solve_stats
+
 class MiniSudokuSATSolver:
 
+    # cell, row, column and subgrid clauses are the same for every 6x6 puzzle,
+    # so they are built once per process and shared by every solver as a tuple of tuples
+    _structure_clauses = None
+
     # grid is a 6x6 list of lists with integers 0-6, 0 = empty
-    def __init__(self, grid):
+    # preprocess=True runs cnf_preprocess before pycosat, what it removed ends up in self.preprocess_stats
+    # stats is a solve_stats.SolveStats with the timings and model size of solve()
+    def __init__(self, grid, preprocess=False):
         self.grid = grid
+        self.preprocess = preprocess
+        self.preprocess_stats = None
+        self.stats = solve_stats.SolveStats(type(self).__name__)
         # grid should be 6x6
         if len(grid) != 6 or any(len(row) != 6 for row in grid):
             raise ValueError("Grid must be 6x6")
@@ -67,15 +81,39 @@ class MiniSudokuSATSolver:
                             r2, c2 = positions[i2]
                             self.clauses.append([-self.x(r1, c1, v), -self.x(r2, c2, v)])
 
+    # returns the cached structural CNF, building it on first use
+    @classmethod
+    def structure_clauses(cls):
+        if cls._structure_clauses is None:
+            builder = cls([[0] * 6 for _ in range(6)])
+            builder.add_cell_constraints()
+            builder.add_row_col_subgrid_constraints()
+            cls._structure_clauses = tuple(tuple(clause) for clause in builder.clauses)
+        return cls._structure_clauses
+
     def solve(self):
-        self.add_givens()
-        self.add_cell_constraints()
-        self.add_row_col_subgrid_constraints()
+        stats = self.stats
+        # only the givens are built per puzzle, the rest comes from the shared template
+        stats.timed(self.add_givens)
         
-        solution = pycosat.solve(self.clauses)
+        clauses = stats.timed(self.structure_clauses) + tuple(self.clauses)
+        stats.variables = 6 * 6 * 6
+        stats.constraints = len(clauses)
+        with stats.search():
+            if self.preprocess:
+                solution, self.preprocess_stats = cnf_preprocess.solve(clauses, 6 * 6 * 6)
+            else:
+                solution = pycosat.solve(clauses)
+        if self.preprocess:
+            stats.read_preprocess(self.preprocess_stats)
         if solution == 'UNSAT':
+            stats.finish('unsat')
             return None
-        
+        stats.finish('solved')
+        return self.grid_from(solution)
+
+    # 6x6 grid of values of a pycosat solution
+    def grid_from(self, solution):
         result_grid = [[0 for _ in range(6)] for _ in range(6)]
         for r in range(6):
             for c in range(6):
@@ -83,56 +121,104 @@ class MiniSudokuSATSolver:
                     if solution[self.x(r, c, v) - 1] > 0:
                         result_grid[r][c] = v
                         break
-        return result_grid  
-    
-    # generate a mini sudoku puzzle with p pieces and exactly 1 solution a la homework 1
-    def generate_mini_sudoku(self, p):
-        # implement this algorithm by generating a full solution and removing numbers, and using our sat model to ensure uniqueness
-        board = [list(range(1, 7)) for _ in range(6)]
+        return result_grid
+
+    # yields every completed grid lazily, at most limit of them. the cnf has no auxiliary variables,
+    # so this is one incremental picosat run with a blocking clause per solution
+    def iter_solutions(self, limit=None):
+        self.clauses = []
+        self.add_givens()
+        clauses = self.structure_clauses() + tuple(self.clauses)
+        for solution in solution_stream.iter_sat_solutions(clauses, 6 * 6 * 6, limit=limit):
+            yield self.grid_from(solution)
+
+    # true if the puzzle has exactly one solution, stops looking at the second one
+    def is_unique(self):
+        return sum(1 for _ in self.iter_solutions(limit=2)) == 1
+
+    # builds the shared clause template, batch workers call this before their first puzzle
+    @classmethod
+    def warm_up(cls):
+        cls.structure_clauses()
+
+    # solves many puzzles across a process pool, yielding (index, solution) in completion order
+    # each puzzle is a tuple of constructor arguments, (grid,). see batch.solve_many
+    @classmethod
+    def solve_many(cls, puzzles, workers=None):
+        return batch.solve_many(cls, puzzles, workers)
+
+    # builds a random complete 6x6 solution, rng is a random.Random (the random module by default)
+    def random_full_board(self, rng=random):
+        # base pattern is a valid solution: each row is shifted by 3 inside a row group and by 1 between groups
+        board = [[((r % 2) * 3 + r // 2 + c) % 6 + 1 for c in range(6)] for r in range(6)]
         # randomly shuffle rows and columns within their groups
         num_shuffles = 50
         for _ in range(num_shuffles):
             # shuffle rows within row groups
             for rg in range(3):
-                r1 = random.randint(0, 1) + rg * 2
-                r2 = random.randint(0, 1) + rg * 2
+                r1 = rng.randint(0, 1) + rg * 2
+                r2 = rng.randint(0, 1) + rg * 2
                 board[r1], board[r2] = board[r2], board[r1]
             # shuffle columns within column groups
             for cg in range(2):
-                c1 = random.randint(0, 2) + cg * 3
-                c2 = random.randint(0, 2) + cg * 3
+                c1 = rng.randint(0, 2) + cg * 3
+                c2 = rng.randint(0, 2) + cg * 3
                 for r in range(6):
                     board[r][c1], board[r][c2] = board[r][c2], board[r][c1]
+        return board
 
-        # remove numbers until only p pieces remain, ensuring uniqueness
-        cells = [(r, c) for r in range(6) for c in range(6)]
-        random.shuffle(cells)
-        num_remaining = 36
-        fails = 0
-        to_try = 0
-        while num_remaining > p:
-            r, c = cells[to_try]
-            original_value = board[r][c]
-            board[r][c] = 0
-            self.grid = board
-            self.clauses = []
-            self.add_givens()
-            self.add_cell_constraints()
-            self.add_row_col_subgrid_constraints()
-            solution = pycosat.solve(self.clauses)
-            # check if solution is unique by adding constraints to exclude the original solution
-            new_constraint = [-self.x(r, c, v) for r in range(6) for c in range(6) for v in range(1, 7) if board[r][c] == v]
-            self.clauses.append(new_constraint)
-            second_solution = pycosat.solve(self.clauses)
-            if second_solution != 'UNSAT':
-                # not unique, restore the value
-                board[r][c] = original_value
-                to_try += 1
-                if to_try >= len(cells):
-                    return self.generate_mini_sudoku(p)
-            else:
-                # solution unique, removal successful
-                cells.remove((r, c))
-                num_remaining -= 1
-                to_try = 0
-        return board
\ No newline at end of file
+    # generate a mini sudoku puzzle with p pieces and exactly 1 solution a la homework 1
+    # incremental=True uses generate_mini_sudoku_incremental, which needs one small solve per removal
+    def generate_mini_sudoku(self, p, incremental=False):
+        if incremental:
+            return self.generate_mini_sudoku_incremental(p)
+        # implement this algorithm by generating a full solution and removing numbers, and using our sat model to ensure uniqueness
+        # a board that gets stuck above p pieces is thrown away and the loop starts over with a new one
+        while True:
+            board = self.random_full_board()
+
+            # remove numbers until only p pieces remain, ensuring uniqueness
+            cells = [(r, c) for r in range(6) for c in range(6)]
+            random.shuffle(cells)
+            num_remaining = 36
+            to_try = 0
+            while num_remaining > p and to_try < len(cells):
+                r, c = cells[to_try]
+                original_value = board[r][c]
+                board[r][c] = 0
+                self.grid = board
+                if not self.is_unique():
+                    # not unique, restore the value
+                    board[r][c] = original_value
+                    to_try += 1
+                else:
+                    # solution unique, removal successful
+                    cells.remove((r, c))
+                    num_remaining -= 1
+                    to_try = 0
+            if num_remaining <= p:
+                return board
+
+    # same result as generate_mini_sudoku, but the structural CNF is never rebuilt. givens are passed as unit
+    # clauses next to the cached template (pycosat has no persistent solver or assumption interface), and
+    # each removal costs a single solve: the puzzle before the removal has exactly one solution, so any other
+    # solution after removing (r, c) must put a different value there, and blocking the old value is enough
+    def generate_mini_sudoku_incremental(self, p):
+        structure = self.structure_clauses()
+        while True:
+            board = self.random_full_board()
+            givens = {(r, c): board[r][c] for r in range(6) for c in range(6)}
+            cells = list(givens)
+            random.shuffle(cells)
+            # removing more cells only adds solutions, so a cell that failed once can never be removed later
+            # and one pass over the cells is enough
+            for r, c in cells:
+                if len(givens) <= p:
+                    break
+                v = givens.pop((r, c))
+                assumptions = tuple((self.x(gr, gc, gv),) for (gr, gc), gv in givens.items())
+                if pycosat.solve(structure + assumptions + ((-self.x(r, c, v),),)) != 'UNSAT':
+                    # not unique, restore the value
+                    givens[(r, c)] = v
+            if len(givens) <= p:
+                return [[givens.get((r, c), 0) for c in range(6)] for r in range(6)]
@@ -1,11 +1,26 @@
+import math
+import numpy as np
 import pycosat
 from collections import defaultdict
+from itertools import chain
+
+import batch
+import cnf_preprocess
+import solution_stream
+import solve_stats
 
 class QueensSATSolver:
 
+    # at-most-one encodings that can be selected with amo_encoding
+    AMO_ENCODINGS = ('pairwise', 'sequential', 'commander', 'product')
 
     # takes in a grid (2d array) and a list of queen positions. grid should have numbers 1-n, where each number represents a region
-    def __init__(self, grid, queens):
+    # amo_encoding picks how "at most one queen" is written as clauses for rows, columns and regions
+    # vectorized=True builds the clauses with numpy (build_clauses_vectorized) instead of the add_* methods
+    # preprocess=True runs cnf_preprocess before pycosat, what it removed ends up in self.preprocess_stats
+    # presolve=True places forced queens with propagate() first and only sends the leftover board to sat
+    # stats is a solve_stats.SolveStats with the timings and model size of solve()
+    def __init__(self, grid, queens, amo_encoding='pairwise', vectorized=False, preprocess=False, presolve=False):
         self.grid = grid
         self.size = len(grid)
         self.regions = defaultdict(list)
@@ -16,12 +31,85 @@ class QueensSATSolver:
         if self.size != len(self.regions.keys()):
             raise ValueError("Number of regions must equal grid size")
         self.queens = queens
+        if amo_encoding not in self.AMO_ENCODINGS:
+            raise ValueError(f"Unknown at-most-one encoding: {amo_encoding}")
+        self.amo_encoding = amo_encoding
+        self.vectorized = vectorized
+        self.preprocess = preprocess
+        self.preprocess_stats = None
+        self.presolve = presolve
+        self.stats = solve_stats.SolveStats(type(self).__name__)
         self.clauses = []
+        # (m, 2) int32 array of binary clauses, only filled by build_clauses_vectorized
+        self.binary_clauses = np.zeros((0, 2), dtype=np.int32)
+        # cell variables are 1..n^2, auxiliary variables from the amo encodings come after them
+        self.num_vars = self.size * self.size
     
     def x(self, r, c):
         # variable number for cell (r, c). false if no queen, true if queen
         return r * self.size + c + 1
-    
+
+    # allocates a fresh auxiliary variable
+    def new_var(self):
+        self.num_vars += 1
+        return self.num_vars
+
+    # adds clauses so that at most one of lits is true, using the selected encoding
+    def at_most_one(self, lits):
+        if self.amo_encoding == 'pairwise' or len(lits) <= 4:
+            self.amo_pairwise(lits)
+        elif self.amo_encoding == 'sequential':
+            self.amo_sequential(lits)
+        elif self.amo_encoding == 'commander':
+            self.amo_commander(lits)
+        else:
+            self.amo_product(lits)
+
+    # one binary clause per pair, O(k^2) clauses and no extra variables
+    def amo_pairwise(self, lits):
+        for i in range(len(lits)):
+            for j in range(i + 1, len(lits)):
+                self.clauses.append([-lits[i], -lits[j]])
+
+    # sequential counter (Sinz 2005): s_i is true if one of the first i literals is true, O(k) clauses and k-1 variables
+    def amo_sequential(self, lits):
+        k = len(lits)
+        s = [self.new_var() for _ in range(k - 1)]
+        self.clauses.append([-lits[0], s[0]])
+        for i in range(1, k - 1):
+            self.clauses.append([-lits[i], s[i]])
+            self.clauses.append([-s[i - 1], s[i]])
+            self.clauses.append([-lits[i], -s[i - 1]])
+        self.clauses.append([-lits[k - 1], -s[k - 2]])
+
+    # commander encoding (Klieber and Kwon 2007): pairwise inside groups of 3, then recurse on one commander per group
+    def amo_commander(self, lits, group_size=3):
+        commanders = []
+        for g in range(0, len(lits), group_size):
+            group = lits[g:g + group_size]
+            self.amo_pairwise(group)
+            cmd = self.new_var()
+            # commander is true exactly when some literal of its group is true
+            self.clauses.append([-cmd] + group)
+            for lit in group:
+                self.clauses.append([-lit, cmd])
+            commanders.append(cmd)
+        self.at_most_one(commanders)
+
+    # product encoding (Chen 2010): place literals on a p x q grid, at most one row and at most one column can be used
+    def amo_product(self, lits):
+        k = len(lits)
+        p = math.ceil(math.sqrt(k))
+        q = math.ceil(k / p)
+        u = [self.new_var() for _ in range(p)]
+        v = [self.new_var() for _ in range(q)]
+        for idx, lit in enumerate(lits):
+            i, j = divmod(idx, q)
+            self.clauses.append([-lit, u[i]])
+            self.clauses.append([-lit, v[j]])
+        self.at_most_one(u)
+        self.at_most_one(v)
+
     # enforce given queens in the grid
     def add_givens(self):    
         for queen in self.queens:
@@ -33,15 +121,11 @@ class QueensSATSolver:
             # at least one queen in each row
             self.clauses.append([self.x(i, c) for c in range(self.size)])
             # at most one queen in each row
-            for c1 in range(self.size):
-                for c2 in range(c1 + 1, self.size):
-                    self.clauses.append([-self.x(i, c1), -self.x(i, c2)])
+            self.at_most_one([self.x(i, c) for c in range(self.size)])
             # at least one queen in each column
             self.clauses.append([self.x(r, i) for r in range(self.size)])
             # at most one queen in each column
-            for r1 in range(self.size):
-                for r2 in range(r1 + 1, self.size):
-                    self.clauses.append([-self.x(r1, i), -self.x(r2, i)])
+            self.at_most_one([self.x(r, i) for r in range(self.size)])
     
     def add_regions_constraints(self):
         # exactly one queen in each region
@@ -49,11 +133,7 @@ class QueensSATSolver:
             # at least one queen in the region
             self.clauses.append([self.x(r, c) for (r, c) in region_cells])
             # at most one queen in the region
-            for i in range(len(region_cells)):
-                for j in range(i + 1, len(region_cells)):
-                    r1, c1 = region_cells[i]
-                    r2, c2 = region_cells[j]
-                    self.clauses.append([-self.x(r1, c1), -self.x(r2, c2)])
+            self.at_most_one([self.x(r, c) for (r, c) in region_cells])
     
     def no_two_touching(self):
         # no two queens can be adjacent (including diagonals)
@@ -67,18 +147,269 @@ class QueensSATSolver:
                         c2 = c1 + dc
                         if 0 <= r2 < self.size and 0 <= c2 < self.size:
                             self.clauses.append([-self.x(r1, c1), -self.x(r2, c2)])
-    def solve(self):
+
+    # builds the same constraints as the add_* methods and no_two_touching with numpy broadcasting.
+    # binary clauses go into self.binary_clauses as one int32 array, the n-ary ones stay in self.clauses
+    def build_clauses_vectorized(self):
+        n = self.size
+        cells = np.arange(1, n * n + 1, dtype=np.int32).reshape(n, n)
+        # group cell variables by region with one stable sort instead of walking the grid
+        labels = np.asarray(self.grid).ravel()
+        order = np.argsort(labels, kind='stable')
+        _, counts = np.unique(labels, return_counts=True)
+        region_vars = np.split(cells.ravel()[order], np.cumsum(counts)[:-1])
+
         self.add_givens()
-        self.add_rows_cols_constraints()
-        self.add_regions_constraints()
-        self.no_two_touching()
-        solution = pycosat.solve(self.clauses)
+        # at least one queen in each row, column and region
+        self.clauses.extend(cells.tolist())
+        self.clauses.extend(cells.T.tolist())
+        self.clauses.extend(rv.tolist() for rv in region_vars)
+
+        pairs = []
+        if self.amo_encoding == 'pairwise':
+            # every pair inside a row / column is picked out with the upper triangle indices
+            i, j = np.triu_indices(n, 1)
+            pairs.append(np.stack([cells[:, i], cells[:, j]], axis=-1).reshape(-1, 2))
+            pairs.append(np.stack([cells.T[:, i], cells.T[:, j]], axis=-1).reshape(-1, 2))
+            for rv in region_vars:
+                i, j = np.triu_indices(len(rv), 1)
+                pairs.append(np.stack([rv[i], rv[j]], axis=1))
+        else:
+            # the other encodings need auxiliary variables, so they go through at_most_one
+            for line in chain(cells.tolist(), cells.T.tolist()):
+                self.at_most_one(line)
+            for rv in region_vars:
+                self.at_most_one(rv.tolist())
+        # no two touching: each diagonal pair once. orthogonal neighbours share a row or column and are already covered
+        pairs.append(np.stack([cells[:-1, :-1].ravel(), cells[1:, 1:].ravel()], axis=1))
+        pairs.append(np.stack([cells[:-1, 1:].ravel(), cells[1:, :-1].ravel()], axis=1))
+        self.binary_clauses = -np.concatenate(pairs)
+
+    # total number of clauses built so far
+    def clause_count(self):
+        return len(self.clauses) + len(self.binary_clauses)
+
+    # all clauses for pycosat. the binary array is converted in blocks so only one block of lists exists at a time
+    def iter_clauses(self, block=4096):
+        yield from self.clauses
+        for start in range(0, len(self.binary_clauses), block):
+            yield from self.binary_clauses[start:start + block].tolist()
+
+    # hands the clauses built so far to pycosat, through cnf_preprocess if preprocess is on
+    def run_sat(self):
+        stats = self.stats
+        stats.variables = self.num_vars
+        stats.constraints = self.clause_count()
+        with stats.search():
+            if self.preprocess:
+                solution, self.preprocess_stats = cnf_preprocess.solve(self.iter_clauses(), self.num_vars)
+            else:
+                solution = pycosat.solve(self.iter_clauses(), vars=self.num_vars)
+        if self.preprocess:
+            stats.read_preprocess(self.preprocess_stats)
+        return solution
+
+    # deduces queens from the regions map without sat. repeats until nothing changes:
+    #  - a queen removes its row, column, region and the 8 touching cells from the candidates
+    #  - a row, column or region with one candidate left gets a queen
+    #  - a region whose candidates all sit in one row (or column) takes that row (column) from every other region,
+    #    and a row (or column) whose candidates all sit in one region takes that region from every other row (column)
+    # cells are bits of one int (bit r * n + c) so every rule is a few mask operations
+    # returns (placed queens, remaining candidate cells), or None if the board has no solution
+    def propagate(self):
+        n = self.size
+        rows = [((1 << n) - 1) << (r * n) for r in range(n)]
+        cols = [sum(1 << (r * n) for r in range(n)) << c for c in range(n)]
+        regions = [sum(1 << (r * n + c) for r, c in cells) for cells in self.regions.values()]
+        region_of = [0] * (n * n)
+        for g, cells in enumerate(self.regions.values()):
+            for r, c in cells:
+                region_of[r * n + c] = g
+
+        # every cell a queen on bit i rules out, including i itself
+        def attacks(i):
+            r, c = divmod(i, n)
+            mask = rows[r] | cols[c] | regions[region_of[i]]
+            for dr in (-1, 1):
+                if 0 <= r + dr < n:
+                    for dc in (-1, 0, 1):
+                        if 0 <= c + dc < n:
+                            mask |= 1 << ((r + dr) * n + c + dc)
+            return mask
+
+        candidates = (1 << (n * n)) - 1
+        placed = []
+        placed_mask = 0
+        for r, c in self.queens:
+            i = r * n + c
+            if not candidates >> i & 1:
+                return None
+            candidates &= ~attacks(i)
+            placed.append(i)
+            placed_mask |= 1 << i
+
+        # (unit mask, which line of a cell to look at when the unit is confined, that line's masks)
+        units = [(m, [(cols, lambda i: i % n), (regions, region_of.__getitem__)]) for m in rows]
+        units += [(m, [(rows, lambda i: i // n), (regions, region_of.__getitem__)]) for m in cols]
+        units += [(m, [(rows, lambda i: i // n), (cols, lambda i: i % n)]) for m in regions]
+        # units that already hold a queen are skipped
+        open_units = [u for u in units if not u[0] & placed_mask]
+
+        changed = True
+        while changed and len(placed) < n:
+            changed = False
+            still_open = []
+            for unit, lines in open_units:
+                cells = candidates & unit
+                if not cells:
+                    if unit & placed_mask:
+                        continue
+                    return None
+                first = (cells & -cells).bit_length() - 1
+                if cells & (cells - 1) == 0:
+                    candidates &= ~attacks(first)
+                    placed.append(first)
+                    placed_mask |= 1 << first
+                    changed = True
+                    continue
+                still_open.append((unit, lines))
+                # a unit confined to one line / region claims it
+                for masks, key in lines:
+                    line = masks[key(first)]
+                    if cells & line == cells and candidates & line & ~unit:
+                        candidates &= ~(line & ~unit)
+                        changed = True
+            open_units = still_open
+
+        placed = [divmod(i, n) for i in placed]
+        remaining = set()
+        while candidates:
+            low = candidates & -candidates
+            remaining.add(divmod(low.bit_length() - 1, n))
+            candidates ^= low
+        return placed, remaining
+
+    # sat on what propagate() left over: only the candidate cells get variables, and only the rows, columns
+    # and regions without a queen get constraints. returns the extra queens or None
+    def solve_residual(self, placed, candidates):
+        cells, var = self.stats.timed(self.build_residual, placed, candidates)
+        solution = self.run_sat()
+        if solution == 'UNSAT':
+            return None
+        return [cell for cell in cells if solution[var[cell] - 1] > 0]
+
+    # builds the residual cnf for solve_residual, returns the candidate cells and their variable numbers
+    def build_residual(self, placed, candidates):
+        region_of = {cell: region for region, cells in self.regions.items() for cell in cells}
+        cells = sorted(candidates)
+        var = {cell: i + 1 for i, cell in enumerate(cells)}
+        self.clauses = []
+        self.binary_clauses = np.zeros((0, 2), dtype=np.int32)
+        self.num_vars = len(cells)
+
+        done = {('row', r) for r, c in placed} | {('col', c) for r, c in placed} | {('region', region_of[q]) for q in placed}
+        units = defaultdict(list)
+        for cell in cells:
+            for unit in (('row', cell[0]), ('col', cell[1]), ('region', region_of[cell])):
+                if unit not in done:
+                    units[unit].append(var[cell])
+        # exactly one queen in every open unit
+        for lits in units.values():
+            self.clauses.append(lits)
+            self.at_most_one(lits)
+        # diagonal neighbours, orthogonal ones already share a row or column
+        for r, c in cells:
+            for dc in (-1, 1):
+                if (r + 1, c + dc) in var:
+                    self.clauses.append([-var[(r, c)], -var[(r + 1, c + dc)]])
+        return cells, var
+
+    def solve(self):
+        if self.presolve:
+            deduced = self.stats.timed(self.propagate)
+            if deduced is None:
+                self.stats.finish('unsat')
+                return None
+            placed, candidates = deduced
+            if len(placed) < self.size:
+                rest = self.solve_residual(placed, candidates)
+                if rest is None:
+                    self.stats.finish('unsat')
+                    return None
+                placed = placed + rest
+            self.stats.finish('solved')
+            return sorted(placed)
+
+        self.build_clauses()
+        solution = self.run_sat()
         if solution == 'UNSAT':
+            self.stats.finish('unsat')
             return None
-        
+        self.stats.finish('solved')
+        return self.queens_from(solution)
+
+    # (re)builds the full cnf for the board, with numpy if vectorized is on
+    def build_clauses(self):
+        self.clauses = []
+        self.binary_clauses = np.zeros((0, 2), dtype=np.int32)
+        self.num_vars = self.size * self.size
+        timed = self.stats.timed
+        if self.vectorized:
+            timed(self.build_clauses_vectorized)
+        else:
+            timed(self.add_givens)
+            timed(self.add_rows_cols_constraints)
+            timed(self.add_regions_constraints)
+            timed(self.no_two_touching)
+
+    # queen positions of a pycosat solution, in row order
+    def queens_from(self, solution):
         result_queens = []
         for r in range(self.size):
             for c in range(self.size):
                 if solution[self.x(r, c) - 1] > 0:
                     result_queens.append((r, c))
-        return result_queens
\ No newline at end of file
+        return result_queens
+
+    # yields every solution (list of queen positions) lazily, at most limit of them.
+    # solutions are blocked on the cell variables only, so the amo encodings' auxiliary variables never repeat one
+    def iter_solutions(self, limit=None):
+        self.build_clauses()
+        for solution in solution_stream.iter_sat_solutions(self.iter_clauses(), self.num_vars,
+                                                           self.size * self.size, limit):
+            yield self.queens_from(solution)
+
+    # true if the board has exactly one solution, stops looking at the second one
+    def is_unique(self):
+        return sum(1 for _ in self.iter_solutions(limit=2)) == 1
+
+    # a solution other than known (a list of queen positions), or None if known is the only one.
+    # a single solve with known blocked, for generators that already have one solution.
+    # with presolve on, the queens propagate() places are in every solution and only the residual is solved
+    def other_solution(self, known):
+        if self.presolve:
+            deduced = self.propagate()
+            if deduced is None:
+                return None
+            placed, candidates = deduced
+            if len(placed) == self.size:
+                return None if sorted(placed) == sorted(known) else sorted(placed)
+            cells, var = self.build_residual(placed, candidates)
+            self.clauses.append([-var[cell] for cell in known if cell in var])
+            solution = self.run_sat()
+            if solution == 'UNSAT':
+                return None
+            return sorted(placed + [cell for cell in cells if solution[var[cell] - 1] > 0])
+
+        self.build_clauses()
+        self.clauses.append([-self.x(r, c) for r, c in known])
+        solution = self.run_sat()
+        if solution == 'UNSAT':
+            return None
+        return self.queens_from(solution)
+
+    # solves many puzzles across a process pool, yielding (index, solution) in completion order
+    # each puzzle is a tuple of constructor arguments, (grid, queens). see batch.solve_many
+    @classmethod
+    def solve_many(cls, puzzles, workers=None):
+        return batch.solve_many(cls, puzzles, workers)
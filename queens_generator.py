@@ -0,0 +1,271 @@
+import random
+
+from queens import QueensSATSolver
+
+# queens boards with exactly one solution that QueensSATSolver.propagate() can't finish on its own, with every
+# region at least 2 cells.
+#
+# the solution is planted first: one queen per row and column with no two queens touching, i.e. a permutation
+# whose neighbouring entries differ by more than 1. boards up to BLOCK wide are grown around it directly (grow_block):
+# every region starts as its queen and the smallest region takes one neighbouring free cell at a time, but only if
+# the board so far still has one solution, counting a free cell as part of no region. adding a cell can only add
+# solutions (those with a queen on it), so each step is one search for a queen on the new cell. when no free cell
+# can go anywhere, a cell of one of the solutions that got in the way is given back, which rules that solution out.
+#
+# bigger boards are blocks of such boards along the diagonal (compose). the regions of the first block fill its
+# square, so its queens take all of the square's rows and columns and the other blocks' regions can't use them.
+# the same goes for every later block once the ones before it are placed, so the board has one solution as long as
+# every block has. the cells outside the squares go to regions of a block after one of the two blocks whose rows and
+# columns they're in, which is what keeps that argument intact, again the smallest region first
+
+# widest board grown in one piece. the search per step and the dead ends grow quickly past this
+BLOCK = 8
+
+
+def neighbours(n, r, c):
+    for nr, nc in ((r, c + 1), (r + 1, c), (r, c - 1), (r - 1, c)):
+        if 0 <= nr < n and 0 <= nc < n:
+            yield nr, nc
+
+
+# random permutation of range(n) with neighbouring entries more than 1 apart, as a list perm where the queen of
+# row r is in column perm[r]. iterative backtracking in a random order, raises ValueError for n = 2 and 3
+def non_touching_permutation(n, rng):
+    perm = []
+    used = [False] * n
+    # options[r] holds the columns left to try in row r, last one first
+    options = []
+    while len(perm) < n:
+        if len(options) == len(perm):
+            row = [c for c in range(n) if not used[c] and (not perm or abs(c - perm[-1]) > 1)]
+            rng.shuffle(row)
+            options.append(row)
+        if options[-1]:
+            c = options[-1].pop()
+            perm.append(c)
+            used[c] = True
+            continue
+        # dead end, step back a row
+        options.pop()
+        if not perm:
+            raise ValueError(f"No non-touching queen placement for n = {n}")
+        used[perm.pop()] = False
+    return perm
+
+
+# attacks[i] is the mask of the cells a queen on cell i (bit r * n + c) rules out: its row, column and the 8
+# touching cells, i included
+def attack_masks(n):
+    attacks = []
+    for r in range(n):
+        for c in range(n):
+            mask = ((1 << n) - 1) << (r * n)
+            for i in range(n):
+                mask |= 1 << (i * n + c)
+            for i in range(max(r - 1, 0), min(r + 2, n)):
+                for j in range(max(c - 1, 0), min(c + 2, n)):
+                    mask |= 1 << (i * n + j)
+            attacks.append(mask)
+    return attacks
+
+
+# one queen on a cell of every mask in candidates, none attacking another, as a list of cell numbers, or None.
+# depth first, always branching on the mask with the fewest cells left
+def place_queens(candidates, attacks):
+    if not candidates:
+        return []
+    k = min(range(len(candidates)), key=lambda i: candidates[i].bit_count())
+    rest = candidates[:k] + candidates[k + 1:]
+    cells = candidates[k]
+    while cells:
+        low = cells & -cells
+        cells ^= low
+        i = low.bit_length() - 1
+        remaining = [mask & ~attacks[i] for mask in rest]
+        if all(remaining):
+            queens = place_queens(remaining, attacks)
+            if queens is not None:
+                return [i] + queens
+    return None
+
+
+# a solution with the queen of region g on cell i (regions being masks of the cells given out so far), as a list
+# of cell numbers, or None if there is none, i.e. region g can take cell i without a second solution
+def queen_on(regions, g, i, attacks):
+    candidates = [mask & ~attacks[i] for h, mask in enumerate(regions) if h != g]
+    if not all(candidates):
+        return None
+    queens = place_queens(candidates, attacks)
+    return None if queens is None else [i] + queens
+
+
+# the cells of region cut off from its queen q (a cell number) if cell i is taken out of it, i included
+def cut_off(n, region, q, i):
+    first_column = sum(1 << (r * n) for r in range(n))
+    last_column = first_column << (n - 1)
+    region &= ~(1 << i)
+    reached = frontier = 1 << q
+    while frontier:
+        grown = frontier << n | frontier >> n | (frontier & ~last_column) << 1 | (frontier & ~first_column) >> 1
+        frontier = grown & region & ~reached
+        reached |= frontier
+    return (region & ~reached) | (1 << i)
+
+
+# regions around the queens of perm, as a grid of region numbers where the queen of row r sits in region r + 1,
+# with exactly one solution. None if it got stuck, steps is how many cells may be given back before that
+def grow_block(perm, rng, steps):
+    n = len(perm)
+    attacks = attack_masks(n)
+    queens = [r * n + c for r, c in enumerate(perm)]
+    regions = [1 << q for q in queens]
+    sizes = [1] * n
+    owner = [None] * (n * n)
+    for g, q in enumerate(queens):
+        owner[q] = g
+
+    def free_neighbours(g):
+        cells = set()
+        for i in range(n * n):
+            if regions[g] >> i & 1:
+                cells.update(r * n + c for r, c in neighbours(n, *divmod(i, n)) if owner[r * n + c] is None)
+        return sorted(cells)
+
+    def give(i, g):
+        owner[i] = g
+        regions[g] |= 1 << i
+        sizes[g] += 1
+
+    # the smallest region first. a region that can't take a cell now never can, as the board only gets more
+    # solutions from here, so it drops out
+    unsafe = set()
+    growing = set(range(n))
+    while growing:
+        g = min(growing, key=lambda g: (sizes[g], rng.random()))
+        cells = [i for i in free_neighbours(g) if (i, g) not in unsafe]
+        rng.shuffle(cells)
+        for i in cells:
+            if queen_on(regions, g, i, attacks) is None:
+                give(i, g)
+                break
+            unsafe.add((i, g))
+        else:
+            growing.discard(g)
+
+    # the cells left over: give one to a neighbouring region if it can take it, otherwise take a cell of the
+    # solution that put a queen on it back out of its region
+    free = [i for i in range(n * n) if owner[i] is None]
+    while free:
+        if steps == 0:
+            return None
+        steps -= 1
+        i = rng.choice(free)
+        near = sorted({owner[r * n + c] for r, c in neighbours(n, *divmod(i, n))} - {None},
+                      key=lambda g: (sizes[g], rng.random()))
+        for g in near:
+            solution = queen_on(regions, g, i, attacks)
+            if solution is None:
+                give(i, g)
+                free.remove(i)
+                break
+        else:
+            if not near:
+                continue
+            others = [j for j in solution[1:] if j not in queens]
+            rng.shuffle(others)
+            for j in others:
+                h = owner[j]
+                if sizes[h] > 2 and cut_off(n, regions[h], queens[h], j) == 1 << j:
+                    owner[j] = None
+                    regions[h] &= ~(1 << j)
+                    sizes[h] -= 1
+                    free.append(j)
+                    break
+    return [[owner[r * n + c] + 1 for c in range(n)] for r in range(n)]
+
+
+# block widths for an n x n board, as even as possible and none wider than BLOCK
+def block_sizes(n):
+    count = -(-n // BLOCK)
+    return [n // count + (i < n % count) for i in range(count)]
+
+
+# puts blocks (grid, perm) along the diagonal, returns the n x n grid and perm. the regions of block b are numbered
+# after the rows of its queens, like in a single block
+def compose(blocks, rng):
+    n = sum(len(perm) for _, perm in blocks)
+    grid = [[0] * n for _ in range(n)]
+    perm = []
+    band = []
+    for b, (block, block_perm) in enumerate(blocks):
+        offset = len(perm)
+        for r, row in enumerate(block):
+            for c, region in enumerate(row):
+                grid[offset + r][offset + c] = offset + region
+        perm += [offset + c for c in block_perm]
+        band += [b] * len(block_perm)
+
+    sizes = [0] * n
+    cells = [[] for _ in range(n)]
+    for r in range(n):
+        for c in range(n):
+            if grid[r][c]:
+                sizes[grid[r][c] - 1] += 1
+                cells[grid[r][c] - 1].append((r, c))
+    # cell (r, c) may go to a region of a block after band[r] or band[c]
+    growing = [g for g in range(n) if band[g] > 0]
+    while growing:
+        g = min(growing, key=lambda g: (sizes[g], rng.random()))
+        options = sorted({(nr, nc) for r, c in cells[g] for nr, nc in neighbours(n, r, c)
+                          if grid[nr][nc] == 0 and min(band[nr], band[nc]) < band[g]})
+        if not options:
+            growing.remove(g)
+            continue
+        r, c = rng.choice(options)
+        grid[r][c] = g + 1
+        cells[g].append((r, c))
+        sizes[g] += 1
+    return grid, perm
+
+
+# returns (grid, queens) for an n x n board with exactly one solution, queens being that solution in row order.
+# rng is a random.Random (seeded with seed if not given). n from 4 up
+def generate_queens(n, rng=None, seed=None):
+    if rng is None:
+        rng = random.Random(seed)
+    while True:
+        blocks = []
+        for k in block_sizes(n):
+            while True:
+                perm = non_touching_permutation(k, rng)
+                # the last queen of one block and the first of the next are in neighbouring rows
+                if blocks and blocks[-1][1][-1] == len(blocks[-1][1]) - 1 and perm[0] == 0:
+                    continue
+                block = grow_block(perm, rng, 20 * k)
+                if block is not None:
+                    break
+            blocks.append((block, perm))
+        grid, perm = compose(blocks, rng) if len(blocks) > 1 else blocks[0]
+        queens = [(r, c) for r, c in enumerate(perm)]
+        sizes = {}
+        for row in grid:
+            for region in row:
+                sizes[region] = sizes.get(region, 0) + 1
+        if min(sizes.values()) < 2:
+            continue
+        solver = QueensSATSolver(grid, [])
+        if len(solver.propagate()[0]) == n:
+            continue
+        if QueensSATSolver(grid, [], presolve=True).other_solution(queens) is None:
+            return grid, queens
+
+
+if __name__ == "__main__":
+    import time
+    for n in (8, 16, 25, 32):
+        start = time.perf_counter()
+        grid, queens = generate_queens(n, seed=0)
+        elapsed = time.perf_counter() - start
+        print(f"n = {n}: {elapsed * 1000:.1f} ms")
+    for row in generate_queens(8, seed=0)[0]:
+        print(' '.join(f"{v:2d}" for v in row))
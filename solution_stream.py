@@ -0,0 +1,136 @@
+import queue
+import threading
+
+import pycosat
+
+# lazy all-solutions enumeration shared by the solvers' iter_solutions / is_unique.
+# both generators only look for the next solution when asked, so is_unique (limit=2) stops at the second one.
+# ortools is only imported once a cp-sat model is enumerated, so the pycosat solvers (queens, mini sudoku)
+# don't need it installed
+
+
+# yields the satisfying assignments of clauses one at a time, as pycosat lists of signed literals.
+# project is how many leading variables make up a solution (the puzzle cells), variables past it are
+# auxiliary encoding variables. with no auxiliary variables this is pycosat.itersolve, which keeps one picosat
+# instance and adds each blocking clause to it. otherwise itersolve would block whole assignments and yield the
+# same cells again with other auxiliary values, so each solution is blocked on the cells only and solved again
+# (pycosat has no persistent solver to add a clause to)
+def iter_sat_solutions(clauses, num_vars, project=None, limit=None):
+    if limit is not None and limit <= 0:
+        return
+    if project is None or project >= num_vars:
+        for count, solution in enumerate(pycosat.itersolve(clauses, vars=num_vars), 1):
+            yield solution
+            if count == limit:
+                return
+        return
+
+    clauses = [list(clause) for clause in clauses]
+    count = 0
+    while True:
+        solution = pycosat.solve(clauses, vars=num_vars)
+        if solution == 'UNSAT':
+            return
+        yield solution
+        count += 1
+        if count == limit:
+            return
+        clauses.append([-lit for lit in solution[:project]])
+
+
+# values of one cp-sat solution, read back with Value(var) like a CpSolver so extract_solution methods work on it
+class SolutionValues:
+
+    def __init__(self, values):
+        self.values = values
+
+    def Value(self, var):
+        return self.values[var.Index()]
+
+
+_queue_callback = None
+
+
+# the callback class, made on first use since it subclasses cp_model.CpSolverSolutionCallback.
+# it hands each solution to the generator and waits until it is taken before letting the search continue
+def queue_callback_class():
+    global _queue_callback
+    if _queue_callback is not None:
+        return _queue_callback
+    from ortools.sat.python import cp_model
+
+    class QueueCallback(cp_model.CpSolverSolutionCallback):
+
+        def __init__(self, variables, solutions, stopped):
+            super().__init__()
+            self.variables = variables
+            self.solutions = solutions
+            self.stopped = stopped
+
+        def on_solution_callback(self):
+            values = {var.Index(): self.Value(var) for var in self.variables}
+            while not self.stopped.is_set():
+                try:
+                    self.solutions.put(values, timeout=0.05)
+                    return
+                except queue.Full:
+                    pass
+            self.StopSearch()
+
+    _queue_callback = QueueCallback
+    return _queue_callback
+
+
+# yields the solutions of a cp-sat model one at a time as SolutionValues over variables.
+# the search runs with enumerate_all_solutions in a background thread and is paused in the solution callback
+# until the next solution is asked for. leaving the loop early (limit reached, break, close) stops the search.
+# solver is a configured CpSolver (e.g. from solve_profile), a default one if None. cp-sat only enumerates
+# completely with a single sequential worker, so the solver is switched to one and a profile's portfolio is dropped.
+# solutions only differing in variables not listed are yielded once
+def iter_cp_solutions(model, variables, solver=None, limit=None):
+    if limit is not None and limit <= 0:
+        return
+    if solver is None:
+        from ortools.sat.python import cp_model
+        solver = cp_model.CpSolver()
+    solver.parameters.enumerate_all_solutions = True
+    solver.parameters.num_workers = 1
+    solver.parameters.interleave_search = False
+    solver.parameters.subsolvers.clear()
+
+    solutions = queue.Queue(maxsize=1)
+    stopped = threading.Event()
+    callback = queue_callback_class()(list(variables), solutions, stopped)
+    done = object()
+
+    def search():
+        try:
+            solver.Solve(model, callback)
+        finally:
+            # the generator may have stopped reading, so don't block on a full queue here
+            while not stopped.is_set():
+                try:
+                    solutions.put(done, timeout=0.05)
+                    break
+                except queue.Full:
+                    pass
+
+    thread = threading.Thread(target=search, daemon=True)
+    thread.start()
+    seen = set()
+    try:
+        while True:
+            values = solutions.get()
+            if values is done:
+                return
+            key = tuple(values.values())
+            if key in seen:
+                continue
+            seen.add(key)
+            yield SolutionValues(values)
+            if len(seen) == limit:
+                return
+    finally:
+        stopped.set()
+        solver.StopSearch()
+        thread.join()
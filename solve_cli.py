@@ -0,0 +1,356 @@
+import argparse
+import importlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from itertools import islice
+
+import batch
+import corpus
+
+# headless bulk solver: reads puzzles from files or stdin, solves them and writes one json line per puzzle.
+# only the engines that are used get imported, and nothing here pulls in tkinter or matplotlib.
+#
+#   python solve_cli.py puzzles.jsonl more.txt --engine zip=search --workers 8 > solutions.jsonl
+#   python solve_cli.py corpus.bin --section queens/8 --section zip/6 --workers 8 > solutions.jsonl
+#
+# files starting with corpus.MAGIC are benchmark corpora (see corpus.py) and are streamed record by record, all
+# sections in file order or only the ones given with --section. their puzzles get "game/size#position" as id, and
+# queens puzzles are solved without the solution stored with them.
+#
+# any other input is text, for puzzles typed in or piped from somewhere else: every line is one puzzle, blank
+# lines and lines starting with # are skipped. a line starting with { is json, anything else is the compact
+# format. both can be mixed in one input.
+#
+# json: {"game": ..., "grid": [[...], ...]} plus, depending on the game,
+#   queens       "queens": [[r, c], ...] (given queens, optional)
+#   tango        "equals": [[[r, c], [r, c]], ...], "diffs": [...] (optional)
+#   zip          "walls": [[[r, c], [r, c]], ...] (optional)
+# grids are the solvers' own: 0 for empty in mini sudoku, region numbers 1..n in queens, 1 / 0 / -1 for
+# sun / moon / empty in tango, 0 or the number in zip. boards are square, except in zip where any rectangle
+# goes. "id" is copied to the result, "game" can be left out when --game is given
+#
+# compact: the game, the board as rows joined by /, then any extras, separated by spaces
+#   mini_sudoku  digits 1-6, . or 0 for empty           mini_sudoku 1.....2.../...
+#   queens       one character per region (any characters, numbered by first appearance), extras are given
+#                queens as r,c                          queens aabb/accb/ddcb/dddb
+#   tango        S (sun), M (moon) or . for empty, extras are markers r,c=r,c (equals) and r,cxr,c (diffs)
+#                                                       tango S....M/....../...  0,1=0,2 3,3x4,3
+#   zip          . or 0 for empty, numbers as base 36 digits (1-9 then a-z), extras are walls r,c|r,c
+#                                                       zip 1...../.2..../... 0,0|1,0
+#
+# results: {"index": position in the input, "id": ..., "game": ..., "engine": ..., "status": "solved",
+# "unsat" or "error", "solution": ..., "seconds": ...}, plus "stats" (solve_stats) with --stats and "error" with
+# the message for errors. solutions are a grid for mini sudoku and tango, queen positions for queens and the
+# path as [r, c] cells for zip. results come in completion order, or in input order with --ordered
+
+GAMES = ('mini_sudoku', 'queens', 'tango', 'zip')
+
+# game -> engine name -> (module, class, constructor keywords)
+ENGINES = {
+    'mini_sudoku': {
+        'sat': ('mini_sudoku', 'MiniSudokuSATSolver', {}),
+        'sat_preprocess': ('mini_sudoku', 'MiniSudokuSATSolver', {'preprocess': True}),
+    },
+    'queens': {
+        'sat': ('queens', 'QueensSATSolver', {}),
+        'presolve': ('queens', 'QueensSATSolver', {'presolve': True}),
+        'vectorized': ('queens', 'QueensSATSolver', {'vectorized': True}),
+    },
+    'tango': {
+        'cpsat': ('tango', 'TangoCPSATSolver', {'cached': True}),
+        'bitmask': ('tango_bitmask', 'TangoBitmaskSolver', {}),
+    },
+    'zip': {
+        'integer': ('zip_integer', 'ZipCPSATSolver', {}),
+        'boolean': ('zip_boolean', 'ZipCPSATSolver', {}),
+        'circuit': ('zip_circuit', 'ZipCPSATSolver', {}),
+        'search': ('zip_search', 'ZipSearchSolver', {}),
+    },
+}
+DEFAULT_ENGINES = {'mini_sudoku': 'sat', 'queens': 'presolve', 'tango': 'cpsat', 'zip': 'boolean'}
+# engines built on cp-sat, the only ones --profile applies to
+CP_SAT_ENGINES = {('tango', 'cpsat'), ('zip', 'integer'), ('zip', 'boolean'), ('zip', 'circuit')}
+
+
+def parse_cell(text):
+    r, c = text.split(',')
+    return int(r), int(c)
+
+
+# two cells joined by sep, e.g. '0,1=0,2'
+def parse_pair(text, sep):
+    a, b = text.split(sep)
+    return parse_cell(a), parse_cell(b)
+
+
+def pairs_from_json(pairs):
+    return [(tuple(a), tuple(b)) for a, b in pairs]
+
+
+# zip boards only have to be rectangular, every zip engine takes rows != cols
+def check_rectangle(game, grid):
+    if not grid or not grid[0] or any(len(row) != len(grid[0]) for row in grid):
+        raise ValueError(f"{game} board has to be a rectangle")
+
+
+def check_square(game, grid, size=None):
+    n = len(grid)
+    if n == 0 or any(len(row) != n for row in grid):
+        raise ValueError(f"{game} board has to be square")
+    if size is not None and n != size:
+        raise ValueError(f"{game} board has to be {size} x {size}")
+
+
+# puzzle dict {'game', 'id', 'args'} from one compact line, args being the solvers' constructor arguments
+def parse_compact(line):
+    game, board, *extras = line.split()
+    rows = board.split('/')
+    if game == 'mini_sudoku':
+        grid = [[0 if ch in '.0' else int(ch) for ch in row] for row in rows]
+        check_square(game, grid, 6)
+        args = (grid,)
+    elif game == 'queens':
+        labels = {}
+        grid = [[labels.setdefault(ch, len(labels) + 1) for ch in row] for row in rows]
+        check_square(game, grid)
+        args = (grid, [parse_cell(extra) for extra in extras])
+    elif game == 'tango':
+        symbols = {'S': 1, 'M': 0, '.': -1, '1': 1, '0': 0}
+        grid = [[symbols[ch] for ch in row] for row in rows]
+        check_square(game, grid)
+        equals = [parse_pair(extra, '=') for extra in extras if '=' in extra]
+        diffs = [parse_pair(extra, 'x') for extra in extras if 'x' in extra]
+        if len(equals) + len(diffs) != len(extras):
+            raise ValueError("tango extras have to be r,c=r,c or r,cxr,c")
+        args = (len(grid), grid, equals, diffs)
+    elif game == 'zip':
+        grid = [[0 if ch == '.' else int(ch, 36) for ch in row] for row in rows]
+        check_rectangle(game, grid)
+        args = (grid, {parse_pair(extra, '|') for extra in extras})
+    else:
+        raise ValueError(f"Unknown game: {game}")
+    return {'game': game, 'id': None, 'args': args}
+
+
+# puzzle dict from one json line, game is used when the line has no "game"
+def parse_json(line, game=None):
+    data = json.loads(line)
+    game = data.get('game', game)
+    grid = data['grid']
+    if game == 'mini_sudoku':
+        check_square(game, grid, 6)
+        args = (grid,)
+    elif game == 'queens':
+        check_square(game, grid)
+        args = (grid, [tuple(cell) for cell in data.get('queens', [])])
+    elif game == 'tango':
+        check_square(game, grid)
+        args = (len(grid), grid, pairs_from_json(data.get('equals', [])), pairs_from_json(data.get('diffs', [])))
+    elif game == 'zip':
+        check_rectangle(game, grid)
+        args = (grid, set(pairs_from_json(data.get('walls', []))))
+    else:
+        raise ValueError(f"Unknown game: {game}")
+    return {'game': game, 'id': data.get('id'), 'args': args}
+
+
+# yields a puzzle dict for every puzzle line, or {'game': None, 'id': None, 'error': message} for one that
+# doesn't parse, so a bad line shows up in the output instead of stopping the run
+def read_puzzles(lines, game=None):
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        try:
+            if line.startswith('{'):
+                yield parse_json(line, game)
+            else:
+                yield parse_compact(line)
+        except (ValueError, KeyError, TypeError, IndexError) as e:
+            yield {'game': None, 'id': None, 'error': f"Unreadable puzzle: {e}"}
+
+
+# constructor arguments from a puzzle as corpus.Corpus decodes it
+CORPUS_ARGS = {
+    'mini_sudoku': lambda grid: (grid,),
+    'queens': lambda puzzle: (puzzle[0], []),
+    'tango': lambda puzzle: (len(puzzle[0]), *puzzle),
+    'zip': lambda puzzle: puzzle,
+}
+
+
+def is_corpus(path):
+    with open(path, 'rb') as f:
+        return f.read(len(corpus.MAGIC)) == corpus.MAGIC
+
+
+# yields a puzzle dict for every puzzle of a corpus file, section by section, or only for the sections whose
+# "game/size" key is in sections when that's given
+def read_corpus(path, sections=None):
+    puzzles = corpus.Corpus(path)
+    for key in puzzles.sections:
+        if sections and key not in sections:
+            continue
+        game, size = key.split('/')
+        for i, puzzle in enumerate(puzzles.stream(game, int(size))):
+            yield {'game': game, 'id': f"{key}#{i}", 'args': CORPUS_ARGS[game](puzzle)}
+
+
+# puzzles from every file in turn, - being stdin, which is always read as text
+def read_files(files, game=None, sections=None):
+    for path in files:
+        if path == '-':
+            yield from read_puzzles(sys.stdin, game)
+        elif is_corpus(path):
+            yield from read_corpus(path, sections)
+        else:
+            with open(path) as lines:
+                yield from read_puzzles(lines, game)
+
+
+# engine classes that already ran their warm_up in this process
+_warmed = set()
+
+
+def load_engine(game, engine):
+    module, name, options = ENGINES[game][engine]
+    solver_class = getattr(importlib.import_module(module), name)
+    if solver_class not in _warmed:
+        batch.warm_up(solver_class)
+        _warmed.add(solver_class)
+    return solver_class, options
+
+
+# solves one puzzle dict with the engine picked for its game, returns the result dict
+def solve_puzzle(index, puzzle, engines, profile=None, with_stats=False):
+    result = {'index': index, 'id': puzzle['id'], 'game': puzzle['game']}
+    if 'error' in puzzle:
+        result.update(status='error', error=puzzle['error'])
+        return result
+    game = puzzle['game']
+    engine = engines[game]
+    result['engine'] = engine
+    solver = None
+    start = time.perf_counter()
+    try:
+        solver_class, options = load_engine(game, engine)
+        if profile is not None and (game, engine) in CP_SAT_ENGINES:
+            import solve_profile
+            options = dict(options, profile=solve_profile.get_profile(profile))
+        # imports and warm up are not part of the solve time
+        start = time.perf_counter()
+        solver = solver_class(*puzzle['args'], **options)
+        solution = solver.solve()
+        result['status'] = 'unsat' if solution is None else 'solved'
+        result['solution'] = solution
+    except Exception as e:
+        # the tango engines raise when there is no solution instead of returning None
+        if solver is not None and solver.stats.status in ('unsat', 'infeasible'):
+            result.update(status='unsat', solution=None)
+        else:
+            result.update(status='error', error=str(e))
+    result['seconds'] = time.perf_counter() - start
+    if with_stats and solver is not None:
+        result['stats'] = solver.stats.to_dict()
+    return result
+
+
+def solve_chunk(chunk, engines, profile, with_stats):
+    return [solve_puzzle(index, puzzle, engines, profile, with_stats) for index, puzzle in chunk]
+
+
+# yields a result for every puzzle, read lazily like batch.solve_many. workers=1 solves in this process, more
+# spread chunks of puzzles over a process pool. ordered=True holds results back until the ones before them are
+# out, otherwise they come in completion order
+def solve_stream(puzzles, engines, workers=1, profile=None, with_stats=False, ordered=False, chunk_size=16):
+    indexed = enumerate(puzzles)
+    if workers <= 1:
+        for index, puzzle in indexed:
+            yield solve_puzzle(index, puzzle, engines, profile, with_stats)
+        return
+
+    held = {}
+    next_index = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        while True:
+            while len(pending) < 2 * workers:
+                chunk = list(islice(indexed, chunk_size))
+                if not chunk:
+                    break
+                pending.add(pool.submit(solve_chunk, chunk, engines, profile, with_stats))
+            if not pending:
+                return
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                for result in future.result():
+                    if not ordered:
+                        yield result
+                        continue
+                    held[result['index']] = result
+                    while next_index in held:
+                        yield held.pop(next_index)
+                        next_index += 1
+
+
+# engines for every game from the defaults and --engine game=name options
+def pick_engines(parser, choices):
+    engines = dict(DEFAULT_ENGINES)
+    for choice in choices:
+        game, _, engine = choice.partition('=')
+        if game not in ENGINES or engine not in ENGINES[game]:
+            options = '; '.join(f"{g}: {', '.join(ENGINES[g])}" for g in GAMES)
+            parser.error(f"unknown engine {choice!r}, the engines are {options}")
+        engines[game] = engine
+    return engines
+
+
+# a usage error for a --profile that solve_profile doesn't have, instead of an error result for every cp-sat
+# puzzle. solve_profile (and with it ortools) is only imported when a profile is given
+def check_profile(parser, name):
+    if name is None:
+        return
+    import solve_profile
+    names = [profile.name for profile in solve_profile.PROFILES]
+    if name not in names:
+        parser.error(f"unknown profile {name!r}, the profiles are {', '.join(names)}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Solve puzzle files in bulk, one json result per line')
+    parser.add_argument('files', nargs='*', help='puzzle files or corpus files, - or none for stdin')
+    parser.add_argument('--game', choices=GAMES, help='game of json puzzles without a "game" field')
+    parser.add_argument('--section', action='append', default=[], metavar='GAME/SIZE',
+                        help='corpus section to solve, can be repeated (default: all of them)')
+    parser.add_argument('--engine', action='append', default=[], metavar='GAME=ENGINE',
+                        help=f"engine for a game, can be repeated (defaults: "
+                             f"{', '.join(f'{g}={e}' for g, e in DEFAULT_ENGINES.items())})")
+    parser.add_argument('--profile', help='solve_profile name for the cp-sat engines')
+    parser.add_argument('--workers', type=int, default=1, help='solver processes, 0 for one per core')
+    parser.add_argument('--ordered', action='store_true', help='write results in input order')
+    parser.add_argument('--stats', action='store_true', help='add the solver stats to every result')
+    parser.add_argument('--output', '-o', help='write the results to this file instead of stdout')
+    args = parser.parse_args(argv)
+
+    engines = pick_engines(parser, args.engine)
+    check_profile(parser, args.profile)
+    workers = args.workers or os.cpu_count() or 1
+    out = open(args.output, 'w') if args.output else sys.stdout
+    failed = 0
+    try:
+        puzzles = read_files(args.files or ['-'], args.game, set(args.section))
+        for result in solve_stream(puzzles, engines, workers, args.profile, args.stats, args.ordered):
+            failed += result['status'] == 'error'
+            out.write(json.dumps(result) + '\n')
+            out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
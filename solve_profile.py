@@ -0,0 +1,83 @@
+import os
+from ortools.sat.python import cp_model
+
+class SolveProfile:
+
+    # how a cp-sat solve is run, passed to TangoCPSATSolver and the ZipCPSATSolvers as profile=...
+    # num_workers: cp-sat search workers, 0 lets cp-sat decide (it uses every core)
+    # time_limit: seconds per solve, None for no limit. in deterministic mode it is cp-sat's deterministic time
+    # deterministic: interleaved search, so the same model and seed always give the same answer
+    # subsolvers: names of the cp-sat portfolio workers to run (e.g. 'default_lp', 'no_lp', 'quick_restart'),
+    #   None keeps cp-sat's own portfolio
+    # strategy: None, 'min_first' or 'max_first'. branch on the board variables in order, trying the smallest
+    #   (or largest) value first, as a fixed search worker
+    # seed: cp-sat random seed
+
+    STRATEGIES = (None, 'min_first', 'max_first')
+
+    def __init__(self, name='default', num_workers=0, time_limit=None, deterministic=False,
+                 subsolvers=None, strategy=None, seed=None):
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"Unknown search strategy: {strategy}")
+        self.name = name
+        self.num_workers = num_workers
+        self.time_limit = time_limit
+        self.deterministic = deterministic
+        self.subsolvers = subsolvers
+        self.strategy = strategy
+        self.seed = seed
+
+    def __repr__(self):
+        return f"SolveProfile({self.name!r})"
+
+    # returns a CpSolver set up for this profile. decision_vars are the variables the strategy branches on,
+    # the decision strategy is added to model, so pass the model of the puzzle being solved
+    def make_solver(self, model, decision_vars=()):
+        solver = cp_model.CpSolver()
+        params = solver.parameters
+        if self.num_workers:
+            params.num_workers = self.num_workers
+        if self.time_limit is not None:
+            if self.deterministic:
+                params.max_deterministic_time = self.time_limit
+            else:
+                params.max_time_in_seconds = self.time_limit
+        if self.deterministic:
+            params.interleave_search = True
+        if self.subsolvers:
+            for name in self.subsolvers:
+                params.subsolvers.append(name)
+        if self.seed is not None:
+            params.random_seed = self.seed
+        if self.strategy is not None and decision_vars:
+            value = cp_model.SELECT_MIN_VALUE if self.strategy == 'min_first' else cp_model.SELECT_MAX_VALUE
+            # a solver is made for every solve / iter_solutions call on the same model, the strategy is only
+            # added by the first one
+            if not model.Proto().search_strategy:
+                model.AddDecisionStrategy(list(decision_vars), cp_model.CHOOSE_FIRST, value)
+            # a single worker has to be told to follow the strategy, with more workers the portfolio's
+            # 'fixed' worker uses it and the rest search as usual
+            if self.num_workers == 1:
+                params.search_branching = cp_model.FIXED_SEARCH
+        return solver
+
+
+# profiles benchmark.py sweeps over
+PROFILES = [
+    SolveProfile('default'),
+    SolveProfile('single', num_workers=1),
+    SolveProfile('single_min_first', num_workers=1, strategy='min_first'),
+    SolveProfile('parallel', num_workers=os.cpu_count() or 1),
+    SolveProfile('deterministic', num_workers=8, deterministic=True, seed=0),
+    SolveProfile('portfolio_no_lp', num_workers=4, subsolvers=['no_lp', 'quick_restart', 'quick_restart_no_lp', 'fixed']),
+    SolveProfile('portfolio_lp', num_workers=4, subsolvers=['default_lp', 'max_lp', 'core', 'pseudo_costs'],
+                 strategy='min_first'),
+]
+
+
+# looks a profile up by name
+def get_profile(name):
+    for profile in PROFILES:
+        if profile.name == name:
+            return profile
+    raise ValueError(f"Unknown solve profile: {name}")
@@ -0,0 +1,145 @@
+import json
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:
+    # not available on windows, peak memory is left out there
+    resource = None
+
+# telemetry of one solve, kept on every solver as solver.stats. it holds
+#   phases       seconds spent in each model building step, keyed by the add_* method (or phase) name
+#   variables    sat variables or cp-sat model variables, constraints the clauses or cp-sat constraints
+#   search_time  seconds in pycosat / cp-sat / the native search, after the model was built
+#   conflicts    cp-sat conflicts, or the contradictions a native search backtracked from
+#   branches     cp-sat branches, or the branching decisions of a native search. pycosat reports neither
+#   peak_memory  bytes. while tracemalloc is tracing this is the python peak of this solve alone,
+#                otherwise the peak resident size of the whole process so far
+#   status       'solved', 'unsat' or cp-sat's status name
+# finished stats are also written as json lines to the file set with log_to, if there is one
+
+_sink = None
+
+
+# writes every finished solve's stats as one json line to file (an open text file or a path), None stops logging
+def log_to(file):
+    global _sink
+    if isinstance(file, str):
+        file = open(file, 'a')
+    _sink = file
+
+
+class SolveStats:
+
+    def __init__(self, solver):
+        self.solver = solver
+        self.phases = {}
+        self.variables = None
+        self.constraints = None
+        self.search_time = None
+        self.conflicts = None
+        self.branches = None
+        self.peak_memory = None
+        self.status = None
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+
+    # adds the time spent in the with block to phase name
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - start
+
+    # calls method(*args) as a phase named after it, returns what it returns
+    def timed(self, method, *args):
+        with self.phase(method.__name__):
+            return method(*args)
+
+    # adds the time spent in the with block to search_time
+    @contextmanager
+    def search(self):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.search_time = (self.search_time or 0.0) + time.perf_counter() - start
+
+    # moves the time cnf_preprocess.solve spent simplifying, timed as part of the search, into a 'preprocess' phase
+    def read_preprocess(self, preprocess_stats):
+        seconds = preprocess_stats.get('simplify_time', 0.0)
+        self.phases['preprocess'] = self.phases.get('preprocess', 0.0) + seconds
+        self.search_time -= seconds
+
+    # model size and search counters of a cp-sat solve, status being what Solve returned
+    def read_cp_sat(self, model, solver, status):
+        proto = model.Proto()
+        self.variables = len(proto.variables)
+        self.constraints = len(proto.constraints)
+        self.conflicts = solver.NumConflicts()
+        self.branches = solver.NumBranches()
+        self.status = solver.StatusName(status).lower()
+
+    # total model building time
+    def encode_time(self):
+        return sum(self.phases.values())
+
+    # records the outcome and peak memory, and logs the stats if log_to was called
+    def finish(self, status=None):
+        if status is not None:
+            self.status = status
+        if tracemalloc.is_tracing():
+            self.peak_memory = tracemalloc.get_traced_memory()[1]
+        elif resource is not None:
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            # kilobytes on linux, bytes on macos
+            self.peak_memory = peak if sys.platform == 'darwin' else peak * 1024
+        if _sink is not None:
+            _sink.write(self.to_json() + '\n')
+            _sink.flush()
+        return self
+
+    def to_dict(self):
+        return {
+            'solver': self.solver,
+            'status': self.status,
+            'phases': dict(self.phases),
+            'encode_time': self.encode_time(),
+            'search_time': self.search_time,
+            'variables': self.variables,
+            'constraints': self.constraints,
+            'conflicts': self.conflicts,
+            'branches': self.branches,
+            'peak_memory': self.peak_memory,
+        }
+
+    def to_json(self):
+        return json.dumps(self.to_dict())
+
+    # one line for a status bar, leaves out what the solver doesn't report
+    def summary(self):
+        return format_summary(self.to_dict())
+
+    def __repr__(self):
+        return f"SolveStats({self.solver!r}, {self.status!r})"
+
+
+# summary() of a stats dict, e.g. one sent back from a worker process
+def format_summary(stats):
+    parts = [f"encode {stats['encode_time'] * 1000:.1f} ms"]
+    if stats['search_time'] is not None:
+        parts.append(f"search {stats['search_time'] * 1000:.1f} ms")
+    if stats['variables'] is not None:
+        parts.append(f"{stats['variables']} vars / {stats['constraints']} constraints")
+    if stats['conflicts'] is not None:
+        parts.append(f"{stats['conflicts']} conflicts")
+    if stats['branches'] is not None:
+        parts.append(f"{stats['branches']} branches")
+    if stats['peak_memory'] is not None:
+        parts.append(f"peak {stats['peak_memory'] / 2**20:.1f} MiB")
+    return ', '.join(parts)
@@ -0,0 +1,164 @@
+import os
+import queue
+import random
+import threading
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+import pycosat
+
+from mini_sudoku import MiniSudokuSATSolver
+
+# unique mini sudoku puzzles in bulk. every puzzle starts from a random full board and removes givens while the
+# puzzle keeps exactly one solution, like MiniSudokuSATSolver.generate_mini_sudoku_incremental. a round tests
+# several candidate removals at once (speculatively, each against the same givens) in worker processes and
+# commits the first one that stays unique. removing more givens only adds solutions, so a candidate that fails
+# once is dropped for good, and the candidates after the committed one are tested again next round.
+# early on almost every removal works and speculation would only repeat checks, so a round tests one cell after
+# a success and twice as many after a round without one, up to width.
+# several puzzles are built at the same time so every worker always has a round to check
+
+
+# checks each cell of cells for removal from givens (a tuple of ((r, c), value) for a puzzle with one solution).
+# the puzzle without (r, c) has another solution only if one puts a different value there, so blocking the
+# given value is a single solve. returns a list of bools, true where the removal keeps the puzzle unique
+def check_removals(givens, cells):
+    structure = MiniSudokuSATSolver.structure_clauses()
+    x = MiniSudokuSATSolver([[0] * 6 for _ in range(6)]).x
+    values = dict(givens)
+    results = []
+    for cell in cells:
+        units = tuple((x(r, c, v),) for (r, c), v in values.items() if (r, c) != cell)
+        blocked = ((-x(*cell, values[cell]),),)
+        results.append(pycosat.solve(structure + units + blocked) == 'UNSAT')
+    return results
+
+
+# one puzzle being built: the givens left and the cells not tried yet
+class _Puzzle:
+
+    def __init__(self, rng):
+        board = MiniSudokuSATSolver([[0] * 6 for _ in range(6)]).random_full_board(rng)
+        self.givens = {(r, c): board[r][c] for r in range(6) for c in range(6)}
+        self.candidates = list(self.givens)
+        rng.shuffle(self.candidates)
+        self.width = 1
+
+    # takes the next round of candidate cells, at most width of them
+    def next_round(self, width):
+        cells = self.candidates[:min(self.width, width)]
+        del self.candidates[:len(cells)]
+        return tuple(self.givens.items()), cells
+
+    # commits the first cell that stayed unique, puts the untested ones back in front
+    def commit(self, cells, results):
+        for i, (cell, unique) in enumerate(zip(cells, results)):
+            if unique:
+                del self.givens[cell]
+                retry = [c for c, ok in zip(cells[i + 1:], results[i + 1:]) if ok]
+                self.candidates[:0] = retry
+                self.width = 1
+                return
+        self.width *= 2
+
+    def grid(self):
+        return [[self.givens.get((r, c), 0) for c in range(6)] for r in range(6)]
+
+
+# yields unique puzzles with p givens, count of them (None for no end), in the order they were started.
+# width is how many removals a round tests, workers the number of processes checking them (defaults to the
+# number of cores, workers=1 checks in this process). every puzzle gets its own rng drawn from seed as it is
+# started, so the same seed gives the same puzzles in the same order for any number of workers.
+# a board that runs out of candidates above p givens is dropped and replaced by a fresh one, so p must be
+# reachable (6x6 puzzles need at least 8 givens and greedy removal seldom gets below 10)
+def iter_puzzles(p, count=None, workers=None, width=4, seed=None):
+    if workers is None:
+        workers = os.cpu_count() or 1
+    rng = random.Random(seed)
+    made = 0
+
+    def new_puzzle():
+        return _Puzzle(random.Random(rng.getrandbits(64)))
+
+    if workers <= 1:
+        while count is None or made < count:
+            puzzle = new_puzzle()
+            while len(puzzle.givens) > p and puzzle.candidates:
+                givens, cells = puzzle.next_round(width)
+                puzzle.commit(cells, check_removals(givens, cells))
+            if len(puzzle.givens) == p:
+                made += 1
+                yield puzzle.grid()
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # future -> (puzzle number, puzzle, cells of its round)
+        pending = {}
+        # puzzle number -> grid (None for a dropped board) of the puzzles done before the ones started earlier
+        finished = {}
+        started = 0
+        next_out = 0
+
+        def submit(number, puzzle):
+            givens, cells = puzzle.next_round(width)
+            pending[pool.submit(check_removals, givens, cells)] = (number, puzzle, cells)
+
+        def start_puzzle():
+            nonlocal started
+            submit(started, new_puzzle())
+            started += 1
+
+        # two puzzles per worker so a worker never waits for the main process
+        for _ in range(2 * workers):
+            start_puzzle()
+        try:
+            while count is None or made < count:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    number, puzzle, cells = pending.pop(future)
+                    puzzle.commit(cells, future.result())
+                    if len(puzzle.givens) > p and puzzle.candidates:
+                        submit(number, puzzle)
+                        continue
+                    finished[number] = puzzle.grid() if len(puzzle.givens) == p else None
+                    start_puzzle()
+                while next_out in finished and (count is None or made < count):
+                    grid = finished.pop(next_out)
+                    next_out += 1
+                    if grid is not None:
+                        made += 1
+                        yield grid
+        finally:
+            # also runs when the caller stops reading early
+            for future in pending:
+                future.cancel()
+
+
+# starts iter_puzzles in a background thread and returns the queue.Queue it streams the puzzles into, followed
+# by None once count puzzles are done. maxsize bounds how far generation runs ahead of the consumer
+def start(p, count, workers=None, width=4, seed=None, maxsize=0):
+    puzzles = queue.Queue(maxsize)
+
+    def produce():
+        try:
+            for puzzle in iter_puzzles(p, count, workers, width, seed):
+                puzzles.put(puzzle)
+        finally:
+            puzzles.put(None)
+
+    threading.Thread(target=produce, daemon=True).start()
+    return puzzles
+
+
+# pool of count unique puzzles for every clue count in pieces, as {p: [grid, ...]}
+def fill_pools(pieces, count, workers=None, width=4, seed=None):
+    return {p: list(iter_puzzles(p, count, workers, width, seed)) for p in pieces}
+
+
+if __name__ == "__main__":
+    import time
+    start_time = time.perf_counter()
+    puzzles = list(iter_puzzles(20, count=100))
+    elapsed = time.perf_counter() - start_time
+    print(f"{len(puzzles)} puzzles with 20 givens in {elapsed:.2f}s ({len(puzzles) / elapsed:.1f}/s)")
+    for row in puzzles[0]:
+        print(' '.join(str(v) if v else '.' for v in row))
@@ -1,30 +1,74 @@
 from ortools.sat.python import cp_model
+import time
+
+import batch
+import solution_stream
+import solve_stats
 
 class TangoCPSATSolver:
 
+    # model skeletons per board size: the board variables plus the no-three and balance rules, which only depend on n
+    _skeletons = {}
+
     # n is the size of the grid (n x n), must be even
     # grid is a 2d array of ints where grid[x][y] = (1 for Sun, 0 for Moon, -1 for empty)
     # equals is a list of pairs of positions that must be equal
     # diffs is a list of pairs of positions that must be different
+    # cached=True clones the skeleton for this n instead of building the model from scratch,
+    # build_time and solve_time record how long model building and the cp-sat search took,
+    # stats (a solve_stats.SolveStats) breaks the build down per step and adds the model size and search counters
+    # profile is a solve_profile.SolveProfile picking workers, time limit, determinism and search strategy,
+    # None runs cp-sat with its default parameters
 
-    def __init__(self, n, grid, equals, diffs):
+    def __init__(self, n, grid, equals, diffs, cached=False, profile=None):
+        start = time.perf_counter()
         self.n = n
         self.grid = grid
         self.equals = equals
         self.diffs = diffs
-        self.model = cp_model.CpModel()
-        # x[r][c] = 1 (Sun), 0 (Moon)
-        self.x = [[self.model.NewBoolVar(f"x_{r}_{c}") for c in range(n)]
-                  for r in range(n)]
+        self.cached = cached
+        self.profile = profile
+        self.stats = solve_stats.SolveStats(type(self).__name__)
+        if cached:
+            with self.stats.phase('clone_skeleton'):
+                self.model = self.skeleton(n).Clone()
+                # skeleton variables were created row by row, so x[r][c] is proto variable r * n + c
+                self.x = [[self.model.GetBoolVarFromProtoIndex(r * n + c) for c in range(n)]
+                          for r in range(n)]
+        else:
+            with self.stats.phase('create_variables'):
+                self.model = cp_model.CpModel()
+                # x[r][c] = 1 (Sun), 0 (Moon)
+                self.x = [[self.model.NewBoolVar(f"x_{r}_{c}") for c in range(n)]
+                          for r in range(n)]
+        self.built = False
+        self.build_time = time.perf_counter() - start
+        self.solve_time = None
+
+    # returns the shared skeleton model for size n, building it the first time
+    @classmethod
+    def skeleton(cls, n):
+        if n not in cls._skeletons:
+            builder = cls(n, [[-1] * n for _ in range(n)], [], [])
+            builder.add_no_three_adjacent()
+            builder.add_equal_suns_moons()
+            cls._skeletons[n] = builder.model
+        return cls._skeletons[n]
     
     #adds the given clues to the model
     def add_givens(self):
+        proto = self.model.Proto() if self.cached else None
         for r in range(self.n):
             for c in range(self.n):
-                if self.grid[r][c] == 1:
-                    self.model.Add(self.x[r][c] == 1)
-                elif self.grid[r][c] == 0:
-                    self.model.Add(self.x[r][c] == 0)
+                if self.grid[r][c] not in (0, 1):
+                    continue
+                if self.cached:
+                    # fix the variable's domain in the cloned proto instead of adding a constraint
+                    domain = proto.variables[self.x[r][c].Index()].domain
+                    domain[0] = self.grid[r][c]
+                    domain[1] = self.grid[r][c]
+                else:
+                    self.model.Add(self.x[r][c] == self.grid[r][c])
     
     #adds the equality constraints to the model
     def add_equals(self):
@@ -56,22 +100,60 @@ class TangoCPSATSolver:
         for c in range(self.n):
             self.model.Add(sum(self.x[r][c] for r in range(self.n)) == half_n)
 
+    #adds the puzzle's constraints to the model, only the first time it is called
+    def build_model(self):
+        if self.built:
+            return
+        start = time.perf_counter()
+        timed = self.stats.timed
+        timed(self.add_givens)
+        timed(self.add_equals)
+        timed(self.add_diffs)
+        if not self.cached:
+            timed(self.add_no_three_adjacent)
+            timed(self.add_equal_suns_moons)
+        self.built = True
+        self.build_time += time.perf_counter() - start
+
+    #cp-sat solver for this model, from the profile if there is one
+    def make_solver(self):
+        if self.profile is None:
+            return cp_model.CpSolver()
+        return self.profile.make_solver(self.model, [v for row in self.x for v in row])
+
     def solve(self):
-        self.add_givens()
-        self.add_equals()
-        self.add_diffs()
-        self.add_no_three_adjacent()
-        self.add_equal_suns_moons()
-        
-        solver = cp_model.CpSolver()
-        status = solver.Solve(self.model)
+        self.build_model()
+        solver = self.make_solver()
+        start = time.perf_counter()
+        with self.stats.search():
+            status = solver.Solve(self.model)
+        self.solve_time = time.perf_counter() - start
+        self.stats.read_cp_sat(self.model, solver, status)
+        self.stats.finish()
         
         if status == cp_model.FEASIBLE or status == cp_model.OPTIMAL:
             solution = [[solver.Value(self.x[r][c]) for c in range(self.n)] for r in range(self.n)]
             return solution
         else:
             raise Exception("No solution found")
-        
+
+    #yields every solution lazily (same grids as solve), at most limit of them
+    def iter_solutions(self, limit=None):
+        self.build_model()
+        variables = [v for row in self.x for v in row]
+        for values in solution_stream.iter_cp_solutions(self.model, variables, self.make_solver(), limit):
+            yield [[values.Value(self.x[r][c]) for c in range(self.n)] for r in range(self.n)]
+
+    #true if the puzzle has exactly one solution, stops looking at the second one
+    def is_unique(self):
+        return sum(1 for _ in self.iter_solutions(limit=2)) == 1
+
+    # solves many puzzles across a process pool, yielding (index, solution) in completion order
+    # each puzzle is a tuple of constructor arguments, (n, grid, equals, diffs). see batch.solve_many
+    @classmethod
+    def solve_many(cls, puzzles, workers=None):
+        return batch.solve_many(cls, puzzles, workers)
+
 # Test case
 if __name__ == "__main__":
     n = 6
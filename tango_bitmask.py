@@ -0,0 +1,232 @@
+import random
+from collections import defaultdict
+from itertools import combinations
+
+import solve_stats
+
+class TangoBitmaskSolver:
+
+    # pure python tango engine with the same inputs and solve() result as TangoCPSATSolver, no ortools needed.
+    # every row and column is stored as two bitmasks (bit i set = cell i is a sun / a moon), the rules are
+    # applied with shifts and ands until nothing changes, then it branches on a cell and backtracks on a contradiction
+
+    # lines with at most this many empty cells get every valid completion enumerated during propagation
+    LOOKAHEAD = 8
+    # branch budget of the first search, doubled after every restart
+    FIRST_RESTART = 32
+
+    # n is the size of the grid (n x n), must be even
+    # grid is a 2d array of ints where grid[x][y] = (1 for Sun, 0 for Moon, -1 for empty)
+    # equals is a list of pairs of positions that must be equal
+    # diffs is a list of pairs of positions that must be different
+    # rng (a random.Random) picks the value tried first when branching, seeded with 0 if not given
+    # stats is a solve_stats.SolveStats with the timings and search counters of solve()
+
+    def __init__(self, n, grid, equals, diffs, rng=None):
+        if n % 2 != 0:
+            raise ValueError("Grid size must be even")
+        self.n = n
+        self.grid = grid
+        self.equals = equals
+        self.diffs = diffs
+        self.rng = rng if rng is not None else random.Random(0)
+        self.full = (1 << n) - 1
+        self.half = n // 2
+        # cell -> [(other cell row, other cell col, same)] for the equals / diffs markers touching it
+        self.links = defaultdict(list)
+        for (r1, c1), (r2, c2) in equals:
+            self.links[(r1, c1)].append((r2, c2, True))
+            self.links[(r2, c2)].append((r1, c1, True))
+        for (r1, c1), (r2, c2) in diffs:
+            self.links[(r1, c1)].append((r2, c2, False))
+            self.links[(r2, c2)].append((r1, c1, False))
+        # branching decisions made by the last solve, over all restarts, and the contradictions it backtracked from
+        self.branches = 0
+        self.conflicts = 0
+        self.stats = solve_stats.SolveStats(type(self).__name__)
+        # set when the last search stopped at its branch budget instead of running out of options
+        self.aborted = False
+
+    # cells a line forces to the other symbol, given the mask of one symbol in it. None if the line is broken
+    def forced_opposite(self, mask):
+        pair = mask & (mask >> 1)
+        if pair & (mask >> 2):
+            # three in a row
+            return None
+        count = bin(mask).count('1')
+        if count > self.half:
+            return None
+        if count == self.half:
+            # balance: the rest of the line is the other symbol
+            return self.full & ~mask
+        gap = mask & (mask >> 2)
+        # xx -> the cells on both ends flip, x_x -> the middle one flips
+        return ((pair >> 1) | (pair << 2) | (gap << 1)) & self.full
+
+    # tries every way to finish a line and returns (cells sun in all of them, cells moon in all of them),
+    # or None if the line can't be finished
+    def line_completions(self, suns, moons):
+        empty = self.full & ~(suns | moons)
+        cells = [i for i in range(self.n) if empty >> i & 1]
+        need = self.half - bin(suns).count('1')
+        always = self.full
+        ever = 0
+        found = False
+        for chosen in combinations(cells, need):
+            line = suns
+            for i in chosen:
+                line |= 1 << i
+            other = self.full & ~line
+            if line & (line >> 1) & (line >> 2) or other & (other >> 1) & (other >> 2):
+                continue
+            always &= line
+            ever |= line
+            found = True
+        if not found:
+            return None
+        return always & empty, empty & ~ever
+
+    # 1, 0 or None (empty) for cell (r, c)
+    def value(self, state, r, c):
+        if state[0][r] >> c & 1:
+            return 1
+        if state[1][r] >> c & 1:
+            return 0
+        return None
+
+    # sets cell (r, c) and everything its equals / diffs markers imply. the row and column of every changed cell
+    # go into dirty as (0, row) / (1, col). returns False if a cell already holds the other symbol
+    def assign(self, state, r, c, sun, dirty):
+        rs, rm, cs, cm = state
+        pending = [(r, c, sun)]
+        while pending:
+            r, c, sun = pending.pop()
+            current = self.value(state, r, c)
+            if current is not None:
+                if current != sun:
+                    return False
+                continue
+            if sun:
+                rs[r] |= 1 << c
+                cs[c] |= 1 << r
+            else:
+                rm[r] |= 1 << c
+                cm[c] |= 1 << r
+            dirty.add((0, r))
+            dirty.add((1, c))
+            for r2, c2, same in self.links.get((r, c), ()):
+                pending.append((r2, c2, sun if same else not sun))
+        return True
+
+    # applies the line rules to every dirty line until nothing changes. returns False on a contradiction
+    def propagate(self, state, dirty):
+        rs, rm, cs, cm = state
+        while dirty:
+            kind, i = dirty.pop()
+            # in the column masks bit j is row j
+            suns, moons = (rs[i], rm[i]) if kind == 0 else (cs[i], cm[i])
+            if suns & moons:
+                return False
+            to_moon = self.forced_opposite(suns)
+            to_sun = self.forced_opposite(moons)
+            if to_moon is None or to_sun is None:
+                return False
+            to_moon &= ~moons
+            to_sun &= ~suns
+            if not (to_moon | to_sun):
+                empty = self.full & ~(suns | moons)
+                if empty and bin(empty).count('1') <= self.LOOKAHEAD:
+                    completions = self.line_completions(suns, moons)
+                    if completions is None:
+                        return False
+                    to_sun, to_moon = completions
+            for bits, sun in ((to_moon, False), (to_sun, True)):
+                while bits:
+                    low = bits & -bits
+                    bits ^= low
+                    j = low.bit_length() - 1
+                    r, c = (i, j) if kind == 0 else (j, i)
+                    if not self.assign(state, r, c, sun, dirty):
+                        return False
+        return True
+
+    # board with only the givens placed plus the lines to look at first, or None if the givens clash
+    def initial_state(self):
+        n = self.n
+        state = ([0] * n, [0] * n, [0] * n, [0] * n)
+        dirty = set()
+        for r in range(n):
+            for c in range(n):
+                if self.grid[r][c] in (0, 1):
+                    if not self.assign(state, r, c, self.grid[r][c] == 1, dirty):
+                        return None
+        return state, {(kind, i) for kind in (0, 1) for i in range(n)}
+
+    # depth first search with an explicit stack, yields every solved state. branches on the first empty cell of
+    # the row or column with the fewest empty cells. stops early (setting self.aborted) after max_branches branches
+    def search(self, start, max_branches=None):
+        self.aborted = False
+        branches = 0
+        stack = [start]
+        while stack:
+            state, dirty = stack.pop()
+            if not self.propagate(state, dirty):
+                self.conflicts += 1
+                continue
+            best = None
+            for kind in (0, 1):
+                suns, moons = state[2 * kind], state[2 * kind + 1]
+                for i in range(self.n):
+                    empty = self.full & ~(suns[i] | moons[i])
+                    if empty and (best is None or bin(empty).count('1') < best[0]):
+                        best = (bin(empty).count('1'), kind, i, empty)
+            if best is None:
+                yield state
+                continue
+            if max_branches is not None and branches >= max_branches:
+                self.aborted = True
+                return
+            _, kind, i, empty = best
+            j = (empty & -empty).bit_length() - 1
+            r, c = (i, j) if kind == 0 else (j, i)
+            branches += 1
+            self.branches += 1
+            first = self.rng.random() < 0.5
+            # pushed last is tried first
+            for sun in (not first, first):
+                child = tuple(list(masks) for masks in state)
+                child_dirty = set()
+                if self.assign(child, r, c, sun, child_dirty):
+                    stack.append((child, child_dirty))
+
+    def to_grid(self, state):
+        rs = state[0]
+        return [[rs[r] >> c & 1 for c in range(self.n)] for r in range(self.n)]
+
+    # finds one solution with randomised restarts: a search that runs past its branch budget is thrown away and
+    # restarted with twice the budget, which avoids getting stuck under one bad early guess. None if there is none
+    def find_solution(self):
+        self.branches = 0
+        self.conflicts = 0
+        start = self.stats.timed(self.initial_state)
+        if start is None:
+            return None
+        max_branches = self.FIRST_RESTART
+        with self.stats.search():
+            while True:
+                state, dirty = start
+                fresh = (tuple(list(masks) for masks in state), set(dirty))
+                for solved in self.search(fresh, max_branches):
+                    return self.to_grid(solved)
+                if not self.aborted:
+                    return None
+                max_branches *= 2
+
+    def solve(self):
+        solution = self.find_solution()
+        self.stats.branches = self.branches
+        self.stats.conflicts = self.conflicts
+        self.stats.finish('unsat' if solution is None else 'solved')
+        if solution is None:
+            raise Exception("No solution found")
+        return solution
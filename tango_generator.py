@@ -0,0 +1,140 @@
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+from tango_bitmask import TangoBitmaskSolver
+
+# tango puzzles with exactly one solution, without cp-sat. the filled board comes from TangoBitmaskSolver on an
+# empty grid with a random branching order. the puzzle starts with every cell given plus equals / diffs markers
+# between random pairs of neighbouring cells, then drops clues in a random order while the board stays unique.
+# the puzzle without a clue has another solution only if one breaks that clue, so each check is a single search
+# with the clue flipped (the other symbol, or the other marker) that has to fail. removing more clues only adds
+# solutions, so a clue that is needed once stays needed and one pass leaves a minimal set of clues.
+# a check that runs past max_branches keeps its clue, which can only leave a clue too many, never a second solution
+
+
+# every pair of orthogonally neighbouring cells, the only pairs the markers are placed between
+def adjacent_pairs(n):
+    pairs = [((r, c), (r, c + 1)) for r in range(n) for c in range(n - 1)]
+    pairs += [((r, c), (r + 1, c)) for r in range(n - 1) for c in range(n)]
+    return pairs
+
+
+# a random filled board of size n, grid[r][c] is 1 (Sun) or 0 (Moon)
+def random_board(n, rng):
+    return TangoBitmaskSolver(n, [[-1] * n for _ in range(n)], [], [], rng).solve()
+
+
+# true if the clues minus clue still only allow solution. givens maps cells to values, markers is a set of pairs
+# and a clue is ('cell', (r, c)) or ('pair', (a, b)). false as well if the search needs more than max_branches
+def still_unique(n, solution, givens, markers, clue, max_branches=None):
+    kind, key = clue
+    grid = [[-1] * n for _ in range(n)]
+    for (r, c), v in givens.items():
+        grid[r][c] = v
+    equals = []
+    diffs = []
+    for a, b in markers:
+        same = solution[a[0]][a[1]] == solution[b[0]][b[1]]
+        if kind == 'pair' and (a, b) == key:
+            same = not same
+        (equals if same else diffs).append((a, b))
+    if kind == 'cell':
+        r, c = key
+        grid[r][c] = 1 - solution[r][c]
+    solver = TangoBitmaskSolver(n, grid, equals, diffs)
+    start = solver.initial_state()
+    if start is None:
+        return True
+    for _ in solver.search(start, max_branches):
+        return False
+    return not solver.aborted
+
+
+# returns (grid, equals, diffs) for an n x n puzzle with exactly one solution, like TangoCPSATSolver takes them.
+# rng is a random.Random (seeded with seed if not given), markers how many neighbouring pairs get a marker
+# before clues are removed (n if not given), max_branches the search budget of one removal check
+def generate_tango(n, rng=None, seed=None, markers=None, max_branches=16):
+    if rng is None:
+        rng = random.Random(seed)
+    if markers is None:
+        markers = n
+    solution = random_board(n, rng)
+    givens = {(r, c): solution[r][c] for r in range(n) for c in range(n)}
+    pairs = set(rng.sample(adjacent_pairs(n), min(markers, 2 * n * (n - 1))))
+
+    clues = [('cell', cell) for cell in givens] + [('pair', pair) for pair in sorted(pairs)]
+    rng.shuffle(clues)
+    for clue in clues:
+        kind, key = clue
+        if kind == 'cell':
+            del givens[key]
+        else:
+            pairs.discard(key)
+        if not still_unique(n, solution, givens, pairs, clue, max_branches):
+            # needed, put it back
+            if kind == 'cell':
+                givens[key] = solution[key[0]][key[1]]
+            else:
+                pairs.add(key)
+
+    grid = [[givens.get((r, c), -1) for c in range(n)] for r in range(n)]
+    equals = []
+    diffs = []
+    for a, b in sorted(pairs):
+        (equals if solution[a[0]][a[1]] == solution[b[0]][b[1]] else diffs).append((a, b))
+    return grid, equals, diffs
+
+
+# yields count unique puzzles of size n (None for no end). workers is the number of processes building them
+# (defaults to the number of cores, workers=1 builds them in this process). every puzzle gets its own seed
+# drawn from seed, so the same seed gives the same puzzles in the same order for any number of workers
+def iter_puzzles(n, count=None, workers=None, seed=None, markers=None):
+    if workers is None:
+        workers = os.cpu_count() or 1
+    rng = random.Random(seed)
+    made = 0
+
+    if workers <= 1:
+        while count is None or made < count:
+            made += 1
+            yield generate_tango(n, seed=rng.getrandbits(64), markers=markers)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # future -> position of its puzzle in the output
+        pending = {}
+        # puzzles done before the ones submitted earlier, by position
+        finished = {}
+        submitted = 0
+        try:
+            while count is None or made < count:
+                # two puzzles per worker in flight, never more than are still wanted
+                while len(pending) < 2 * workers and (count is None or submitted < count):
+                    pending[pool.submit(generate_tango, n, None, rng.getrandbits(64), markers)] = submitted
+                    submitted += 1
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    finished[pending.pop(future)] = future.result()
+                while made in finished:
+                    yield finished.pop(made)
+                    made += 1
+        finally:
+            # also runs when the caller stops reading early
+            for future in pending:
+                future.cancel()
+
+
+# pool of count unique puzzles for every size in sizes, as {n: [(grid, equals, diffs), ...]}
+def fill_pools(sizes, count, workers=None, seed=None, markers=None):
+    return {n: list(iter_puzzles(n, count, workers, seed, markers)) for n in sizes}
+
+
+if __name__ == "__main__":
+    import time
+    for n in (6, 8, 12, 16, 24):
+        start_time = time.perf_counter()
+        grid, equals, diffs = generate_tango(n, seed=0)
+        elapsed = time.perf_counter() - start_time
+        givens = sum(v != -1 for row in grid for v in row)
+        print(f"n = {n}: {givens} givens, {len(equals) + len(diffs)} markers in {elapsed * 1000:.1f} ms")
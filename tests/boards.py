@@ -0,0 +1,42 @@
+# boards shared by the tests, the examples at the end of the solver modules
+
+TANGO = (
+    [
+        [-1, 0, 1, 1, 0, -1],
+        [0, -1, -1, -1, -1, 0],
+        [1, -1, -1, -1, -1, 0],
+        [1, -1, -1, -1, -1, 1],
+        [0, -1, -1, -1, -1, 1],
+        [-1, 1, 0, 0, 1, -1],
+    ],
+    [((1, 1), (2, 1)), ((3, 1), (3, 2))],
+    [((1, 2), (2, 2)), ((1, 3), (1, 4)), ((2, 3), (2, 4)), ((3, 3), (4, 3)), ((3, 4), (4, 4)), ((4, 1), (4, 2))],
+)
+
+ZIP = (
+    [
+        [1, 0, 0, 0, 0, 0],
+        [0, 2, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 3, 0, 0],
+        [0, 0, 0, 0, 0, 0],
+        [4, 0, 0, 0, 0, 0],
+    ],
+    {((0, 0), (1, 0)), ((0, 2), (1, 2)), ((1, 1), (2, 1)), ((2, 0), (3, 0)), ((2, 3), (3, 3)),
+     ((3, 2), (4, 2)), ((3, 5), (4, 5)), ((4, 0), (5, 0)), ((4, 3), (5, 3)), ((4, 4), (5, 4))},
+)
+
+
+# true if path is a zip solution: every cell once, through neighbouring cells without crossing a wall, from the
+# first number to the last one and past the numbers in order
+def is_zip_path(grid, walls, path):
+    cells = [(r, c) for r in range(len(grid)) for c in range(len(grid[0]))]
+    walls = {(min(a, b), max(a, b)) for a, b in walls}
+    if sorted(path) != cells:
+        return False
+    for a, b in zip(path, path[1:]):
+        if abs(a[0] - b[0]) + abs(a[1] - b[1]) != 1 or (min(a, b), max(a, b)) in walls:
+            return False
+    numbers = [grid[r][c] for r, c in path if grid[r][c]]
+    last = max(numbers)
+    return numbers == list(range(1, last + 1)) and grid[path[-1][0]][path[-1][1]] == last
@@ -0,0 +1,44 @@
+import pytest
+
+import batch
+import queens_generator
+from queens import QueensSATSolver
+from tango import TangoCPSATSolver
+from tango_bitmask import TangoBitmaskSolver
+
+
+def queens_puzzles():
+    puzzles = []
+    for seed in range(6):
+        grid, solution = queens_generator.generate_queens(6, seed=seed)
+        puzzles.append((grid, []))
+        r, c = solution[0]
+        # a queen that isn't the one of the only solution, no solution at all
+        puzzles.append({'grid': grid, 'queens': [(r, (c + 2) % 6)]})
+    return puzzles
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_solve_many(workers):
+    puzzles = queens_puzzles()
+    expected = [batch.solve_one(QueensSATSolver, puzzle) for puzzle in puzzles]
+    assert all(solution is not None for solution in expected[::2])
+    assert all(solution is None for solution in expected[1::2])
+    results = list(batch.solve_many(QueensSATSolver, iter(puzzles), workers, chunk_size=3))
+    assert sorted(index for index, _ in results) == list(range(len(puzzles)))
+    assert dict(results) == dict(enumerate(expected))
+
+
+# the tango solvers raise when there is no solution, here with an equals and a diffs marker on the same pair
+@pytest.mark.parametrize('solver_class', [TangoCPSATSolver, TangoBitmaskSolver])
+def test_solve_one_tango_unsat(solver_class):
+    grid = [[-1] * 6 for _ in range(6)]
+    assert batch.solve_one(solver_class, (6, grid, [((0, 0), (0, 1))], [((0, 0), (0, 1))])) is None
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_solve_many_raises(workers):
+    # an odd board is rejected by the constructor, which is an error and not a missing solution
+    puzzles = [(5, [[-1] * 5 for _ in range(5)], [], [])]
+    with pytest.raises(ValueError):
+        list(batch.solve_many(TangoBitmaskSolver, puzzles, workers))
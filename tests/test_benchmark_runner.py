@@ -0,0 +1,82 @@
+import random
+
+import numpy as np
+
+import benchmark
+import benchmark_runner
+from benchmark_runner import BenchmarkRun, Measurement
+from queens import QueensSATSolver
+import queens_generator
+
+
+# samples around median_ms milliseconds with a little noise, in nanoseconds
+def samples(median_ms, count=40, seed=0):
+    rng = random.Random(seed)
+    return [int(median_ms * 1e6 * (1 + rng.uniform(-0.02, 0.02))) for _ in range(count)]
+
+
+def run(measurements):
+    result = BenchmarkRun()
+    result.measurements = [Measurement(name, params, times) for name, params, times in measurements]
+    return result
+
+
+def test_median_interval():
+    values = np.random.default_rng(1).lognormal(size=200)
+    low, high = benchmark_runner.median_interval(values)
+    assert low <= np.median(values) <= high
+    assert benchmark_runner.median_interval(values) == (low, high)
+    # more samples, narrower interval
+    wide_low, wide_high = benchmark_runner.median_interval(values[:20])
+    assert high - low < wide_high - wide_low
+    assert benchmark_runner.median_interval([3.0]) == (3.0, 3.0)
+
+
+def test_compare():
+    baseline = run([
+        ('queens', {'size': 8}, samples(10)),
+        ('queens', {'size': 9}, samples(10)),
+        ('queens', {'size': 10}, samples(10)),
+        ('tango', {'size': 6}, samples(10)),
+    ])
+    candidate = run([
+        ('queens', {'size': 8}, samples(10, seed=1)),
+        ('queens', {'size': 9}, samples(20)),
+        ('queens', {'size': 10}, samples(5)),
+        ('zip', {'size': 5}, samples(10)),
+    ])
+    verdicts = {(row['name'], row['params'].get('size')): row['verdict']
+                for row in benchmark_runner.compare(baseline, candidate)}
+    assert verdicts == {
+        ('queens', 8): 'same',
+        ('queens', 9): 'regression',
+        ('queens', 10): 'improvement',
+        ('tango', 6): 'missing',
+        ('zip', 5): 'new',
+    }
+
+
+# benchmark.py compare fails on a regression and on a measurement the candidate lost
+def test_compare_command(tmp_path, capsys):
+    paths = {}
+    for name, measurements in (
+            ('baseline', [('queens', {'size': 8}, samples(10)), ('tango', {'size': 6}, samples(10))]),
+            ('same', [('queens', {'size': 8}, samples(10, seed=1)), ('tango', {'size': 6}, samples(10, seed=1))]),
+            ('narrower', [('queens', {'size': 8}, samples(10, seed=1))]),
+            ('slower', [('queens', {'size': 8}, samples(10)), ('tango', {'size': 6}, samples(20))])):
+        paths[name] = str(tmp_path / f'{name}.json')
+        run(measurements).write_json(paths[name])
+    assert benchmark.main(['compare', paths['baseline'], paths['same']]) == 0
+    assert benchmark.main(['compare', paths['baseline'], paths['narrower']]) == 1
+    assert 'missing' in capsys.readouterr().out
+    assert benchmark.main(['compare', paths['baseline'], paths['slower']]) == 1
+    assert 'regression' in capsys.readouterr().out
+
+
+def test_measure():
+    puzzles = [(queens_generator.generate_queens(6, seed=seed)[0], []) for seed in range(3)]
+    benchmark_run = BenchmarkRun(warmup=1, repeat=2)
+    m = benchmark_run.measure('queens', {'size': 6}, iter(puzzles), lambda puzzle: QueensSATSolver(*puzzle))
+    assert len(m.samples_ns) == len(m.stats) == 6
+    assert m.summary()['count'] == 6
+    assert all(stats['status'] == 'solved' for stats in m.stats)
@@ -0,0 +1,78 @@
+from collections import defaultdict
+
+import cnf_preprocess
+import queens_generator
+import sudoku_generator
+from mini_sudoku import MiniSudokuSATSolver
+from queens import QueensSATSolver
+
+
+def test_remove_duplicates():
+    stats = defaultdict(int)
+    clauses = cnf_preprocess.remove_duplicates([[2, 1], [1, 2], [1, 1, 2], [3, -3], [-1]], stats)
+    assert clauses == [(1, 2), (-1,)]
+    assert stats['duplicates'] == 2
+    assert stats['tautologies'] == 1
+
+
+def test_propagate_units():
+    stats = defaultdict(int)
+    # 1, then 2 from (-1 2), then 3 from (-2 3); (1 4) is satisfied and (-3 4 5) loses -3
+    clauses, forced = cnf_preprocess.propagate_units([(1,), (-1, 2), (-2, 3), (1, 4), (-3, 4, 5)], stats)
+    assert forced == {1, 2, 3}
+    assert clauses == [(4, 5)]
+    assert stats['satisfied'] == 4
+    assert stats['strengthened'] == 1
+
+
+def test_propagate_units_conflict():
+    stats = defaultdict(int)
+    clauses, _ = cnf_preprocess.propagate_units([(1,), (-1, 2), (-2,)], stats)
+    assert clauses is None
+
+
+def test_remove_subsumed():
+    stats = defaultdict(int)
+    clauses = cnf_preprocess.remove_subsumed([(1, 2, 3), (1, 2), (-1, 3), (-1, 2, 3), (2, 4)], stats)
+    assert clauses == [(1, 2), (-1, 3), (2, 4)]
+    assert stats['subsumed'] == 2
+
+
+def test_remove_subsumed_copies():
+    stats = defaultdict(int)
+    # what propagate_units leaves of (-1 2 3) next to (2 3) once 1 is forced
+    clauses = cnf_preprocess.remove_subsumed([(2, 3), (2, 3), (-2, 4)], stats)
+    assert clauses == [(2, 3), (-2, 4)]
+    assert stats['subsumed'] == 1
+
+
+def test_simplify():
+    clauses, forced, stats = cnf_preprocess.simplify([[1], [1], [-1, 2, 3], [2, 3, 4], [2, 3], [4, -4]])
+    assert forced == {1}
+    assert clauses == [(2, 3)]
+    assert stats['input_clauses'] == 6
+    assert stats['output_clauses'] == 1
+    assert stats['removed_clauses'] == 5
+
+
+def test_solve_puts_forced_literals_back():
+    solution, stats = cnf_preprocess.solve([[1], [-1, 2], [3, 4], [-3, -4]], 4)
+    assert solution[:2] == [1, 2]
+    assert (solution[2] > 0) != (solution[3] > 0)
+    assert cnf_preprocess.solve([[1], [-1]], 1)[0] == 'UNSAT'
+
+
+# the sat solvers give the same answers with preprocess=True
+def test_preprocess_queens():
+    for seed in range(3):
+        grid, solution = queens_generator.generate_queens(8, seed=seed)
+        for given in ([], solution[:2], [(solution[0][0], (solution[0][1] + 2) % 8)]):
+            expected = QueensSATSolver(grid, given).solve()
+            assert QueensSATSolver(grid, given, preprocess=True).solve() == expected
+
+
+def test_preprocess_mini_sudoku():
+    for grid in sudoku_generator.iter_puzzles(14, count=3, workers=1, seed=0):
+        expected = MiniSudokuSATSolver(grid).solve()
+        assert expected is not None
+        assert MiniSudokuSATSolver(grid, preprocess=True).solve() == expected
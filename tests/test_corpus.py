@@ -0,0 +1,72 @@
+import pytest
+
+import benchmark
+import corpus
+import queens_generator
+import sudoku_generator
+import tango_generator
+
+from boards import TANGO, ZIP
+
+
+@pytest.fixture
+def puzzles():
+    return {
+        ('mini_sudoku', 12): list(sudoku_generator.iter_puzzles(12, count=2, workers=1, seed=0)),
+        ('queens', 7): [queens_generator.generate_queens(7, seed=seed) for seed in range(3)],
+        ('tango', 6): [TANGO, tango_generator.generate_tango(6, seed=0)],
+        ('zip', 6): [ZIP],
+    }
+
+
+def write(path, puzzles, meta=None):
+    corpus.write(path, [(game, size, len(items), iter(items)) for (game, size), items in puzzles.items()], meta)
+
+
+def test_round_trip(tmp_path, puzzles):
+    path = tmp_path / 'corpus.bin'
+    write(path, puzzles, meta={'seed': 0})
+    read = corpus.Corpus(path)
+    assert read.meta == {'seed': 0}
+    assert list(read.sections) == [corpus.section_key(game, size) for game, size in puzzles]
+    for (game, size), items in puzzles.items():
+        assert (game, size) in read
+        assert read.count(game, size) == len(items)
+        decoded = list(read.stream(game, size))
+        if game == 'tango':
+            # markers come back in row order, first the pairs side by side then the ones above each other
+            decoded = [(grid, sorted(equals), sorted(diffs)) for grid, equals, diffs in decoded]
+            items = [(grid, sorted(equals), sorted(diffs)) for grid, equals, diffs in items]
+        assert decoded == items
+    assert ('queens', 8) not in read
+
+
+def test_write_checks_the_count(tmp_path, puzzles):
+    with pytest.raises(ValueError):
+        corpus.write(tmp_path / 'corpus.bin', [('queens', 7, 5, iter(puzzles[('queens', 7)]))])
+
+
+def test_not_a_corpus(tmp_path):
+    path = tmp_path / 'puzzles.txt'
+    path.write_text('queens aabb/accb/ddcb/dddb\n')
+    with pytest.raises(ValueError):
+        corpus.Corpus(path)
+
+
+# benchmark.py corpus with a few small sizes, the same seed has to give the same file for any number of workers
+def test_build_corpus_is_reproducible(tmp_path, monkeypatch):
+    monkeypatch.setattr(benchmark.Benchmark, 'MINI_SUDOKU_PIECES', (20, 14))
+    monkeypatch.setattr(benchmark.Benchmark, 'QUEEN_SIZES', (6, 9))
+    monkeypatch.setattr(benchmark.Benchmark, 'TANGO_SIZES', (6,))
+    monkeypatch.setattr(benchmark.Benchmark, 'ZIP_SIZES', (5,))
+    monkeypatch.setattr(benchmark.Benchmark, 'ZIP_CIRCUIT_SIZES', ())
+    monkeypatch.setattr(benchmark.Benchmark, 'TRIALS_PER_SIZE', benchmark.Benchmark.TRIALS_PER_SIZE)
+    files = []
+    for workers in (1, 3, 3):
+        path = tmp_path / f'corpus{len(files)}.bin'
+        assert benchmark.main(['corpus', str(path), '--seed', '7', '--trials', '4', '--workers', str(workers)]) == 0
+        files.append(path.read_bytes())
+    assert files[0] == files[1] == files[2]
+    read = corpus.Corpus(tmp_path / 'corpus0.bin')
+    assert read.meta == {'seed': 7, 'trials': 4}
+    assert sorted(read.sections) == ['mini_sudoku/14', 'mini_sudoku/20', 'queens/6', 'queens/9', 'tango/6', 'zip/5']
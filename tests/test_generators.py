@@ -0,0 +1,67 @@
+import random
+
+import pytest
+
+from mini_sudoku import MiniSudokuSATSolver
+from queens import QueensSATSolver
+import queens_generator
+import sudoku_generator
+from tango import TangoCPSATSolver
+import tango_generator
+
+
+def test_sudoku_generator():
+    for grid in sudoku_generator.iter_puzzles(12, count=3, workers=1, seed=0):
+        assert sum(v != 0 for row in grid for v in row) == 12
+        assert MiniSudokuSATSolver(grid).is_unique()
+
+
+def test_sudoku_generator_seed():
+    first = list(sudoku_generator.iter_puzzles(16, count=3, workers=1, seed=5))
+    assert list(sudoku_generator.iter_puzzles(16, count=3, workers=1, seed=5)) == first
+
+
+# n = 9 and up are built from blocks (queens_generator.compose)
+@pytest.mark.parametrize('n', [4, 5, 8, 9, 12, 17])
+def test_queens_generator(n):
+    for seed in range(3):
+        grid, queens = queens_generator.generate_queens(n, seed=seed)
+        assert QueensSATSolver(grid, []).is_unique()
+        assert QueensSATSolver(grid, []).solve() == sorted(queens)
+        sizes = {}
+        for row in grid:
+            for region in row:
+                sizes[region] = sizes.get(region, 0) + 1
+        assert sorted(sizes) == list(range(1, n + 1))
+        assert min(sizes.values()) >= 2
+        if n > 4:
+            assert len(QueensSATSolver(grid, []).propagate()[0]) < n
+
+
+def test_queens_generator_seed():
+    assert queens_generator.generate_queens(10, seed=3) == queens_generator.generate_queens(10, seed=3)
+
+
+def test_non_touching_permutation():
+    rng = random.Random(0)
+    for n in (1, 4, 5, 9):
+        perm = queens_generator.non_touching_permutation(n, rng)
+        assert sorted(perm) == list(range(n))
+        assert all(abs(a - b) > 1 for a, b in zip(perm, perm[1:]))
+    with pytest.raises(ValueError):
+        queens_generator.non_touching_permutation(3, rng)
+
+
+@pytest.mark.parametrize('n', [6, 8])
+def test_tango_generator(n):
+    for seed in range(3):
+        grid, equals, diffs = tango_generator.generate_tango(n, seed=seed)
+        assert TangoCPSATSolver(n, grid, equals, diffs).is_unique()
+        assert tango_generator.generate_tango(n, seed=seed) == (grid, equals, diffs)
+
+
+def test_tango_generator_puzzles():
+    puzzles = list(tango_generator.iter_puzzles(6, count=4, workers=1, seed=1))
+    assert len(puzzles) == 4
+    for grid, equals, diffs in puzzles:
+        assert TangoCPSATSolver(6, grid, equals, diffs).is_unique()
@@ -0,0 +1,71 @@
+import pytest
+
+import queens_generator
+from queens import QueensSATSolver
+
+# every encoding and mode against the pairwise sat model
+QUEENS_ENGINES = [
+    {'amo_encoding': 'sequential'},
+    {'amo_encoding': 'commander'},
+    {'amo_encoding': 'product'},
+    {'vectorized': True},
+    {'presolve': True},
+]
+
+
+@pytest.mark.parametrize('n', [5, 8, 11])
+@pytest.mark.parametrize('options', QUEENS_ENGINES)
+def test_queens_engines(n, options):
+    for seed in range(3):
+        grid, solution = queens_generator.generate_queens(n, seed=seed)
+        for given in ([], solution[:2]):
+            expected = QueensSATSolver(grid, given).solve()
+            assert sorted(expected) == sorted(solution)
+            assert sorted(QueensSATSolver(grid, given, **options).solve()) == sorted(expected)
+
+
+@pytest.mark.parametrize('options', QUEENS_ENGINES)
+def test_queens_engines_unsat(options):
+    grid, solution = queens_generator.generate_queens(6, seed=0)
+    r, c = solution[0]
+    # a queen on the first row that isn't the one of the only solution
+    given = [(r, (c + 2) % 6)]
+    assert QueensSATSolver(grid, given).solve() is None
+    assert QueensSATSolver(grid, given, **options).solve() is None
+
+
+def test_propagate_keeps_the_solution():
+    for n in (6, 9, 12):
+        grid, solution = queens_generator.generate_queens(n, seed=1)
+        placed, remaining = QueensSATSolver(grid, []).propagate()
+        assert set(placed) <= set(solution)
+        assert set(solution) <= set(placed) | remaining
+        assert not set(placed) & remaining
+
+
+def test_propagate_places_forced_queens():
+    grid, solution = queens_generator.generate_queens(8, seed=2)
+    # with all queens but the last one given, rows, columns and regions leave one cell for it
+    placed, remaining = QueensSATSolver(grid, solution[:-1]).propagate()
+    assert sorted(placed) == sorted(solution)
+    assert not remaining
+
+
+def test_propagate_solves_single_cell_regions():
+    # three one-cell regions hold three queens of the only solution, the big region gets the cell left over
+    grid = [
+        [4, 1, 4, 4],
+        [4, 4, 4, 2],
+        [3, 4, 4, 4],
+        [4, 4, 4, 4],
+    ]
+    placed, remaining = QueensSATSolver(grid, []).propagate()
+    assert sorted(placed) == [(0, 1), (1, 3), (2, 0), (3, 2)]
+    assert not remaining
+
+
+def test_propagate_conflicting_queens():
+    grid, solution = queens_generator.generate_queens(6, seed=0)
+    r, c = solution[0]
+    # two given queens in one row
+    assert QueensSATSolver(grid, [(r, c), (r, (c + 3) % 6)]).propagate() is None
@@ -0,0 +1,98 @@
+import json
+
+import pytest
+
+import corpus
+import queens_generator
+import solve_cli
+
+from boards import TANGO, ZIP, is_zip_path
+
+
+def test_parse_compact():
+    puzzle = solve_cli.parse_compact('mini_sudoku 1...../....../.2..../....../....0./.....6 ')
+    assert puzzle['game'] == 'mini_sudoku'
+    assert puzzle['id'] is None
+    assert puzzle['args'] == ([[1, 0, 0, 0, 0, 0], [0] * 6, [0, 2, 0, 0, 0, 0], [0] * 6, [0] * 6,
+                               [0, 0, 0, 0, 0, 6]],)
+    assert solve_cli.parse_compact('queens aabb/accb/ddcb/dddb 0,1')['args'] == (
+        [[1, 1, 2, 2], [1, 3, 3, 2], [4, 4, 3, 2], [4, 4, 4, 2]], [(0, 1)])
+    assert solve_cli.parse_compact('tango SM/.. 0,0=1,0 0,1x1,1')['args'] == (
+        2, [[1, 0], [-1, -1]], [((0, 0), (1, 0))], [((0, 1), (1, 1))])
+    assert solve_cli.parse_compact('zip 1.a/..2 0,0|1,0')['args'] == ([[1, 0, 10], [0, 0, 2]], {((0, 0), (1, 0))})
+
+
+@pytest.mark.parametrize('line', [
+    'mini_sudoku 1..../...../',
+    'queens aab/acb',
+    'tango SM/.. 0,0-1,0',
+    'zip 1../..2/.',
+    'chess ..../....',
+])
+def test_parse_compact_errors(line):
+    with pytest.raises(ValueError):
+        solve_cli.parse_compact(line)
+
+
+def test_parse_json():
+    grid, equals, diffs = TANGO
+    line = json.dumps({'id': 'a', 'grid': grid, 'equals': equals, 'diffs': diffs})
+    puzzle = solve_cli.parse_json(line, 'tango')
+    assert puzzle == {'game': 'tango', 'id': 'a', 'args': (6, grid, equals, diffs)}
+    grid, walls = ZIP
+    puzzle = solve_cli.parse_json(json.dumps({'game': 'zip', 'grid': grid, 'walls': sorted(walls)}))
+    assert puzzle['args'] == (grid, walls)
+    puzzle = solve_cli.parse_json('{"game": "queens", "grid": [[1, 2], [2, 2]], "queens": [[0, 0]]}')
+    assert puzzle['args'] == ([[1, 2], [2, 2]], [(0, 0)])
+    with pytest.raises(ValueError):
+        solve_cli.parse_json('{"game": "queens", "grid": [[1, 2]]}')
+
+
+def test_read_puzzles():
+    lines = ['# a comment\n', '\n', 'queens aabb/accb/ddcb/dddb\n', '{"grid": [[1]]}\n', 'zip 1./\n']
+    puzzles = list(solve_cli.read_puzzles(lines, 'zip'))
+    assert [puzzle['game'] for puzzle in puzzles] == ['queens', 'zip', None]
+    assert puzzles[2]['error'].startswith('Unreadable puzzle')
+
+
+# the zip engines take any rectangle
+@pytest.mark.parametrize('engine', list(solve_cli.ENGINES['zip']))
+def test_rectangular_zip(engine):
+    puzzle = solve_cli.parse_compact('zip 1.../..../...2')
+    result = solve_cli.solve_puzzle(0, puzzle, dict(solve_cli.DEFAULT_ENGINES, zip=engine))
+    assert result['status'] == 'solved'
+    assert is_zip_path(*puzzle['args'], [tuple(cell) for cell in result['solution']])
+
+
+def test_unknown_profile(capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        solve_cli.main(['--profile', 'nope'])
+    assert exit_info.value.code == 2
+    assert "unknown profile 'nope'" in capsys.readouterr().err
+
+
+def test_read_corpus(tmp_path):
+    queens = [queens_generator.generate_queens(7, seed=seed) for seed in range(3)]
+    path = tmp_path / 'corpus.bin'
+    corpus.write(path, [('queens', 7, 3, iter(queens)), ('tango', 6, 1, iter([TANGO])), ('zip', 6, 1, iter([ZIP]))])
+    assert solve_cli.is_corpus(path)
+    puzzles = list(solve_cli.read_corpus(path, {'queens/7', 'zip/6'}))
+    assert [puzzle['id'] for puzzle in puzzles] == ['queens/7#0', 'queens/7#1', 'queens/7#2', 'zip/6#0']
+    # queens are solved from the board alone
+    assert puzzles[0]['args'] == (queens[0][0], [])
+    assert len(list(solve_cli.read_corpus(path))) == 5
+
+
+# corpus and text files in one run, solved by a pool and written in input order
+def test_main(tmp_path):
+    path = tmp_path / 'corpus.bin'
+    corpus.write(path, [('tango', 6, 1, iter([TANGO])), ('zip', 6, 1, iter([ZIP]))])
+    text = tmp_path / 'puzzles.txt'
+    text.write_text('queens aabb/accb/ddcb/dddb\nzip 1.../2...\n')
+    assert not solve_cli.is_corpus(text)
+    out = tmp_path / 'results.jsonl'
+    assert solve_cli.main([str(text), str(path), '--workers', '2', '--ordered', '-o', str(out)]) == 0
+    results = [json.loads(line) for line in out.read_text().splitlines()]
+    assert [result['index'] for result in results] == [0, 1, 2, 3]
+    assert [result['status'] for result in results] == ['unsat', 'solved', 'solved', 'solved']
+    assert [result['id'] for result in results][2:] == ['tango/6#0', 'zip/6#0']
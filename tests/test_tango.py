@@ -0,0 +1,79 @@
+import random
+
+import pytest
+
+import tango_generator
+from tango import TangoCPSATSolver
+from tango_bitmask import TangoBitmaskSolver
+
+from boards import TANGO
+
+# TangoBitmaskSolver, which runs without cp-sat, against TangoCPSATSolver
+
+
+@pytest.mark.parametrize('solver_class', [TangoBitmaskSolver, TangoCPSATSolver])
+def test_tango_engines(solver_class):
+    puzzles = [TANGO] + [tango_generator.generate_tango(n, seed=seed) for n in (6, 8) for seed in range(3)]
+    for grid, equals, diffs in puzzles:
+        n = len(grid)
+        expected = TangoCPSATSolver(n, grid, equals, diffs).solve()
+        options = {'cached': True} if solver_class is TangoCPSATSolver else {}
+        assert solver_class(n, grid, equals, diffs, **options).solve() == expected
+
+
+def test_forced_opposite():
+    solver = TangoBitmaskSolver(6, [[-1] * 6 for _ in range(6)], [], [])
+    # xx. -> the cell after the pair flips, .xx. -> both ends
+    assert solver.forced_opposite(0b000011) == 0b000100
+    assert solver.forced_opposite(0b000110) == 0b001001
+    # x.x -> the middle one
+    assert solver.forced_opposite(0b000101) == 0b000010
+    # three of a kind is full, the rest is the other symbol
+    assert solver.forced_opposite(0b101001) == 0b010110
+    # three in a row, or more than half
+    assert solver.forced_opposite(0b000111) is None
+    assert solver.forced_opposite(0b101101) is None
+
+
+def test_line_completions():
+    solver = TangoBitmaskSolver(6, [[-1] * 6 for _ in range(6)], [], [])
+    # sun moon sun moon . . -> moon sun or sun moon at the end, nothing forced
+    assert solver.line_completions(0b000101, 0b001010) == (0, 0)
+    # suns on 0 and 1, moons on 2 and 3 -> a moon on 4 makes three moons in a row, so sun on 4 and moon on 5
+    assert solver.line_completions(0b000011, 0b001100) == (0b010000, 0b100000)
+    # suns on 0 and 2, moons on 3 and 4 -> sun on 5 and the last moon on 1
+    assert solver.line_completions(0b000101, 0b011000) == (0b100000, 0b000010)
+    # three moons in a row already
+    assert solver.line_completions(0b000011, 0b111000) is None
+
+
+# every solution of a puzzle with few clues, counted both ways
+def test_tango_search_finds_every_solution():
+    grid = [[-1] * 6 for _ in range(6)]
+    grid[0][0] = 1
+    grid[2][3] = 0
+    equals = [((4, 4), (4, 5))]
+    solver = TangoBitmaskSolver(6, grid, equals, [])
+    state = solver.initial_state()
+    found = sorted(solver.to_grid(solved) for solved in solver.search(state))
+    expected = sorted(TangoCPSATSolver(6, grid, equals, []).iter_solutions())
+    assert found == expected
+    assert len(found) > 1
+
+
+def test_tango_restarts():
+    # a budget of one branch makes every puzzle that needs a guess go through the restarts
+    for seed in range(3):
+        grid, equals, diffs = tango_generator.generate_tango(8, seed=seed)
+        solver = TangoBitmaskSolver(8, grid, equals, diffs, random.Random(seed))
+        solver.FIRST_RESTART = 1
+        assert solver.solve() == TangoCPSATSolver(8, grid, equals, diffs).solve()
+
+
+def test_tango_unsat():
+    grid, equals, diffs = TANGO
+    # an equals and a diffs marker on the same pair
+    solver = TangoBitmaskSolver(6, grid, equals + [((0, 0), (0, 1))], diffs + [((0, 0), (0, 1))])
+    with pytest.raises(Exception):
+        solver.solve()
+    assert solver.stats.status == 'unsat'
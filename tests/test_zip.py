@@ -0,0 +1,119 @@
+import random
+
+import pytest
+
+import zip_boolean
+import zip_circuit
+import zip_integer
+from zip_search import ZipSearchSolver, luby
+
+from boards import ZIP, is_zip_path
+
+# the zip engines against each other. the example board has more than one path, so every engine only has to find
+# a valid one
+
+ZIP_ENGINES = [zip_integer.ZipCPSATSolver, zip_boolean.ZipCPSATSolver, zip_circuit.ZipCPSATSolver, ZipSearchSolver]
+
+
+@pytest.mark.parametrize('solver_class', ZIP_ENGINES)
+def test_zip_engines(solver_class):
+    grid, walls = ZIP
+    assert is_zip_path(grid, walls, solver_class(grid, walls).solve())
+
+
+@pytest.mark.parametrize('solver_class', ZIP_ENGINES)
+def test_zip_engines_unsat(solver_class):
+    grid, walls = ZIP
+    # walls the top right corner off
+    walls = walls | {((0, 4), (0, 5)), ((0, 5), (1, 5))}
+    assert solver_class(grid, walls).solve() is None
+
+
+# true if grid has a solution, trying every path from the first number
+def has_path(grid, walls):
+    rows, cols = len(grid), len(grid[0])
+    walls = {(min(a, b), max(a, b)) for a, b in walls}
+    start = next((r, c) for r in range(rows) for c in range(cols) if grid[r][c] == 1)
+
+    def extend(path, seen):
+        if len(path) == rows * cols:
+            return is_zip_path(grid, walls, path)
+        r, c = path[-1]
+        for nxt in ((r + 1, c), (r - 1, c), (r, c + 1), (r, c - 1)):
+            if 0 <= nxt[0] < rows and 0 <= nxt[1] < cols and nxt not in seen \
+                    and (min(path[-1], nxt), max(path[-1], nxt)) not in walls:
+                if extend(path + [nxt], seen | {nxt}):
+                    return True
+        return False
+
+    return extend([start], {start})
+
+
+# small random boards, including ones with a single number where the greedy walk covers the board but can't end
+# on the last number
+@pytest.mark.parametrize('solver_class', ZIP_ENGINES[:3])
+def test_warm_start_against_brute_force(solver_class):
+    rng = random.Random(0)
+    for _ in range(60):
+        rows, cols = rng.randint(1, 3), rng.randint(2, 3)
+        cells = [(r, c) for r in range(rows) for c in range(cols)]
+        grid = [[0] * cols for _ in range(rows)]
+        for number, (r, c) in enumerate(rng.sample(cells, rng.randint(1, min(3, len(cells)))), 1):
+            grid[r][c] = number
+        pairs = [((r, c), (r, c + 1)) for r, c in cells if c + 1 < cols]
+        pairs += [((r, c), (r + 1, c)) for r, c in cells if r + 1 < rows]
+        walls = set(rng.sample(pairs, rng.randint(0, 1)))
+        path = solver_class(grid, walls, warm_start=True).solve()
+        if has_path(grid, walls):
+            assert is_zip_path(grid, walls, path)
+        else:
+            assert path is None
+        assert (solver_class(grid, walls).solve() is None) == (path is None)
+
+
+@pytest.mark.parametrize('solver_class', ZIP_ENGINES[:3])
+def test_hint_accepted(solver_class):
+    grid, walls = ZIP
+    solver = solver_class(grid, walls, warm_start=True)
+    path = solver.solve()
+    assert is_zip_path(grid, walls, path)
+    assert solver.hint
+    assert solver.hint_accepted == (path[:len(solver.hint)] == solver.hint)
+    cold = solver_class(grid, walls)
+    cold.solve()
+    assert cold.hint_accepted is None
+
+    # a single number on a board bigger than one cell has no solution, whatever the greedy walk covers
+    assert solver_class([[1, 0], [0, 0]], warm_start=True).solve() is None
+
+
+def test_luby():
+    assert [luby(i) for i in range(1, 16)] == [1, 1, 2, 1, 1, 2, 4, 1, 1, 2, 1, 1, 2, 4, 8]
+
+
+def test_zip_search():
+    grid, walls = ZIP
+    solver = ZipSearchSolver(grid, walls)
+    path = solver.solve()
+    assert is_zip_path(grid, walls, path)
+    assert solver.stats.status == 'solved'
+
+
+def test_zip_search_restarts():
+    grid, walls = ZIP
+    solver = ZipSearchSolver(grid, walls, random.Random(1))
+    solver.RESTART_UNIT = 1
+    assert is_zip_path(grid, walls, solver.solve())
+
+
+def test_zip_search_parity():
+    # 1 and 2 on the same colour of a 4 x 4 board can't be the ends of a path over all 16 cells
+    grid = [[0] * 4 for _ in range(4)]
+    grid[0][0] = 1
+    grid[3][3] = 2
+    solver = ZipSearchSolver(grid)
+    assert solver.solve() is None
+    assert solver.stats.status == 'unsat'
+    grid[3][3] = 0
+    grid[3][0] = 2
+    assert is_zip_path(grid, set(), ZipSearchSolver(grid).solve())
@@ -3,6 +3,7 @@ import tkinter as tk
 from tkinter import ttk, simpledialog, messagebox
 import time
 import os
+import multiprocessing as mp
 from math import floor
 
 
@@ -10,6 +11,128 @@ from mini_sudoku import MiniSudokuSATSolver
 from queens import QueensSATSolver
 from tango import TangoCPSATSolver
 from zip_boolean import ZipCPSATSolver
+import batch
+import solve_stats
+
+
+# runs in the solve process: builds the solver from args like batch.make_solver and sends back
+# ('ok', solution, seconds, solver.stats as a dict) or ('error', message)
+def _solve_worker(conn, solver_class, args):
+	start = time.time()
+	try:
+		solver = batch.make_solver(solver_class, args)
+		sol = solver.solve()
+	except Exception as e:
+		conn.send(('error', str(e)))
+		return
+	conn.send(('ok', sol, time.time() - start, solver.stats.to_dict()))
+
+
+# retained-mode drawing for a grid canvas. every (key, kind) gets one canvas item, created the first time it is
+# shown and after that only changed with itemconfig when its options differ from what is on screen, so redrawing
+# costs one dict comparison per cell and tk only hears about the cells that changed. hidden items stay on the
+# canvas with state='hidden'. keys are cells (r, c) or edges ((r1, c1), (r2, c2)), kinds pick the shape:
+#   cells: 'rect' (the cell), 'text' and 'image' (centered), 'overlay' (inner outline), 'disc' (centered circle),
+#          'note' (small text in the bottom-right corner)
+#   edges: 'marker' (text on the shared border), 'wall' (line along it)
+class CanvasLayer:
+
+	def __init__(self, canvas, cell_size):
+		self.canvas = canvas
+		self.s = cell_size
+		self.items = {}
+		# options last sent to each item
+		self.options = {}
+		self.hover_items = {}
+
+	def _create(self, key, kind):
+		c = self.canvas
+		s = self.s
+		if kind in ('marker', 'wall'):
+			(r1, c1), (r2, c2) = key
+			x = (c1 + c2 + 1) * s / 2
+			y = (r1 + r2 + 1) * s / 2
+			if kind == 'marker':
+				return c.create_text(x, y)
+			if r1 == r2:
+				# vertical wall between columns
+				return c.create_line(x, r1 * s, x, r1 * s + s)
+			return c.create_line(c1 * s, y, c1 * s + s, y)
+		r, col = key
+		x0, y0 = col * s, r * s
+		x1, y1 = x0 + s, y0 + s
+		if kind == 'rect':
+			return c.create_rectangle(x0, y0, x1, y1, outline='black')
+		if kind == 'text':
+			return c.create_text(x0 + s/2, y0 + s/2)
+		if kind == 'image':
+			return c.create_image(x0 + s/2, y0 + s/2)
+		if kind == 'overlay':
+			return c.create_rectangle(x0+2, y0+2, x1-2, y1-2, width=3)
+		if kind == 'disc':
+			radius = int(s*0.32)
+			return c.create_oval(x0 + s/2 - radius, y0 + s/2 - radius, x0 + s/2 + radius, y0 + s/2 + radius, outline='')
+		if kind == 'note':
+			return c.create_text(x1 - 4, y1 - 4, anchor='se')
+		raise ValueError(f'Unknown item kind: {kind}')
+
+	def show(self, key, kind, **options):
+		options['state'] = 'normal'
+		item = self.items.get((key, kind))
+		if item is None:
+			item = self._create(key, kind)
+			self.items[(key, kind)] = item
+			# hover highlights stay on top of items created later
+			self.canvas.tag_raise('hover')
+		elif self.options[(key, kind)] == options:
+			return
+		self.canvas.itemconfig(item, **options)
+		self.options[(key, kind)] = options
+
+	def hide(self, key, kind):
+		item = self.items.get((key, kind))
+		if item is not None and self.options[(key, kind)] != {'state': 'hidden'}:
+			self.canvas.itemconfig(item, state='hidden')
+			self.options[(key, kind)] = {'state': 'hidden'}
+
+	# keys that have an item of kind, shown or hidden
+	def keys(self, kind):
+		return [key for key, k in self.items if k == kind]
+
+	# moves the single hover highlight of this shape ('rect' or 'line') to coords and hides the other one
+	def hover(self, shape, coords, width):
+		for other, item in self.hover_items.items():
+			if other != shape:
+				self.canvas.itemconfig(item, state='hidden')
+		item = self.hover_items.get(shape)
+		if item is None:
+			if shape == 'rect':
+				item = self.canvas.create_rectangle(*coords, outline='#ff9900', tags='hover')
+			else:
+				item = self.canvas.create_line(*coords, fill='#ff9900', tags='hover')
+			self.hover_items[shape] = item
+		else:
+			self.canvas.coords(item, *coords)
+		self.canvas.itemconfig(item, width=width, state='normal')
+		self.canvas.tag_raise(item)
+
+	# hover rectangle inside cell (r, c)
+	def hover_cell(self, r, c):
+		x0, y0 = c * self.s, r * self.s
+		self.hover('rect', (x0+2, y0+2, x0+self.s-2, y0+self.s-2), 3)
+
+	# hover line across the border between the two cells of edge, half_length on either side of its middle
+	def hover_edge(self, edge, half_length, width):
+		(r1, c1), (r2, c2) = edge
+		x = (c1 + c2 + 1) * self.s/2
+		y = (r1 + r2 + 1) * self.s/2
+		if r1 == r2:
+			self.hover('line', (x, y-half_length, x, y+half_length), width)
+		else:
+			self.hover('line', (x-half_length, y, x+half_length, y), width)
+
+	def hide_hover(self):
+		self.canvas.itemconfig('hover', state='hidden')
 
 
 class Visualizer:
@@ -20,6 +143,8 @@ class Visualizer:
 		# keep image refs to avoid GC
 		self._images = {}
 		self.current_frame = None
+		# the running background solve, see start_solve
+		self._solve_job = None
 		self.create_styles()
 		self.show_main_menu()
 
@@ -42,6 +167,8 @@ class Visualizer:
 			pass
 
 	def clear_current(self):
+		# leaving a screen stops its solve
+		self.cancel_solve()
 		if self.current_frame is not None:
 			self.current_frame.destroy()
 			self.current_frame = None
@@ -112,9 +239,12 @@ class Visualizer:
 		self.ms_cell_size = 48
 		self.ms_canvas = tk.Canvas(frame, width=self.ms_cell_size*6, height=self.ms_cell_size*6)
 		self.ms_canvas.pack(pady=8)
+		self.ms_layer = CanvasLayer(self.ms_canvas, self.ms_cell_size)
+		# cells the last solve filled in, outlined in blue until the next click
+		self.ms_solver_filled = set()
 		self.ms_draw()
 		self.ms_canvas.bind('<Motion>', self.ms_on_motion)
-		self.ms_canvas.bind('<Leave>', lambda e: self.ms_canvas.delete('hover'))
+		self.ms_canvas.bind('<Leave>', lambda e: self.ms_layer.hide_hover())
 		self.ms_canvas.bind('<Button-1>', self.ms_on_click)
 
 		# number buttons (click a number then click a cell to place it)
@@ -130,6 +260,7 @@ class Visualizer:
 		actions.pack(pady=6)
 		solve_btn = ttk.Button(actions, text='Solve', command=self.ms_solve)
 		solve_btn.pack(side='left', padx=6)
+		self.make_cancel_button(actions).pack(side='left', padx=6)
 		clear_btn = ttk.Button(actions, text='Clear Board', command=self.ms_clear_board)
 		clear_btn.pack(side='left', padx=6)
 		back = ttk.Button(actions, text='Back', command=self.show_main_menu)
@@ -137,24 +268,29 @@ class Visualizer:
 
 		self.ms_status = ttk.Label(frame, text='Click a number, then click a cell to place it')
 		self.ms_status.pack()
+		self.make_stats_label(frame).pack()
 
 	def ms_draw(self):
-		c = self.ms_canvas
-		s = self.ms_cell_size
-		c.delete('all')
 		for r in range(6):
 			for col in range(6):
-				x0 = col * s
-				y0 = r * s
-				x1 = x0 + s
-				y1 = y0 + s
-				c.create_rectangle(x0, y0, x1, y1, fill='white', outline='black')
-				val = self.ms_values[r][col]
-				if val > 0:
-					c.create_text(x0 + s/2, y0 + s/2, text=str(val), font=('Arial', int(s/2)))
-				# user-placed highlight
-				if getattr(self, 'ms_user_placed', None) and self.ms_user_placed[r][col]:
-					c.create_rectangle(x0+3, y0+3, x1-3, y1-3, outline='#ff9900', width=3, tags='user-placed')
+				self.ms_draw_cell(r, col)
+
+	def ms_draw_cell(self, r, col):
+		layer = self.ms_layer
+		s = self.ms_cell_size
+		layer.show((r, col), 'rect', fill='white')
+		val = self.ms_values[r][col]
+		if val > 0:
+			layer.show((r, col), 'text', text=str(val), font=('Arial', int(s/2)))
+		else:
+			layer.hide((r, col), 'text')
+		# user-placed highlight, or the solver's
+		if self.ms_user_placed[r][col]:
+			layer.show((r, col), 'overlay', outline='#ff9900')
+		elif (r, col) in self.ms_solver_filled:
+			layer.show((r, col), 'overlay', outline='#3b82f6')
+		else:
+			layer.hide((r, col), 'overlay')
 
 	def ms_select_number(self, val):
 		self.ms_selected_number = val
@@ -163,15 +299,10 @@ class Visualizer:
 	def ms_on_motion(self, event):
 		# highlight the cell under cursor
 		cell = self._coord_to_cell(event.x, event.y, self.ms_cell_size, 6)
-		self.ms_canvas.delete('hover')
 		if cell is None:
+			self.ms_layer.hide_hover()
 			return
-		r, c = cell
-		x0 = c * self.ms_cell_size
-		y0 = r * self.ms_cell_size
-		x1 = x0 + self.ms_cell_size
-		y1 = y0 + self.ms_cell_size
-		self.ms_canvas.create_rectangle(x0+2, y0+2, x1-2, y1-2, outline='#ff9900', width=3, tags='hover')
+		self.ms_layer.hover_cell(*cell)
 
 	def ms_on_click(self, event):
 		cell = self._coord_to_cell(event.x, event.y, self.ms_cell_size, 6)
@@ -185,7 +316,11 @@ class Visualizer:
 		# place user number (or blank)
 		self.ms_values[r][c] = self.ms_selected_number
 		self.ms_user_placed[r][c] = (self.ms_selected_number != 0)
-		self.ms_draw()
+		# the solver highlights go away with the next edit
+		changed = self.ms_solver_filled | {(r, c)}
+		self.ms_solver_filled = set()
+		for cell in changed:
+			self.ms_draw_cell(*cell)
 
 
 	def ms_solve(self):
@@ -194,14 +329,10 @@ class Visualizer:
 			return
 
 		grid = [[self.ms_values[r][c] for c in range(6)] for r in range(6)]
-		start = time.time()
-		try:
-			solver = MiniSudokuSATSolver(grid)
-			sol = solver.solve()
-		except Exception as e:
-			messagebox.showerror('Solve error', str(e))
-			return
-		elapsed = time.time() - start
+		self.start_solve(MiniSudokuSATSolver, (grid,), lambda sol, elapsed: self.ms_show_solution(grid, sol, elapsed),
+			self._ms_set_status)
+
+	def ms_show_solution(self, grid, sol, elapsed):
 		if sol is None:
 			self._ms_set_status('No solution found')
 			return
@@ -211,20 +342,11 @@ class Visualizer:
 		for r in range(6):
 			for c in range(6):
 				self.ms_values[r][c] = sol[r][c]
-		self.ms_draw()
-		c = self.ms_canvas
-		s = self.ms_cell_size
-		for r in range(6):
-			for col in range(6):
-				if self._ms_last_original[r][col] == 0:
-					x0 = col * s
-					y0 = r * s
-					x1 = x0 + s
-					y1 = y0 + s
-					c.create_rectangle(x0+2, y0+2, x1-2, y1-2, outline='#3b82f6', width=3, tags='solver-filled')
+				if self._ms_last_original[r][c] == 0:
+					self.ms_solver_filled.add((r, c))
 					# clear user highlight for solver-filled cells
-					if getattr(self, 'ms_user_placed', None):
-						self.ms_user_placed[r][col] = False
+					self.ms_user_placed[r][c] = False
+		self.ms_draw()
 
 		self._ms_set_status(f'Solved in {elapsed:.3f} seconds')
 
@@ -250,18 +372,19 @@ class Visualizer:
 		canvas.pack(pady=8)
 		self.q_canvas = canvas
 		self.q_cell_size = 40
+		self.q_layer = CanvasLayer(canvas, self.q_cell_size)
+		self.q_colors = self.generate_colors(self.qN)
 		# load queen image
 		self.q_queen_img = self.load_icon('queen.png', size=(int(self.q_cell_size*0.8), int(self.q_cell_size*0.8)))
 		self.q_draw_grid()
 		# bind hover events for queens canvas
 		self.q_canvas.bind('<Motion>', self.q_on_motion)
-		self.q_canvas.bind('<Leave>', lambda e: self.q_canvas.delete('hover'))
+		self.q_canvas.bind('<Leave>', lambda e: self.q_layer.hide_hover())
 
 		controls = ttk.Frame(frame)
 		controls.pack()
 		self.q_color = 1
-		colors = self.generate_colors(self.qN)
-		for i, col in enumerate(colors, start=1):
+		for i, col in enumerate(self.q_colors, start=1):
 			b = tk.Button(controls, text=str(i), bg=col, command=lambda v=i: self.q_set_color(v))
 			b.pack(side='left', padx=2)
 
@@ -274,48 +397,40 @@ class Visualizer:
 		clear_btn.pack(side='left', padx=6)
 		solve_btn = ttk.Button(controls, text='Solve', command=self.q_solve)
 		solve_btn.pack(side='left', padx=6)
+		self.make_cancel_button(controls).pack(side='left', padx=6)
 		back = ttk.Button(controls, text='Back', command=self.show_main_menu)
 		back.pack(side='left', padx=6)
 
 		self.q_mode = 'color'  # or 'queen'
 		self.q_status = ttk.Label(frame, text='Click a color then click cells to paint regions. Use Queen Mode to place queens.')
 		self.q_status.pack()
+		self.make_stats_label(frame).pack()
 		canvas.bind('<Button-1>', self.q_on_click)
 
 	def q_draw_grid(self):
-		c = self.q_canvas
-		n = self.qN
-		s = self.q_cell_size
-		c.delete('all')
-		for r in range(n):
-			for col in range(n):
-				x0 = col * s
-				y0 = r * s
-				x1 = x0 + s
-				y1 = y0 + s
-				region = self.q_regions[r][col]
-				fill = self.generate_colors(self.qN)[region-1] if region > 0 else 'white'
-				c.create_rectangle(x0, y0, x1, y1, fill=fill, outline='black')
-				if (r, col) in self.q_queens:
-					if getattr(self, 'q_queen_img', None):
-						c.create_image(x0 + s/2, y0 + s/2, image=self.q_queen_img)
-					else:
-						c.create_text(x0 + s/2, y0 + s/2, text='♛', fill='black', font=('Arial', int(s/2)))
-		# clear any existing hover tag (drawn by motion handler)
-		c.delete('hover')
+		for r in range(self.qN):
+			for col in range(self.qN):
+				self.q_draw_cell(r, col)
+
+	def q_draw_cell(self, r, col):
+		layer = self.q_layer
+		region = self.q_regions[r][col]
+		layer.show((r, col), 'rect', fill=self.q_colors[region-1] if region > 0 else 'white')
+		if (r, col) in self.q_queens:
+			if getattr(self, 'q_queen_img', None):
+				layer.show((r, col), 'image', image=self.q_queen_img)
+			else:
+				layer.show((r, col), 'text', text='♛', fill='black', font=('Arial', int(self.q_cell_size/2)))
+		else:
+			layer.hide((r, col), 'image')
+			layer.hide((r, col), 'text')
 
 	def q_on_motion(self, event):
-		c = self.q_canvas
 		cell = self._coord_to_cell(event.x, event.y, self.q_cell_size, self.qN)
-		c.delete('hover')
 		if cell is None:
+			self.q_layer.hide_hover()
 			return
-		r, col = cell
-		x0 = col * self.q_cell_size
-		y0 = r * self.q_cell_size
-		x1 = x0 + self.q_cell_size
-		y1 = y0 + self.q_cell_size
-		c.create_rectangle(x0+2, y0+2, x1-2, y1-2, outline='#ff9900', width=3, tags='hover')
+		self.q_layer.hover_cell(*cell)
 
 	def q_set_color(self, v):
 		self.q_color = v
@@ -342,7 +457,7 @@ class Visualizer:
 				self.q_queens.remove((row, col))
 			else:
 				self.q_queens.add((row, col))
-		self.q_draw_grid()
+		self.q_draw_cell(row, col)
 
 	def q_on_drag(self, event):
 		# when dragging with button held, paint color if in color mode
@@ -352,8 +467,10 @@ class Visualizer:
 		if cell is None:
 			return
 		r, col = cell
+		if self.q_regions[r][col] == self.q_color:
+			return
 		self.q_regions[r][col] = self.q_color
-		self.q_draw_grid()
+		self.q_draw_cell(r, col)
 
 	def q_clear_board(self):
 		# reset queens board
@@ -366,6 +483,7 @@ class Visualizer:
 		self.ms_values = [[0 for _ in range(6)] for _ in range(6)]
 		self.ms_user_placed = [[False for _ in range(6)] for _ in range(6)]
 		self.ms_selected_number = None
+		self.ms_solver_filled = set()
 		if getattr(self, 'ms_canvas', None):
 			self.ms_draw()
 		self._ms_set_status('Board cleared')
@@ -415,20 +533,18 @@ class Visualizer:
 		mapping = {val: i+1 for i, val in enumerate(distinct)}
 		grid = [[mapping[self.q_regions[r][c]] for c in range(self.qN)] for r in range(self.qN)]
 		queens_list = list(self.q_queens)
-		start = time.time()
-		try:
-			solver = QueensSATSolver(grid, queens_list)
-			sol = solver.solve()
-		except Exception as e:
-			messagebox.showerror('Solve error', str(e))
-			return
-		elapsed = time.time() - start
+		self.start_solve(QueensSATSolver, (grid, queens_list), self.q_show_solution,
+			lambda text: self.q_status.config(text=text))
+
+	def q_show_solution(self, sol, elapsed):
 		if sol is None:
 			self.q_status.config(text='No solution found')
 			return
-		# mark result queens (sol is list of positions)
+		# mark result queens (sol is list of positions), only the cells that changed are redrawn
+		changed = self.q_queens ^ set(sol)
 		self.q_queens = set(sol)
-		self.q_draw_grid()
+		for cell in changed:
+			self.q_draw_cell(*cell)
 		self.q_status.config(text=f'Solved in {elapsed:.3f} seconds')
 
 	# ---------------- Tango ----------------
@@ -456,13 +572,14 @@ class Visualizer:
 		canvas.pack(pady=8)
 		self.t_canvas = canvas
 		self.t_cell_size = 40
+		self.t_layer = CanvasLayer(canvas, self.t_cell_size)
 		# load sun/moon images
 		self.t_sun_img = self.load_icon('sun.png', size=(int(self.t_cell_size*0.8), int(self.t_cell_size*0.8)))
 		self.t_moon_img = self.load_icon('moon.png', size=(int(self.t_cell_size*0.64), int(self.t_cell_size*0.64)))
 		self.t_draw()
 		# hover bindings to show cell/edge highlight
 		self.t_canvas.bind('<Motion>', self.t_on_motion)
-		self.t_canvas.bind('<Leave>', lambda e: self.t_canvas.delete('hover'))
+		self.t_canvas.bind('<Leave>', lambda e: self.t_layer.hide_hover())
 
 		controls = ttk.Frame(frame)
 		controls.pack()
@@ -471,47 +588,48 @@ class Visualizer:
 		ttk.Button(controls, text='Equals(edge)', command=lambda: self.t_set_mode('equals')).pack(side='left', padx=4)
 		ttk.Button(controls, text='Different(edge)', command=lambda: self.t_set_mode('diff')).pack(side='left', padx=4)
 		ttk.Button(controls, text='Solve', command=self.t_solve).pack(side='left', padx=6)
+		self.make_cancel_button(controls).pack(side='left', padx=6)
 		clear_btn = ttk.Button(controls, text='Clear Board', command=self.t_clear_board)
 		clear_btn.pack(side='left', padx=6)
 		ttk.Button(controls, text='Back', command=self.show_main_menu).pack(side='left', padx=6)
 
 		self.t_status = ttk.Label(frame, text='Click cells to place Sun/Moon; to mark an edge click two adjacent cells.')
 		self.t_status.pack()
+		self.make_stats_label(frame).pack()
 		self.t_last = None
 		canvas.bind('<Button-1>', self.t_on_click)
 
 	def t_draw(self):
-		c = self.t_canvas
-		n = self.tN
+		for r in range(self.tN):
+			for col in range(self.tN):
+				self.t_draw_cell(r, col)
+		# edge markers, including the ones shown before so removed markers get hidden
+		for pair in set(self.t_layer.keys('marker')) | self.t_equals | self.t_diffs:
+			self.t_draw_edge(pair)
+
+	def t_draw_cell(self, r, col):
+		layer = self.t_layer
 		s = self.t_cell_size
-		c.delete('all')
-		for r in range(n):
-			for col in range(n):
-				x0 = col * s
-				y0 = r * s
-				x1 = x0 + s
-				y1 = y0 + s
-				c.create_rectangle(x0, y0, x1, y1, fill='white', outline='black')
-				val = self.t_grid[r][col]
-				if val == 1:
-					if getattr(self, 't_sun_img', None):
-						c.create_image(x0 + s/2, y0 + s/2, image=self.t_sun_img)
-					else:
-						c.create_text(x0 + s/2, y0 + s/2, text='☀️', font=('Arial', int(s/2)))
-				elif val == 0:
-					if getattr(self, 't_moon_img', None):
-						c.create_image(x0 + s/2, y0 + s/2, image=self.t_moon_img)
-					else:
-						c.create_text(x0 + s/2, y0 + s/2, text='🌙', font=('Arial', int(s/2)))
-
-		# draw edge markers
-		for (a, b) in self.t_equals:
-			(r1, c1), (r2, c2) = a, b
-			self._draw_edge_marker((r1, c1), (r2, c2), '=')
-		for (a, b) in self.t_diffs:
-			(r1, c1), (r2, c2) = a, b
+		layer.show((r, col), 'rect', fill='white')
+		val = self.t_grid[r][col]
+		if val in (0, 1):
+			img = getattr(self, 't_sun_img' if val == 1 else 't_moon_img', None)
+			if img:
+				layer.show((r, col), 'image', image=img)
+			else:
+				layer.show((r, col), 'text', text='☀️' if val == 1 else '🌙', font=('Arial', int(s/2)))
+		else:
+			layer.hide((r, col), 'image')
+			layer.hide((r, col), 'text')
+
+	def t_draw_edge(self, pair):
+		if pair in self.t_equals:
+			self._draw_edge_marker(pair, '=')
+		elif pair in self.t_diffs:
 			# use multiplication symbol for 'different'
-			self._draw_edge_marker((r1, c1), (r2, c2), '✖')
+			self._draw_edge_marker(pair, '✖')
+		else:
+			self.t_layer.hide(pair, 'marker')
 
 	def _coord_to_cell(self, x, y, cell_size, n):
 		col = int(x // cell_size)
@@ -588,33 +706,19 @@ class Visualizer:
 			print(text)
 
 	def t_on_motion(self, event):
-		c = self.t_canvas
-		c.delete('hover')
 		if self.t_mode in ('sun', 'moon'):
 			cell = self._coord_to_cell(event.x, event.y, self.t_cell_size, self.tN)
 			if cell is None:
+				self.t_layer.hide_hover()
 				return
-			r, col = cell
-			x0 = col * self.t_cell_size
-			y0 = r * self.t_cell_size
-			x1 = x0 + self.t_cell_size
-			y1 = y0 + self.t_cell_size
-			c.create_rectangle(x0+2, y0+2, x1-2, y1-2, outline='#ff9900', width=3, tags='hover')
+			self.t_layer.hover_cell(*cell)
 		else:
 			edge = self._coord_to_edge(event.x, event.y, self.t_cell_size, self.tN)
-			if edge:
-				(a, b) = edge
-				(r1, c1), (r2, c2) = a, b
-				# compute center line
-				if r1 == r2:
-					x = (c1 + c2 + 1) * self.t_cell_size/2
-					y = (r1 + r2 + 1) * self.t_cell_size/2
-					# draw thicker bold line to represent edge highlight
-					c.create_line(x, y-10, x, y+10, fill='#ff9900', width=8, tags='hover')
-				else:
-					x = (c1 + c2 + 1) * self.t_cell_size/2
-					y = (r1 + r2 + 1) * self.t_cell_size/2
-					c.create_line(x-10, y, x+10, y, fill='#ff9900', width=8, tags='hover')
+			if edge is None:
+				self.t_layer.hide_hover()
+				return
+			# thicker bold line to represent edge highlight
+			self.t_layer.hover_edge(edge, 10, 8)
 
 	def t_on_click(self, event):
 		# allow single-click toggling on edge if clicked near an edge
@@ -635,7 +739,7 @@ class Visualizer:
 					self.t_diffs.add(pair)
 					if pair in self.t_equals:
 						self.t_equals.remove(pair)
-			self.t_draw()
+			self.t_draw_edge(pair)
 			return
 		# fallback to previous behaviour
 		s = self.t_cell_size
@@ -645,7 +749,7 @@ class Visualizer:
 			return
 		if self.t_mode in ('sun', 'moon'):
 			self.t_grid[row][col] = 1 if self.t_mode == 'sun' else 0
-			self.t_draw()
+			self.t_draw_cell(row, col)
 			self.t_last = None
 			return
 		# edge modes: two-click fallback
@@ -675,15 +779,10 @@ class Visualizer:
 					self.t_diffs.add(pair)
 					if pair in self.t_equals:
 						self.t_equals.remove(pair)
-			self.t_draw()
+			self.t_draw_edge(pair)
 
-	def _draw_edge_marker(self, pos1, pos2, sym):
-		(r1, c1) = pos1
-		(r2, c2) = pos2
-		s = self.t_cell_size
-		x = (c1 + c2 + 1) * s/2
-		y = (r1 + r2 + 1) * s/2
-		self.t_canvas.create_text(x, y, text=sym, font=('Arial', 12), fill='red')
+	def _draw_edge_marker(self, pair, sym):
+		self.t_layer.show(pair, 'marker', text=sym, font=('Arial', 12), fill='red')
 
 	def t_set_mode(self, m):
 		self.t_mode = m
@@ -695,14 +794,10 @@ class Visualizer:
 		if TangoCPSATSolver is None:
 			messagebox.showerror('Solver missing', 'Tango solver not available (missing imports)')
 			return
-		start = time.time()
-		try:
-			solver = TangoCPSATSolver(self.tN, self.t_grid, list(self.t_equals), list(self.t_diffs))
-			sol = solver.solve()
-		except Exception as e:
-			messagebox.showerror('Solve error', str(e))
-			return
-		elapsed = time.time() - start
+		args = (self.tN, [row[:] for row in self.t_grid], list(self.t_equals), list(self.t_diffs))
+		self.start_solve(TangoCPSATSolver, args, self.t_show_solution, self._t_set_status)
+
+	def t_show_solution(self, sol, elapsed):
 		# apply solution to the board and redraw
 		if sol is None:
 			self._t_set_status('No solution found')
@@ -734,10 +829,12 @@ class Visualizer:
 		self.z_canvas = tk.Canvas(frame, width=40*size, height=40*size)
 		self.z_canvas.pack(pady=8)
 		self.z_cell_size = 40
+		self.z_layer = CanvasLayer(self.z_canvas, self.z_cell_size)
+		self.z_solution_steps = None
 		self.z_draw()
 		# hover bindings for zip canvas
 		self.z_canvas.bind('<Motion>', self.z_on_motion)
-		self.z_canvas.bind('<Leave>', lambda e: self.z_canvas.delete('hover'))
+		self.z_canvas.bind('<Leave>', lambda e: self.z_layer.hide_hover())
 
 		controls = ttk.Frame(frame)
 		controls.pack()
@@ -745,6 +842,7 @@ class Visualizer:
 		ttk.Button(controls, text='Wall Mode', command=lambda: setattr(self, 'z_mode', 'wall')).pack(side='left', padx=4)
 		ttk.Button(controls, text='Undo Last Number', command=self.z_undo_last).pack(side='left', padx=4)
 		ttk.Button(controls, text='Solve', command=self.z_solve).pack(side='left', padx=4)
+		self.make_cancel_button(controls).pack(side='left', padx=4)
 		clear_btn = ttk.Button(controls, text='Clear Board', command=self.z_clear_board)
 		clear_btn.pack(side='left', padx=4)
 		ttk.Button(controls, text='Back', command=self.show_main_menu).pack(side='left', padx=4)
@@ -752,84 +850,57 @@ class Visualizer:
 		self.z_mode = 'number'
 		self.z_status = ttk.Label(frame, text='Click cells to number in order or switch to Wall Mode to mark walls (click two adjacent cells).')
 		self.z_status.pack()
+		self.make_stats_label(frame).pack()
 		self.z_last = None
 		self.z_canvas.bind('<Button-1>', self.z_on_click)
 
 	def z_draw(self):
-		c = self.z_canvas
-		n = self.zN
+		for r in range(self.zN):
+			for col in range(self.zN):
+				self.z_draw_cell(r, col)
+		# walls, including the ones shown before so removed walls get hidden
+		for pair in set(self.z_layer.keys('wall')) | self.z_walls:
+			self.z_draw_wall(pair)
+
+	def z_draw_cell(self, r, col):
+		layer = self.z_layer
 		s = self.z_cell_size
-		c.delete('all')
-		for r in range(n):
-			for col in range(n):
-				x0 = col * s
-				y0 = r * s
-				x1 = x0 + s
-				y1 = y0 + s
-				c.create_rectangle(x0, y0, x1, y1, fill='white', outline='black')
-				val = self.z_grid[r][col]
-				if val > 0:
-					# draw black circle with number
-					radius = int(s*0.32)
-					cx = x0 + s/2
-					cy = y0 + s/2
-					c.create_oval(cx-radius, cy-radius, cx+radius, cy+radius, fill='black', outline='')
-					c.create_text(cx, cy, text=str(val), fill='white', font=('Arial', int(s*0.35)))
-
-		# draw walls as bold edges between cells
-		for (a, b) in self.z_walls:
-			(r1, c1), (r2, c2) = a, b
-			if r1 == r2:
-				# vertical wall between columns
-				row = r1
-				col_left = min(c1, c2)
-				x = (col_left + 1) * s
-				y0 = row * s
-				y1 = y0 + s
-				c.create_line(x, y0, x, y1, fill='black', width=6)
-			else:
-				# horizontal wall
-				col = c1
-				row_top = min(r1, r2)
-				y = (row_top + 1) * s
-				x0 = col * s
-				x1 = x0 + s
-				c.create_line(x0, y, x1, y, fill='black', width=6)
-
-		# draw solution path arrows if available
-		# draw small solution step numbers in bottom-right if available
-		if getattr(self, 'z_solution_steps', None):
-			for (rr, cc), step in self.z_solution_steps.items():
-				x1 = cc * s + s - 4
-				y1 = rr * s + s - 4
-				c.create_text(x1, y1, text=str(step), anchor='se', fill='#4b9eff', font=('Arial', int(s*0.22)))
+		layer.show((r, col), 'rect', fill='white')
+		val = self.z_grid[r][col]
+		if val > 0:
+			# black circle with number
+			layer.show((r, col), 'disc', fill='black')
+			layer.show((r, col), 'text', text=str(val), fill='white', font=('Arial', int(s*0.35)))
+		else:
+			layer.hide((r, col), 'disc')
+			layer.hide((r, col), 'text')
+		# small solution step number in bottom-right if available
+		step = self.z_solution_steps.get((r, col)) if self.z_solution_steps else None
+		if step is not None:
+			layer.show((r, col), 'note', text=str(step), fill='#4b9eff', font=('Arial', int(s*0.22)))
+		else:
+			layer.hide((r, col), 'note')
+
+	# walls are bold edges between cells
+	def z_draw_wall(self, pair):
+		if pair in self.z_walls:
+			self.z_layer.show(pair, 'wall', fill='black', width=6)
+		else:
+			self.z_layer.hide(pair, 'wall')
 
 	def z_on_motion(self, event):
-		c = self.z_canvas
-		c.delete('hover')
 		if self.z_mode == 'number':
 			cell = self._coord_to_cell(event.x, event.y, self.z_cell_size, self.zN)
 			if cell is None:
+				self.z_layer.hide_hover()
 				return
-			r, col = cell
-			x0 = col * self.z_cell_size
-			y0 = r * self.z_cell_size
-			x1 = x0 + self.z_cell_size
-			y1 = y0 + self.z_cell_size
-			c.create_rectangle(x0+2, y0+2, x1-2, y1-2, outline='#ff9900', width=3, tags='hover')
+			self.z_layer.hover_cell(*cell)
 		else:
 			edge = self._coord_to_edge(event.x, event.y, self.z_cell_size, self.zN)
-			if edge:
-				(a, b) = edge
-				(r1, c1), (r2, c2) = a, b
-				if r1 == r2:
-					x = (c1 + c2 + 1) * self.z_cell_size/2
-					y = (r1 + r2 + 1) * self.z_cell_size/2
-					c.create_line(x, y-14, x, y+14, fill='#ff9900', width=6, tags='hover')
-				else:
-					x = (c1 + c2 + 1) * self.z_cell_size/2
-					y = (r1 + r2 + 1) * self.z_cell_size/2
-					c.create_line(x-14, y, x+14, y, fill='#ff9900', width=6, tags='hover')
+			if edge is None:
+				self.z_layer.hide_hover()
+				return
+			self.z_layer.hover_edge(edge, 14, 6)
 
 	def z_on_click(self, event):
 		edge = self._coord_to_edge(event.x, event.y, self.z_cell_size, self.zN)
@@ -839,8 +910,8 @@ class Visualizer:
 				self.z_walls.remove(pair)
 			else:
 				self.z_walls.add(pair)
-			self.z_solution_steps = None
-			self.z_draw()
+			self.z_draw_wall(pair)
+			self.z_clear_solution()
 			return
 		# fallback to cell behaviour
 		s = self.z_cell_size
@@ -852,8 +923,8 @@ class Visualizer:
 			# set next number
 			self.z_grid[row][col] = self.z_next_num
 			self.z_next_num += 1
-			self.z_solution_steps = None
-			self.z_draw()
+			self.z_draw_cell(row, col)
+			self.z_clear_solution()
 			return
 		# wall mode fallback: two-click
 		if self.z_last is None:
@@ -871,7 +942,14 @@ class Visualizer:
 				self.z_walls.remove(pair)
 			else:
 				self.z_walls.add(pair)
-			self.z_draw()
+			self.z_draw_wall(pair)
+
+	# drops the step numbers of the last solve, redrawing only the cells that had one
+	def z_clear_solution(self):
+		steps = self.z_solution_steps
+		self.z_solution_steps = None
+		for cell in steps or ():
+			self.z_draw_cell(*cell)
 
 	def z_undo_last(self):
 		# remove highest number
@@ -885,32 +963,110 @@ class Visualizer:
 		if pos:
 			self.z_grid[pos[0]][pos[1]] = 0
 			self.z_next_num = max(1, maxn)
-			self.z_draw()
+			self.z_draw_cell(*pos)
 
 	def z_solve(self):
 		if ZipCPSATSolver is None:
 			messagebox.showerror('Solver missing', 'Zip solver not available (missing imports)')
 			return
-		start = time.time()
-		try:
-			solver = ZipCPSATSolver(self.z_grid, self.z_walls)
-			sol = solver.solve()
-		except Exception as e:
-			messagebox.showerror('Solve error', str(e))
-			return
-		elapsed = time.time() - start
+		args = ([row[:] for row in self.z_grid], set(self.z_walls))
+		self.start_solve(ZipCPSATSolver, args, self.z_show_solution, self._z_set_status)
+
+	def z_show_solution(self, sol, elapsed):
 		if sol is None:
 			self._z_set_status('No solution found')
 			return
 		# solver returns ordered list of (r,c) path; keep user numbers and store solution steps separately
+		self.z_clear_solution()
 		self.z_solution_steps = {}
 		for step, (r, c) in enumerate(sol, start=1):
 			self.z_solution_steps[(r, c)] = step
 		# redraw with solution overlay
 		if getattr(self, 'z_canvas', None):
-			self.z_draw()
+			for cell in self.z_solution_steps:
+				self.z_draw_cell(*cell)
 		self._z_set_status(f'Solved in {elapsed:.3f} seconds')
 
+	# ---------------- Background solving ----------------
+	# solves run in a separate process so the window stays responsive while they search. cancelling terminates
+	# that process, which is the only way to stop a pycosat or cp-sat search that is already running.
+	# the result comes back through a pipe that is polled with root.after, so on_done runs on the tk thread
+	def make_cancel_button(self, parent):
+		self.cancel_btn = ttk.Button(parent, text='Cancel', command=self.cancel_solve, state='disabled')
+		return self.cancel_btn
+
+	# second status line with the solve_stats telemetry of the last solve
+	def make_stats_label(self, parent):
+		self.stats_label = ttk.Label(parent, text='', foreground='#555555')
+		return self.stats_label
+
+	def set_stats(self, text):
+		try:
+			self.stats_label.config(text=text)
+		except tk.TclError:
+			# the screen with the label is already gone
+			pass
+
+	# starts solver_class(*args).solve() in the background, replacing any solve still running.
+	# on_done(sol, elapsed) gets the result, set_status shows the elapsed time meanwhile
+	def start_solve(self, solver_class, args, on_done, set_status):
+		self.cancel_solve()
+		conn, child_conn = mp.Pipe(duplex=False)
+		process = mp.Process(target=_solve_worker, args=(child_conn, solver_class, args), daemon=True)
+		process.start()
+		child_conn.close()
+		self._solve_job = {'process': process, 'conn': conn, 'start': time.time(),
+			'on_done': on_done, 'set_status': set_status}
+		self.cancel_btn.config(state='normal')
+		set_status('Solving... 0.0s')
+		self.set_stats('')
+		self.root.after(100, self._poll_solve, self._solve_job)
+
+	def _poll_solve(self, job):
+		# a cancelled or replaced solve stops polling
+		if job is not self._solve_job:
+			return
+		# checked before polling: a process that sends its result and exits between a poll and an is_alive
+		# check would otherwise be reported as failed with its result still in the pipe
+		alive = job['process'].is_alive()
+		if job['conn'].poll():
+			try:
+				result = job['conn'].recv()
+			except EOFError:
+				result = ('error', 'Solver process exited without a result')
+		elif not alive:
+			result = ('error', f'Solver process exited with code {job["process"].exitcode}')
+		else:
+			job['set_status'](f'Solving... {time.time() - job["start"]:.1f}s')
+			self.root.after(100, self._poll_solve, job)
+			return
+		self._finish_solve(job)
+		if result[0] == 'error':
+			job['set_status']('Solve failed')
+			messagebox.showerror('Solve error', result[1])
+			return
+		job['on_done'](result[1], result[2])
+		self.set_stats(solve_stats.format_summary(result[3]))
+
+	def _finish_solve(self, job):
+		job['conn'].close()
+		job['process'].join(timeout=1)
+		self._solve_job = None
+		try:
+			self.cancel_btn.config(state='disabled')
+		except tk.TclError:
+			# the screen with the button is already gone
+			pass
+
+	# stops the running solve, if there is one
+	def cancel_solve(self):
+		job = self._solve_job
+		if job is None:
+			return
+		job['process'].terminate()
+		self._finish_solve(job)
+		job['set_status'](f'Cancelled after {time.time() - job["start"]:.1f}s')
+
 	# ---------------- Helpers ----------------
 	def generate_colors(self, n):
 		# generate n distinct pastel colors
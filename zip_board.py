@@ -0,0 +1,104 @@
+import numpy as np
+
+class ZipBoard:
+
+    # wall-aware adjacency of a zip board, built once and shared by every zip engine and the benchmark generator.
+    # cells are numbered r * cols + c. the neighbours of cell i are targets[offsets[i]:offsets[i + 1]] (csr layout),
+    # in the order right, down, left, up, leaving out the ones behind a wall.
+    # wall_right[r, c] is a wall between (r, c) and (r, c + 1), wall_down[r, c] one between (r, c) and (r + 1, c)
+
+    # grid is a 2D array of ints where 0 is blank cell, 1,2,...,K are numbered cells that have to be visited in order
+    # walls is a set of position pairs indicating walls between cells, pairs that aren't neighbours are ignored
+
+    def __init__(self, grid, walls=None):
+        self.rows = len(grid)
+        self.cols = len(grid[0])
+        self.n_cells = self.rows * self.cols
+
+        if walls is None:
+            walls = set()
+        #makes it so that (a,b) and (b,a) are treated the same
+        self.walls = set((min(c1, c2), max(c1, c2)) for edge in walls for c1, c2 in [edge])
+
+        self.wall_right = np.zeros((self.rows, self.cols), dtype=bool)
+        self.wall_down = np.zeros((self.rows, self.cols), dtype=bool)
+        for (r1, c1), (r2, c2) in self.walls:
+            if r1 == r2 and c2 == c1 + 1:
+                self.wall_right[r1, c1] = True
+            elif c1 == c2 and r2 == r1 + 1:
+                self.wall_down[r1, c1] = True
+
+        # number -> cell index of the numbered cells
+        self.numbered = {}
+        for r in range(self.rows):
+            for c in range(self.cols):
+                if grid[r][c] > 0:
+                    self.numbered[grid[r][c]] = r * self.cols + c
+
+        self.build_adjacency()
+        # the same adjacency as python lists, for loops that work on one cell at a time
+        self.positions = [divmod(i, self.cols) for i in range(self.n_cells)]
+        targets = self.targets.tolist()
+        offsets = self.offsets.tolist()
+        self.neighbor_lists = [targets[offsets[i]:offsets[i + 1]] for i in range(self.n_cells)]
+
+    #builds offsets / targets from the wall arrays
+    def build_adjacency(self):
+        index = np.arange(self.n_cells, dtype=np.int32).reshape(self.rows, self.cols)
+        open_right = ~self.wall_right[:, :-1]
+        open_down = ~self.wall_down[:-1, :]
+        left, right = index[:, :-1][open_right], index[:, 1:][open_right]
+        top, bottom = index[:-1, :][open_down], index[1:, :][open_down]
+
+        # (source, target, direction) for every move, direction 0-3 = right, down, left, up
+        sources = np.concatenate([left, top, right, bottom])
+        targets = np.concatenate([right, bottom, left, top])
+        directions = np.repeat(np.arange(4), [len(left), len(top), len(right), len(bottom)])
+        order = np.lexsort((directions, sources))
+
+        self.targets = targets[order].astype(np.int32)
+        counts = np.bincount(sources, minlength=self.n_cells)
+        self.offsets = np.zeros(self.n_cells + 1, dtype=np.int32)
+        np.cumsum(counts, out=self.offsets[1:])
+
+    def cell(self, r, c):
+        return r * self.cols + c
+
+    def position(self, i):
+        return self.positions[i]
+
+    def neighbors(self, i):
+        return self.targets[self.offsets[i]:self.offsets[i + 1]]
+
+    def degree(self, i):
+        return int(self.offsets[i + 1] - self.offsets[i])
+
+    #checks if there's a wall between two adjacent cells
+    def is_wall_between(self, pos1, pos2):
+        (r1, c1), (r2, c2) = pos1, pos2
+        if r1 == r2 and abs(c1 - c2) == 1:
+            return bool(self.wall_right[r1, min(c1, c2)])
+        if c1 == c2 and abs(r1 - r2) == 1:
+            return bool(self.wall_down[min(r1, r2), c1])
+        return False
+
+    # bfs distance in moves from cell source to every cell, -1 for cells it can't reach
+    def distances(self, source):
+        dist = [-1] * self.n_cells
+        dist[source] = 0
+        frontier = [source]
+        while frontier:
+            next_frontier = []
+            for i in frontier:
+                for j in self.neighbor_lists[i]:
+                    if dist[j] < 0:
+                        dist[j] = dist[i] + 1
+                        next_frontier.append(j)
+            frontier = next_frontier
+        return dist
+
+    # every pair of neighbouring cells without a wall between them, as (i, j) with i < j
+    def edges(self):
+        sources = np.repeat(np.arange(self.n_cells, dtype=np.int32), np.diff(self.offsets))
+        forward = sources < self.targets
+        return list(zip(sources[forward].tolist(), self.targets[forward].tolist()))
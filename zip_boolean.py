@@ -1,22 +1,39 @@
 from ortools.sat.python import cp_model
 import time
 
+import batch
+import solution_stream
+import solve_stats
+import zip_heuristic
+from zip_board import ZipBoard
+
 class ZipCPSATSolver:
 
     # grid is a 2D array of ints where 0 is blank cell, 1,2,...,K are numbered cells that have to be visited in order
     # walls is a set of position pairs indicating walls between cells
+    # profile is a solve_profile.SolveProfile for the cp-sat parameters, None for the defaults
+    # warm_start=True first runs the greedy zip_heuristic path: a complete path is returned straight away, a partial
+    # one is passed to cp-sat as a solution hint. hint is that path, hint_accepted whether the solution kept it
+    # prune=True only creates the (step, cell) variables that pass the reachability checks in feasible_steps,
+    # build_stats records the variable / constraint counts and build time of the last model built,
+    # stats is a solve_stats.SolveStats with the per-step timings and search counters of solve()
 
-    def __init__(self, grid, walls=None):
+    def __init__(self, grid, walls=None, profile=None, prune=True, warm_start=False):
 
         self.grid = grid
+        self.profile = profile
+        self.warm_start = warm_start
+        self.hint = None
+        self.hint_accepted = None
+        self.prune = prune
+        self.build_stats = None
+        self.stats = solve_stats.SolveStats(type(self).__name__)
         self.rows = len(grid)
         self.cols = len(grid[0])
         
-        if walls is None:
-            walls = set()
-        
-        #makes it so that (a,b) and (b,a) are treated the same
-        self.walls = set((min(c1, c2), max(c1, c2)) for edge in walls for c1, c2 in [edge])
+        # wall-aware adjacency, also normalises walls so that (a,b) and (b,a) are treated the same
+        self.board = ZipBoard(grid, walls)
+        self.walls = self.board.walls
         
         self.numbered_cells = {}
         self.cells_to_visit = []
@@ -32,54 +49,98 @@ class ZipCPSATSolver:
     
     #checks if there's a wall between two adjacent cells
     def is_wall_between(self, pos1, pos2):
-        edge = (min(pos1, pos2), max(pos1, pos2))
-        return edge in self.walls
+        return self.board.is_wall_between(pos1, pos2)
     
-    #creates boolean variables for each step/cell combination
+    #steps each cell can be visited at. a path step moves to a neighbour, so cell v can only be visited at step i if
+    #it is at least bfs distance d(start, v) from the start, has d(v, end) steps left to reach the end, and i has
+    #the parity of d(start, v) (the grid is a checkerboard, every move changes colour). numbered cells are also
+    #bounded by the distances through the numbers before and after them
+    def feasible_steps(self):
+        board = self.board
+        last = self.n_tiles - 1
+        waypoints = [board.cell(*self.numbered_cells[num]) for num in range(1, self.max_number + 1)]
+        from_start = board.distances(waypoints[0])
+        to_end = board.distances(waypoints[-1])
+
+        # fewest steps from the start to each number, and from each number to the end
+        before = [0] * len(waypoints)
+        after = [0] * len(waypoints)
+        for k in range(1, len(waypoints)):
+            d = board.distances(waypoints[k - 1])[waypoints[k]]
+            before[k] = before[k - 1] + d if d >= 0 and before[k - 1] >= 0 else -1
+        for k in range(len(waypoints) - 2, -1, -1):
+            d = board.distances(waypoints[k])[waypoints[k + 1]]
+            after[k] = after[k + 1] + d if d >= 0 and after[k + 1] >= 0 else -1
+
+        steps = {}
+        for v, (r, c) in enumerate(board.positions):
+            if from_start[v] < 0 or to_end[v] < 0:
+                steps[(r, c)] = range(0)
+                continue
+            first, stop = from_start[v], last - to_end[v]
+            if self.grid[r][c] > 0:
+                k = self.grid[r][c] - 1
+                if before[k] < 0 or after[k] < 0:
+                    steps[(r, c)] = range(0)
+                    continue
+                first, stop = max(first, before[k]), min(stop, last - after[k])
+            # keep first on the parity of d(start, v)
+            first += (first - from_start[v]) % 2
+            steps[(r, c)] = range(first, stop + 1, 2)
+        return steps
+
+    #creates boolean variables for each step/cell combination, leaving out the impossible ones when pruning
     def create_position_variables(self):
         self.position = {}
+        if self.prune:
+            for (r, c), steps in self.feasible_steps().items():
+                for i in steps:
+                    self.position[(i, r, c)] = self.model.NewBoolVar(f'pos_{i}_r{r}_c{c}')
+            return
         for i in range(self.n_tiles):
             for r, c in self.cells_to_visit:
                 self.position[(i, r, c)] = self.model.NewBoolVar(f'pos_{i}_r{r}_c{c}')
 
     #adds basic constraints ensuring each cell is visited once and each step has one cell
     def add_basic_constraints(self):
+        # pruned (step, cell) pairs are missing from self.position and count as 0
         # Each step has exactly one cell
+        by_step = [[] for _ in range(self.n_tiles)]
+        by_cell = {cell: [] for cell in self.cells_to_visit}
+        for (i, r, c), var in self.position.items():
+            by_step[i].append(var)
+            by_cell[(r, c)].append(var)
         for i in range(self.n_tiles):
-            self.model.Add(sum(self.position[(i, r, c)] for r, c in self.cells_to_visit) == 1)
+            self.model.Add(sum(by_step[i]) == 1)
         
         # Each cell is visited exactly once
         for r, c in self.cells_to_visit:
-            self.model.Add(sum(self.position[(i, r, c)] for i in range(self.n_tiles)) == 1)
+            self.model.Add(sum(by_cell[(r, c)]) == 1)
     
     #adds constraints for starting and ending positions
     def add_start_end_constraints(self):
         r1, c1 = self.numbered_cells[1]
-        self.model.Add(self.position[(0, r1, c1)] == 1)
+        self.model.Add(self.position.get((0, r1, c1), 0) == 1)
         
         rk, ck = self.numbered_cells[self.max_number]
-        self.model.Add(self.position[(self.n_tiles - 1, rk, ck)] == 1)
+        self.model.Add(self.position.get((self.n_tiles - 1, rk, ck), 0) == 1)
     
     
     #adds constraints ensuring consecutive positions are adjacent and not blocked
     def add_adjacency_constraints(self):
+        board = self.board
         allowed_transitions = {}
         for r, c in self.cells_to_visit:
-            allowed = []
-            for dr, dc in [(0, 1), (1, 0), (0, -1), (-1, 0)]:
-                nr, nc = r + dr, c + dc
-                if 0 <= nr < self.rows and 0 <= nc < self.cols:
-                    if not self.is_wall_between((r, c), (nr, nc)):
-                        allowed.append((nr, nc))
-            allowed_transitions[(r, c)] = allowed
-        
-        for i in range(self.n_tiles - 1):
-            for r1, c1 in self.cells_to_visit:
-                allowed_next = allowed_transitions[(r1, c1)]
-                # at least one allowed neighbor must be visited at step i+1
-                self.model.Add(
-                    sum(self.position[(i+1, r2, c2)] for r2, c2 in allowed_next) >= 1
-                ).OnlyEnforceIf(self.position[(i, r1, c1)])
+            allowed_transitions[(r, c)] = [board.positions[j] for j in board.neighbor_lists[board.cell(r, c)]]
+        
+        for (i, r1, c1), var in self.position.items():
+            if i == self.n_tiles - 1:
+                continue
+            allowed_next = allowed_transitions[(r1, c1)]
+            # at least one allowed neighbor must be visited at step i+1
+            self.model.Add(
+                sum(self.position.get((i+1, r2, c2), 0) for r2, c2 in allowed_next) >= 1
+            ).OnlyEnforceIf(var)
     
     
     #adds constraints ensuring numbered cells are visited in increasing order
@@ -94,8 +155,10 @@ class ZipCPSATSolver:
             
             #link step variables to position variables
             for i in range(self.n_tiles):
-                self.model.Add(step_curr == i).OnlyEnforceIf(self.position[(i, r_curr, c_curr)])
-                self.model.Add(step_prev == i).OnlyEnforceIf(self.position[(i, r_prev, c_prev)])
+                if (i, r_curr, c_curr) in self.position:
+                    self.model.Add(step_curr == i).OnlyEnforceIf(self.position[(i, r_curr, c_curr)])
+                if (i, r_prev, c_prev) in self.position:
+                    self.model.Add(step_prev == i).OnlyEnforceIf(self.position[(i, r_prev, c_prev)])
             
             #enforce ordering
             self.model.Add(step_prev < step_curr)
@@ -105,7 +168,7 @@ class ZipCPSATSolver:
         path = []
         for i in range(self.n_tiles):
             for r, c in self.cells_to_visit:
-                if solver.Value(self.position[(i, r, c)]) == 1:
+                if (i, r, c) in self.position and solver.Value(self.position[(i, r, c)]) == 1:
                     path.append((r, c))
                     break
         return path
@@ -130,7 +193,7 @@ class ZipCPSATSolver:
                 
                 # Check for vertical wall to the right
                 if c < self.cols - 1:
-                    if self.is_wall_between((r, c), (r, c + 1)):
+                    if self.board.wall_right[r, c]:
                         row_str += "|"
                     else:
                         row_str += " "
@@ -140,7 +203,7 @@ class ZipCPSATSolver:
             if r < self.rows - 1:
                 wall_str = ""
                 for c in range(self.cols):
-                    if self.is_wall_between((r, c), (r + 1, c)):
+                    if self.board.wall_down[r, c]:
                         wall_str += "----"
                     else:
                         wall_str += "    "
@@ -150,21 +213,92 @@ class ZipCPSATSolver:
                     print(wall_str)
         
     
-    def solve(self):
+    #builds self.model and records build_stats
+    def build_model(self):
+        start = time.perf_counter()
+        timed = self.stats.timed
         self.model = cp_model.CpModel()
-        self.create_position_variables()
-        self.add_basic_constraints()
-        self.add_start_end_constraints()
-        self.add_adjacency_constraints()
-        self.add_ordering_constraints()
+        timed(self.create_position_variables)
+        timed(self.add_basic_constraints)
+        timed(self.add_start_end_constraints)
+        timed(self.add_adjacency_constraints)
+        timed(self.add_ordering_constraints)
+        self.build_stats = {
+            'pairs': self.n_tiles * self.n_tiles,
+            'variables': len(self.position),
+            'pruned': self.n_tiles * self.n_tiles - len(self.position),
+            'constraints': len(self.model.Proto().constraints),
+            'build_time': time.perf_counter() - start,
+        }
+    
+    #runs the greedy heuristic, returns its path if it already visits every cell and ends on the last number.
+    #with a single number the walk starts on the cell it has to end on, so only a 1 x 1 board passes
+    def heuristic_start(self):
+        self.hint = zip_heuristic.greedy_path(self.board)
+        if len(self.hint) == self.n_tiles and self.hint[-1] == self.numbered_cells[self.max_number]:
+            self.hint_accepted = True
+            return self.hint
+        return None
+    
+    #hints the cell of every step on the heuristic path
+    def add_hint(self):
+        for step, (r, c) in enumerate(self.hint):
+            if (step, r, c) in self.position:
+                self.model.AddHint(self.position[(step, r, c)], 1)
+    
+    #variables that fix a solution, the profile's search strategy branches on these
+    def decision_variables(self):
+        return [self.position[key] for key in sorted(self.position)]
+    
+    #cp-sat solver for self.model, from the profile if there is one
+    def make_solver(self):
+        if self.profile is None:
+            return cp_model.CpSolver()
+        return self.profile.make_solver(self.model, self.decision_variables())
+    
+    def solve(self):
+        if self.warm_start:
+            path = self.stats.timed(self.heuristic_start)
+            if path is not None:
+                self.stats.finish('solved')
+                return path
         
-        solver = cp_model.CpSolver()
-        status = solver.Solve(self.model)
+        self.build_model()
+        
+        if self.warm_start:
+            self.stats.timed(self.add_hint)
+        
+        solver = self.make_solver()
+        with self.stats.search():
+            status = solver.Solve(self.model)
+        self.stats.read_cp_sat(self.model, solver, status)
+        self.stats.finish()
         
         if status == cp_model.OPTIMAL or status == cp_model.FEASIBLE:
-            return self.extract_solution(solver)
+            path = self.extract_solution(solver)
+            if self.warm_start:
+                self.hint_accepted = path[:len(self.hint)] == self.hint
+            return path
         
+        if self.warm_start:
+            self.hint_accepted = False
         return None
+    
+    #yields every solution path lazily, at most limit of them. builds a fresh model without hints
+    def iter_solutions(self, limit=None):
+        self.build_model()
+        for values in solution_stream.iter_cp_solutions(self.model, self.decision_variables(), self.make_solver(), limit):
+            yield self.extract_solution(values)
+    
+    #true if the puzzle has exactly one solution path, stops looking at the second one
+    def is_unique(self):
+        return sum(1 for _ in self.iter_solutions(limit=2)) == 1
+
+    # solves many puzzles across a process pool, yielding (index, solution) in completion order
+    # each puzzle is a tuple of constructor arguments, (grid, walls). see batch.solve_many
+    @classmethod
+    def solve_many(cls, puzzles, workers=None):
+        return batch.solve_many(cls, puzzles, workers)
 
 if __name__ == "__main__":
     grid = [
@@ -0,0 +1,152 @@
+from ortools.sat.python import cp_model
+
+import zip_integer
+
+class ZipCPSATSolver(zip_integer.ZipCPSATSolver):
+
+    # zip as a single AddCircuit constraint: one literal per open edge direction between neighbouring cells,
+    # plus a fixed arc from the last numbered cell back to the first so the hamiltonian path closes into a circuit.
+    # the model grows with the number of edges instead of cells squared, so it handles boards past 10x10.
+    # grid, walls, profile and warm_start are the same as zip_integer.ZipCPSATSolver, which this reuses for
+    # the ZipBoard adjacency and print_solution
+
+    def node(self, r, c):
+        return self.board.cell(r, c)
+
+    #creates a literal for every move between two neighbouring cells without a wall between them
+    def create_arc_variables(self):
+        board = self.board
+        start = self.numbered_cells[1]
+        end = self.numbered_cells[self.max_number]
+        self.arcs = {}
+        for i, (r, c) in enumerate(board.positions):
+            for j in board.neighbor_lists[i]:
+                nr, nc = board.positions[j]
+                # the closing arc replaces the real move from end to start if they are neighbours
+                if ((r, c), (nr, nc)) == (end, start):
+                    continue
+                self.arcs[((r, c), (nr, nc))] = self.model.NewBoolVar(f"arc_{r}_{c}_to_{nr}_{nc}")
+
+    #the chosen arcs plus the end -> start arc form one circuit through every cell
+    def add_circuit_constraint(self):
+        start = self.numbered_cells[1]
+        end = self.numbered_cells[self.max_number]
+        circuit = [(self.node(*u), self.node(*v), lit) for (u, v), lit in self.arcs.items()]
+        circuit.append((self.node(*end), self.node(*start), self.model.NewConstant(1)))
+        self.model.AddCircuit(circuit)
+
+    #step numbers along the path, only used to keep the numbered cells in order
+    def add_ordering_constraints(self):
+        start = self.numbered_cells[1]
+        end = self.numbered_cells[self.max_number]
+        self.time = {}
+        for r, c in self.cells_to_visit:
+            self.time[(r, c)] = self.model.NewIntVar(0, self.n_tiles - 1, f'time_{r}_{c}')
+        self.model.Add(self.time[start] == 0)
+        self.model.Add(self.time[end] == self.n_tiles - 1)
+        for (u, v), lit in self.arcs.items():
+            if v != start:
+                self.model.Add(self.time[v] == self.time[u] + 1).OnlyEnforceIf(lit)
+        for num in range(2, self.max_number + 1):
+            self.model.Add(self.time[self.numbered_cells[num - 1]] < self.time[self.numbered_cells[num]])
+
+    #extracts the solution path by following the chosen arcs from the first numbered cell
+    def extract_solution(self, solver):
+        successor = {u: v for (u, v), lit in self.arcs.items() if solver.Value(lit)}
+        path = [self.numbered_cells[1]]
+        while len(path) < self.n_tiles:
+            path.append(successor[path[-1]])
+        return path
+
+    #hints the arcs and steps along the heuristic path
+    def add_hint(self):
+        super().add_hint()
+        for u, v in zip(self.hint, self.hint[1:]):
+            self.model.AddHint(self.arcs[(u, v)], 1)
+
+    def build_model(self):
+        timed = self.stats.timed
+        self.model = cp_model.CpModel()
+        timed(self.create_arc_variables)
+        timed(self.add_circuit_constraint)
+        timed(self.add_ordering_constraints)
+
+    def decision_variables(self):
+        return list(self.arcs.values())
+
+    def solve(self):
+        start = self.numbered_cells[1]
+        end = self.numbered_cells[self.max_number]
+        if self.n_tiles == 1:
+            self.stats.finish('solved')
+            return [start]
+        if start == end:
+            self.stats.finish('unsat')
+            return None
+        if self.warm_start:
+            path = self.stats.timed(self.heuristic_start)
+            if path is not None:
+                self.stats.finish('solved')
+                return path
+
+        self.build_model()
+        if self.warm_start:
+            self.stats.timed(self.add_hint)
+
+        solver = self.make_solver()
+        with self.stats.search():
+            status = solver.Solve(self.model)
+        self.stats.read_cp_sat(self.model, solver, status)
+        self.stats.finish()
+
+        if status == cp_model.OPTIMAL or status == cp_model.FEASIBLE:
+            path = self.extract_solution(solver)
+            if self.warm_start:
+                self.hint_accepted = path[:len(self.hint)] == self.hint
+            return path
+
+        if self.warm_start:
+            self.hint_accepted = False
+        return None
+
+    def iter_solutions(self, limit=None):
+        start = self.numbered_cells[1]
+        end = self.numbered_cells[self.max_number]
+        if self.n_tiles == 1:
+            if limit is None or limit > 0:
+                yield [start]
+            return
+        if start == end:
+            return
+        yield from super().iter_solutions(limit)
+
+
+if __name__ == "__main__":
+    grid = [
+        [1, 0, 0, 0, 0, 0],
+        [0, 2, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 3, 0, 0],
+        [0, 0, 0, 0, 0, 0],
+        [4, 0, 0, 0, 0, 0],
+    ]
+
+    walls = {
+        ((0, 0), (1, 0)),
+        ((0, 2), (1, 2)),
+        ((1, 1), (2, 1)),
+        ((2, 0), (3, 0)),
+        ((2, 3), (3, 3)),
+        ((3, 2), (4, 2)),
+        ((3, 5), (4, 5)),
+        ((4, 0), (5, 0)),
+        ((4, 3), (5, 3)),
+        ((4, 4), (5, 4)),
+    }
+
+    solver = ZipCPSATSolver(grid, walls)
+    solution = solver.solve()
+    if solution:
+        solver.print_solution(solution)
+    else:
+        print("No solution found")
@@ -0,0 +1,61 @@
+import random
+
+# cheap greedy paths for zip, used to warm start the cp-sat solvers (warm_start=True).
+# the path walks from the first numbered cell always moving to the free neighbour with the fewest free neighbours
+# of its own (warnsdorff's rule), which tends to sweep along walls and edges without leaving cells stranded.
+# numbered cells are only entered in order and the last one only as the final cell, so a path covering every
+# cell is a solution if it ends on the last number. it doesn't when there is only one number, the walk starts there
+
+
+# one greedy walk over board (a zip_board.ZipBoard), returns the cells visited as a list of cell indices
+def greedy_walk(board, rng):
+    n = board.n_cells
+    neighbors = board.neighbor_lists
+    numbered = board.numbered
+    max_number = max(numbered)
+    number = {cell: num for num, cell in numbered.items()}
+    end = numbered[max_number]
+
+    path = [numbered[1]]
+    visited = [False] * n
+    visited[path[0]] = True
+    next_num = 2
+    while len(path) < n:
+        x = path[-1]
+        best = best_key = None
+        for v in neighbors[x]:
+            if visited[v]:
+                continue
+            if v in number and number[v] != next_num:
+                continue
+            if v == end and len(path) < n - 1:
+                continue
+            onward = 0
+            for u in neighbors[v]:
+                if not visited[u]:
+                    onward += 1
+            key = (onward, rng.random())
+            if best is None or key < best_key:
+                best, best_key = v, key
+        if best is None:
+            break
+        path.append(best)
+        visited[best] = True
+        if best in number:
+            next_num += 1
+    return path
+
+
+# longest of a few randomised greedy walks as (row, col) positions, stopping early at a complete path.
+# rng is a random.Random, seeded with 0 if not given
+def greedy_path(board, attempts=8, rng=None):
+    if rng is None:
+        rng = random.Random(0)
+    best = []
+    for _ in range(attempts):
+        path = greedy_walk(board, rng)
+        if len(path) > len(best):
+            best = path
+        if len(best) == board.n_cells:
+            break
+    return [board.position(i) for i in best]
@@ -1,22 +1,35 @@
 from ortools.sat.python import cp_model
 import time
 
+import batch
+import solution_stream
+import solve_stats
+import zip_heuristic
+from zip_board import ZipBoard
+
 class ZipCPSATSolver:
 
     # grid is a 2D array of ints where 0 is blank cell, 1,2,...,K are numbered cells that have to be visited in order
     # walls is a set of position pairs indicating walls between cells
+    # profile is a solve_profile.SolveProfile for the cp-sat parameters, None for the defaults
+    # warm_start=True first runs the greedy zip_heuristic path: a complete path is returned straight away, a partial
+    # one is passed to cp-sat as a solution hint. hint is that path, hint_accepted whether the solution kept it
+    # stats is a solve_stats.SolveStats with the timings, model size and search counters of solve()
 
-    def __init__(self, grid, walls=None):
+    def __init__(self, grid, walls=None, profile=None, warm_start=False):
 
         self.grid = grid
+        self.profile = profile
+        self.warm_start = warm_start
+        self.hint = None
+        self.hint_accepted = None
+        self.stats = solve_stats.SolveStats(type(self).__name__)
         self.rows = len(grid)
         self.cols = len(grid[0])
         
-        if walls is None:
-            walls = set()
-        
-        #makes it so that (a,b) and (b,a) are treated the same
-        self.walls = set((min(c1, c2), max(c1, c2)) for edge in walls for c1, c2 in [edge])
+        # wall-aware adjacency, also normalises walls so that (a,b) and (b,a) are treated the same
+        self.board = ZipBoard(grid, walls)
+        self.walls = self.board.walls
         
         self.numbered_cells = {}
         self.cells_to_visit = []
@@ -32,8 +45,7 @@ class ZipCPSATSolver:
     
     #checks if there's a wall between two adjacent cells
     def is_wall_between(self, pos1, pos2):
-        edge = (min(pos1, pos2), max(pos1, pos2))
-        return edge in self.walls
+        return self.board.is_wall_between(pos1, pos2)
     
     #creates integer variables for the step/time at each cell
     def create_position_variables(self):
@@ -57,18 +69,9 @@ class ZipCPSATSolver:
     
     #adds constraints ensuring consecutive positions are adjacent and not blocked
     def add_adjacency_constraints(self):
-        neighbors = {}
+        board = self.board
         for r, c in self.cells_to_visit:
-            nb = []
-            for dr, dc in [(0, 1), (1, 0), (0, -1), (-1, 0)]:
-                nr, nc = r + dr, c + dc
-                if 0 <= nr < self.rows and 0 <= nc < self.cols:
-                    if not self.is_wall_between((r, c), (nr, nc)):
-                        nb.append((nr, nc))
-            neighbors[(r, c)] = nb
-
-        for r, c in self.cells_to_visit:
-            nb = neighbors[(r, c)]
+            nb = [board.positions[j] for j in board.neighbor_lists[board.cell(r, c)]]
 
             if not nb:
                 self.model.Add(self.time[(r, c)] == self.n_tiles - 1)
@@ -129,7 +132,7 @@ class ZipCPSATSolver:
                 
                 # Check for vertical wall to the right
                 if c < self.cols - 1:
-                    if self.is_wall_between((r, c), (r, c + 1)):
+                    if self.board.wall_right[r, c]:
                         row_str += "|"
                     else:
                         row_str += " "
@@ -139,7 +142,7 @@ class ZipCPSATSolver:
             if r < self.rows - 1:
                 wall_str = ""
                 for c in range(self.cols):
-                    if self.is_wall_between((r, c), (r + 1, c)):
+                    if self.board.wall_down[r, c]:
                         wall_str += "----"
                     else:
                         wall_str += "    "
@@ -149,20 +152,82 @@ class ZipCPSATSolver:
                     print(wall_str)
         
     
-    def solve(self):
+    #runs the greedy heuristic, returns its path if it already visits every cell and ends on the last number.
+    #with a single number the walk starts on the cell it has to end on, so only a 1 x 1 board passes
+    def heuristic_start(self):
+        self.hint = zip_heuristic.greedy_path(self.board)
+        if len(self.hint) == self.n_tiles and self.hint[-1] == self.numbered_cells[self.max_number]:
+            self.hint_accepted = True
+            return self.hint
+        return None
+    
+    #hints the step of every cell on the heuristic path
+    def add_hint(self):
+        for step, cell in enumerate(self.hint):
+            self.model.AddHint(self.time[cell], step)
+    
+    #builds self.model
+    def build_model(self):
+        timed = self.stats.timed
         self.model = cp_model.CpModel()
-        self.create_position_variables()
-        self.add_start_end_constraints()
-        self.add_adjacency_constraints()
-        self.add_ordering_constraints()
+        timed(self.create_position_variables)
+        timed(self.add_start_end_constraints)
+        timed(self.add_adjacency_constraints)
+        timed(self.add_ordering_constraints)
+    
+    #variables that fix a solution, the profile's search strategy branches on these
+    def decision_variables(self):
+        return [self.time[cell] for cell in self.cells_to_visit]
+    
+    #cp-sat solver for self.model, from the profile if there is one
+    def make_solver(self):
+        if self.profile is None:
+            return cp_model.CpSolver()
+        return self.profile.make_solver(self.model, self.decision_variables())
+    
+    def solve(self):
+        if self.warm_start:
+            path = self.stats.timed(self.heuristic_start)
+            if path is not None:
+                self.stats.finish('solved')
+                return path
+        
+        self.build_model()
         
-        solver = cp_model.CpSolver()
-        status = solver.Solve(self.model)
+        if self.warm_start:
+            self.stats.timed(self.add_hint)
+        
+        solver = self.make_solver()
+        with self.stats.search():
+            status = solver.Solve(self.model)
+        self.stats.read_cp_sat(self.model, solver, status)
+        self.stats.finish()
         
         if status == cp_model.OPTIMAL or status == cp_model.FEASIBLE:
-            return self.extract_solution(solver)
+            path = self.extract_solution(solver)
+            if self.warm_start:
+                self.hint_accepted = path[:len(self.hint)] == self.hint
+            return path
         
+        if self.warm_start:
+            self.hint_accepted = False
         return None
+    
+    #yields every solution path lazily, at most limit of them. builds a fresh model without hints
+    def iter_solutions(self, limit=None):
+        self.build_model()
+        for values in solution_stream.iter_cp_solutions(self.model, self.decision_variables(), self.make_solver(), limit):
+            yield self.extract_solution(values)
+    
+    #true if the puzzle has exactly one solution path, stops looking at the second one
+    def is_unique(self):
+        return sum(1 for _ in self.iter_solutions(limit=2)) == 1
+
+    # solves many puzzles across a process pool, yielding (index, solution) in completion order
+    # each puzzle is a tuple of constructor arguments, (grid, walls). see batch.solve_many
+    @classmethod
+    def solve_many(cls, puzzles, workers=None):
+        return batch.solve_many(cls, puzzles, workers)
 
 if __name__ == "__main__":
     grid = [
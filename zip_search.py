@@ -0,0 +1,364 @@
+import random
+import time
+
+import zip_integer
+
+# i-th term (from 1) of the luby sequence 1, 1, 2, 1, 1, 2, 4, 1, 1, 2, 1, 1, 2, 4, 8, ...
+def luby(i):
+    while True:
+        k = 1
+        while (1 << k) - 1 < i:
+            k += 1
+        if i == (1 << k) - 1:
+            return 1 << (k - 1)
+        i -= (1 << (k - 1)) - 1
+
+class ZipSearchSolver(zip_integer.ZipCPSATSolver):
+
+    # native depth first search for zip, no cp-sat involved. takes the same grid and walls as the cp-sat solvers
+    # (and reuses their ZipBoard adjacency and print_solution) and returns the same path list.
+    # the board is kept as python int bitboards, bit r * cols + c is cell (r, c), and the search runs on an
+    # explicit stack of preallocated per-depth slots holding the path cell and a mask of untried moves.
+    # after every move it prunes with
+    #  - waypoint order: numbered cells can only be entered in order, the last one only as the final cell
+    #  - waypoint distance: the manhattan distances through the remaining numbered cells must fit in the steps left
+    #  - parity: the path alternates checkerboard colours, so the colour counts of the unvisited cells are fixed
+    #  - dead ends: every unvisited cell but the last one needs two free neighbours (one in, one out)
+    #  - connectivity: the unvisited cells have to stay connected (bitboard flood fill), and any cell cutting
+    #    them apart has to have only the end of the path, and only later numbers, behind it
+    # the search is heavy tailed, so it is cut off and restarted on a luby schedule of move budgets.
+    # rng (a random.Random, seeded with 0 if not given) jitters the move order so each restart goes its own way
+
+    # move budget of a restart is RESTART_UNIT times the next luby number (1, 1, 2, 1, 1, 2, 4, 1, ...)
+    RESTART_UNIT = 128
+    # random amount added to the onward move counts when ranking moves
+    JITTER = 1.5
+
+    def __init__(self, grid, walls=None, rng=None):
+        super().__init__(grid, walls)
+        start = time.perf_counter()
+        self.rng = rng if rng is not None else random.Random(0)
+        cols = self.cols
+        self.n_cells = self.rows * cols
+        self.all_cells = (1 << self.n_cells) - 1
+        self.start = self.cell(*self.numbered_cells[1])
+        self.end = self.cell(*self.numbered_cells[self.max_number])
+
+        # per cell neighbour masks, plus the cells that can move right / left / down / up for the flood fill
+        self.neighbors = [0] * self.n_cells
+        self.right_open = self.left_open = self.down_open = self.up_open = 0
+        for i, targets in enumerate(self.board.neighbor_lists):
+            for j in targets:
+                self.neighbors[i] |= 1 << j
+                if j == i + 1:
+                    self.right_open |= 1 << i
+                elif j == i - 1:
+                    self.left_open |= 1 << i
+                elif j == i + cols:
+                    self.down_open |= 1 << i
+                else:
+                    self.up_open |= 1 << i
+
+        self.black = 0
+        for r, c in self.cells_to_visit:
+            if (r + c) % 2 == 0:
+                self.black |= 1 << self.cell(r, c)
+
+        # number on each cell (0 if none), cell of each number, and the cells numbered above k for each k
+        self.number = [0] * self.n_cells
+        self.waypoint = [None] * (self.max_number + 1)
+        for num, (r, c) in self.numbered_cells.items():
+            self.number[self.cell(r, c)] = num
+            self.waypoint[num] = self.cell(r, c)
+        self.numbered_above = [0] * (self.max_number + 2)
+        for k in range(self.max_number - 1, -1, -1):
+            self.numbered_above[k] = self.numbered_above[k + 1] | 1 << self.waypoint[k + 1]
+        # manhattan distance from number k through every later number to the last one
+        self.chain = [0] * (self.max_number + 1)
+        for k in range(self.max_number - 1, 0, -1):
+            self.chain[k] = self.chain[k + 1] + self.distance(self.waypoint[k], self.waypoint[k + 1])
+
+        # search slots reused by every search and cut check
+        self.path = [0] * self.n_cells
+        self.options = [0] * self.n_cells
+        self.disc = [0] * self.n_cells
+        self.low = [0] * self.n_cells
+        self.parent = [0] * self.n_cells
+        self.finish = [0] * self.n_cells
+        self.rest = [0] * self.n_cells
+        self.clock = 1
+
+        # moves made by the last solve, over all restarts, and how many of them the pruning rejected
+        self.nodes = 0
+        self.dead_ends = 0
+        # set when the last search stopped at its move budget instead of running out of moves
+        self.aborted = False
+        self.stats.phases['precompute'] = time.perf_counter() - start
+
+    def cell(self, r, c):
+        return self.board.cell(r, c)
+
+    def distance(self, a, b):
+        return abs(a // self.cols - b // self.cols) + abs(a % self.cols - b % self.cols)
+
+    # cells reachable from the bits in seed by moving through cells in free
+    def flood(self, seed, free):
+        cols = self.cols
+        reach = seed
+        while True:
+            grown = reach | (free & (((reach & self.right_open) << 1) | ((reach & self.left_open) >> 1)
+                                     | ((reach & self.down_open) << cols) | ((reach & self.up_open) >> cols)))
+            if grown == reach:
+                return reach
+            reach = grown
+
+    # False if the path can't be finished from cell x after reaching depth, with the next number to visit next_num
+    def feasible(self, x, depth, visited, previous, next_num):
+        left = self.n_cells - 1 - depth
+        free = ~visited & self.all_cells
+
+        if self.distance(x, self.waypoint[next_num]) + self.chain[next_num] > left:
+            return False
+
+        # colours alternate along the path, so of the cells left about half share the colour of x
+        same = left // 2
+        free_black = bin(free & self.black).count('1')
+        if self.black >> x & 1:
+            if free_black != same:
+                return False
+        elif free_black != left - same:
+            return False
+
+        # only the neighbours of the cell we just left lost a free neighbour
+        usable = free | 1 << x
+        around = self.neighbors[previous] & free
+        while around:
+            low = around & -around
+            around ^= low
+            v = low.bit_length() - 1
+            degree = bin(self.neighbors[v] & usable).count('1')
+            if degree < 2 and v != self.end:
+                return False
+            if degree < 1:
+                return False
+
+        # the free cells have to stay connected without going back through x
+        seed = self.neighbors[x] & free
+        if not seed or self.flood(seed & -seed, free) != free:
+            return False
+        return self.cuts_ok(x, free, next_num)
+
+    # checks the cut cells of the free cells plus x with a low-link dfs rooted at x. the path passes a cut cell
+    # once, so everything cut off behind it has to come after it: only one part may be cut off per cell, it has
+    # to hold the last cell and every number in it has to come after the numbers outside it.
+    # disc / low / parent / finish / rest are preallocated per cell, disc values below base are from older calls
+    def cuts_ok(self, x, free, next_num):
+        neighbors, disc, low, parent, finish, rest = \
+            self.neighbors, self.disc, self.low, self.parent, self.finish, self.rest
+        usable = free | 1 << x
+        base = t = self.clock
+        disc[x] = low[x] = t
+        t += 1
+        parent[x] = -1
+        rest[x] = neighbors[x] & usable
+        stack = [x]
+        while stack:
+            v = stack[-1]
+            options = rest[v]
+            if options:
+                bit = options & -options
+                rest[v] = options ^ bit
+                u = bit.bit_length() - 1
+                if disc[u] >= base:
+                    if u != parent[v] and disc[u] < low[v]:
+                        low[v] = disc[u]
+                else:
+                    disc[u] = low[u] = t
+                    t += 1
+                    parent[u] = v
+                    rest[u] = neighbors[u] & usable
+                    stack.append(u)
+            else:
+                stack.pop()
+                finish[v] = t
+                p = parent[v]
+                if p >= 0 and low[v] < low[p]:
+                    low[p] = low[v]
+        self.clock = t
+
+        end = disc[self.end]
+        cut = 0
+        cells = free
+        while cells:
+            bit = cells & -cells
+            cells ^= bit
+            u = bit.bit_length() - 1
+            p = parent[u]
+            if p == x or low[u] < disc[p]:
+                continue
+            # p cuts off the subtree of u, which is the disc range [disc[u], finish[u])
+            if p == self.end or cut >> p & 1:
+                return False
+            cut |= 1 << p
+            first, last = disc[u], finish[u]
+            if not first <= end < last:
+                return False
+            inside = False
+            for k in range(next_num, self.max_number + 1):
+                w = self.waypoint[k]
+                if w == p:
+                    if inside:
+                        return False
+                    continue
+                if first <= disc[w] < last:
+                    inside = True
+                elif inside:
+                    return False
+        return True
+
+    # mask of the cells x can move to at depth. a free neighbour whose only other free neighbour is x (or only x,
+    # for the last cell) has to be entered right now, so it becomes the only option, and two of them is a dead end
+    def moves(self, x, depth, visited, next_num):
+        free = ~visited
+        final = depth + 2 == self.n_cells
+        forced = 0
+        around = self.neighbors[x] & free
+        while around:
+            low = around & -around
+            around ^= low
+            v = low.bit_length() - 1
+            degree = bin(self.neighbors[v] & free).count('1') + 1
+            if v == self.end:
+                if degree == 1 and not final:
+                    return 0
+            elif degree == 2:
+                if forced:
+                    return 0
+                forced = low
+        options = self.neighbors[x] & free & ~self.numbered_above[next_num]
+        if not final:
+            options &= ~(1 << self.end)
+        if forced:
+            return options & forced
+        return options
+
+    # the option with the fewest onward moves (warnsdorff's rule), jittered so close calls go either way
+    def pick(self, options, visited):
+        best = best_degree = None
+        while options:
+            low = options & -options
+            options ^= low
+            v = low.bit_length() - 1
+            degree = bin(self.neighbors[v] & ~visited).count('1') + self.JITTER * self.rng.random()
+            if best is None or degree < best_degree:
+                best, best_degree = v, degree
+        return best
+
+    # depth first search from the first numbered cell, returns the path as cell indices or None.
+    # stops early (setting self.aborted) after max_nodes moves
+    def search(self, max_nodes=None):
+        n = self.n_cells
+        self.aborted = False
+        nodes = 0
+        path, options = self.path, self.options
+        path[0] = self.start
+        visited = 1 << self.start
+        next_num = 2
+        options[0] = self.moves(self.start, 0, visited, next_num)
+        depth = 0
+        while depth >= 0:
+            if not options[depth]:
+                # backtrack
+                x = path[depth]
+                visited ^= 1 << x
+                if self.number[x]:
+                    next_num -= 1
+                depth -= 1
+                continue
+            if max_nodes is not None and nodes >= max_nodes:
+                self.aborted = True
+                return None
+
+            v = self.pick(options[depth], visited)
+            options[depth] ^= 1 << v
+            nodes += 1
+            self.nodes += 1
+            depth += 1
+            path[depth] = v
+            visited |= 1 << v
+            if self.number[v]:
+                next_num += 1
+            if depth == n - 1:
+                return path
+            if self.feasible(v, depth, visited, path[depth - 1], next_num):
+                options[depth] = self.moves(v, depth, visited, next_num)
+            else:
+                options[depth] = 0
+                self.dead_ends += 1
+        return None
+
+    # searches with randomised restarts: a search that runs past its move budget is thrown away and started over,
+    # so one bad early move doesn't keep the search stuck in a huge dead subtree. None if there is no path
+    def find_path(self):
+        n = self.n_cells
+        self.nodes = 0
+        self.dead_ends = 0
+        if n == 1:
+            return [self.numbered_cells[1]]
+        if self.start == self.end:
+            return None
+        # a path over n cells starts and ends on the same colour exactly when n is odd
+        if ((self.black >> self.start & 1) == (self.black >> self.end & 1)) != (n % 2 == 1):
+            return None
+        # every cell but the last needs two ways in or out, later only the cells next to a move are checked again
+        for v in range(n):
+            if v != self.start and bin(self.neighbors[v]).count('1') < (1 if v == self.end else 2):
+                return None
+
+        restart = 1
+        while True:
+            path = self.search(self.RESTART_UNIT * luby(restart))
+            if path is not None:
+                return [divmod(i, self.cols) for i in path]
+            if not self.aborted:
+                return None
+            restart += 1
+
+    def solve(self):
+        with self.stats.search():
+            path = self.find_path()
+        self.stats.branches = self.nodes
+        self.stats.conflicts = self.dead_ends
+        self.stats.finish('unsat' if path is None else 'solved')
+        return path
+
+
+if __name__ == "__main__":
+    grid = [
+        [1, 0, 0, 0, 0, 0],
+        [0, 2, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 3, 0, 0],
+        [0, 0, 0, 0, 0, 0],
+        [4, 0, 0, 0, 0, 0],
+    ]
+
+    walls = {
+        ((0, 0), (1, 0)),
+        ((0, 2), (1, 2)),
+        ((1, 1), (2, 1)),
+        ((2, 0), (3, 0)),
+        ((2, 3), (3, 3)),
+        ((3, 2), (4, 2)),
+        ((3, 5), (4, 5)),
+        ((4, 0), (5, 0)),
+        ((4, 3), (5, 3)),
+        ((4, 4), (5, 4)),
+    }
+
+    solver = ZipSearchSolver(grid, walls)
+    solution = solver.solve()
+    if solution:
+        solver.print_solution(solution)
+    else:
+        print("No solution found")